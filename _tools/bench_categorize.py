@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark categorize_video() against the per-keyword `in` loop it replaced.
+Replicates the titles and descriptions of consolidated_youtube_data.json to --count
+videos and reports videos per second for both, plus a run with --stretch times longer
+descriptions.
+"""
+
+import argparse
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from json_stream import iter_json_array  # noqa: E402
+from scripts_data_pipeline import CATEGORY_RULES, TAG_RULES, categorize_video  # noqa: E402
+
+
+def categorize_per_keyword(title, description):
+    """The old shape: one substring scan per keyword."""
+    hay = f'{title} {description}'.lower()
+    categories = [label for label, keywords in CATEGORY_RULES if any(k in hay for k in keywords)]
+    if not categories:
+        return 'Other', ['other']
+    tags = [label.lower().replace(' ', '-') for label in categories]
+    tags.extend(tag for tag, keywords in TAG_RULES if any(k in hay for k in keywords))
+    return categories[0], tags
+
+
+def rate(func, samples):
+    start = time.perf_counter()
+    for title, description in samples:
+        func(title, description)
+    return len(samples) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark video categorization')
+    parser.add_argument('--count', type=int, default=100_000, help='videos per run (default 100000)')
+    parser.add_argument('--stretch', type=int, default=10, help='description multiplier for the long run (default 10)')
+    args = parser.parse_args()
+
+    rows = [(row.get('Title', ''), row.get('Description', '')) for row in iter_json_array(ROOT / 'consolidated_youtube_data.json')]
+    samples = list(islice(cycle(rows), args.count))
+    long_samples = [(title, ' '.join([description] * args.stretch)) for title, description in samples]
+
+    mismatches = sum(categorize_video(*s) != categorize_per_keyword(*s) for s in rows)
+    print(f'📊 {len(rows)} catalog videos replicated to {len(samples)}; {mismatches} disagree with the per-keyword loop')
+    for name, batch in (('catalog descriptions', samples), (f'{args.stretch}x descriptions', long_samples)):
+        compiled = rate(categorize_video, batch)
+        loop = rate(categorize_per_keyword, batch)
+        print(f'⏱️  {name}: {compiled:,.0f} videos/s compiled, {loop:,.0f} videos/s per keyword ({compiled / loop:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
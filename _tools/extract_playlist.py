@@ -4,8 +4,11 @@ YouTube Playlist Extractor
 Run this script on your local machine (not in the restricted environment)
 """
 
-import json
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from json_stream import JsonArrayWriter  # noqa: E402
 
 try:
     from pytube import Playlist
@@ -15,37 +18,35 @@ except ImportError:
     sys.exit(1)
 
 def extract_playlist(playlist_url):
-    """Extract all videos from a YouTube playlist"""
+    """Extract all videos from a YouTube playlist and return how many were saved"""
     print(f"📥 Fetching playlist: {playlist_url}")
 
+    output_file = 'playlist_videos.json'
     try:
         playlist = Playlist(playlist_url)
-        videos = []
 
         print(f"📊 Playlist title: {playlist.title}")
         print(f"🎬 Extracting {len(playlist.video_urls)} videos...\n")
 
-        for i, video in enumerate(playlist.videos, 1):
-            video_data = {
-                "Video url": f"https://www.youtube.com/watch?v={video.video_id}",
-                "Title": video.title,
-                "Description": "Video url:",
-                "Channel name": video.author if hasattr(video, 'author') else "N/A",
-                "Duration": "N/A",
-                "Views": "N/A",
-                "Thumbnail url": "N/A"
-            }
-            videos.append(video_data)
-            print(f"  {i}. ✓ {video.title}")
-
-        # Save to file
-        output_file = 'playlist_videos.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(videos, f, indent=2, ensure_ascii=False)
-
-        print(f"\n✅ Successfully extracted {len(videos)} videos!")
+        # Each video is written as soon as it is fetched; the file only replaces the
+        # previous playlist_videos.json once every video has been extracted
+        with JsonArrayWriter(output_file, only_if_changed=False) as out:
+            for i, video in enumerate(playlist.videos, 1):
+                video_data = {
+                    "Video url": f"https://www.youtube.com/watch?v={video.video_id}",
+                    "Title": video.title,
+                    "Description": "Video url:",
+                    "Channel name": video.author if hasattr(video, 'author') else "N/A",
+                    "Duration": "N/A",
+                    "Views": "N/A",
+                    "Thumbnail url": "N/A"
+                }
+                out.write(video_data)
+                print(f"  {i}. ✓ {video.title}")
+
+        print(f"\n✅ Successfully extracted {out.count} videos!")
         print(f"💾 Saved to: {output_file}")
-        return videos
+        return out.count
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -5,64 +5,68 @@ Run this after extracting playlist_videos.json
 """
 
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from json_stream import iter_json_array, write_json_array  # noqa: E402
+from video_store import VideoStore  # noqa: E402
 
 def merge_videos():
     """Merge playlist_videos.json into consolidated_youtube_data.json"""
 
-    # Load playlist videos
+    # Key both lists by YouTube ID so watch?v= and youtu.be links to one video merge.
+    # Rows are read one at a time; only the merged catalog is held in memory.
+    store = VideoStore()
     try:
-        with open('playlist_videos.json', 'r', encoding='utf-8') as f:
-            playlist_videos = json.load(f)
-        print(f"✅ Loaded {len(playlist_videos)} videos from playlist_videos.json")
+        existing = store.upsert_many(iter_json_array('consolidated_youtube_data.json'), 'consolidated')
+        existing_count = existing['added'] + existing['merged']
+        print(f"✅ Loaded {existing_count} existing videos")
+        # Rows with no URL cannot be matched against the playlist; they are written back as they were
+        kept = list(store.unkeyed)
+        if kept:
+            print(f"⚠️  {len(kept)} existing rows have no video URL; keeping them unchanged")
     except FileNotFoundError:
-        print("❌ Error: playlist_videos.json not found!")
-        print("Please run extract_playlist.py or use extract_playlist.html first")
+        print("❌ Error: consolidated_youtube_data.json not found!")
         return
     except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON in playlist_videos.json: {e}")
+        print(f"❌ Error: Invalid JSON in consolidated_youtube_data.json: {e}")
         return
+    print(f"📋 Found {len(store)} unique videos in existing data")
 
-    # Load existing consolidated data
     try:
-        with open('consolidated_youtube_data.json', 'r', encoding='utf-8') as f:
-            existing_videos = json.load(f)
-        print(f"✅ Loaded {len(existing_videos)} existing videos")
+        result = store.upsert_many(iter_json_array('playlist_videos.json'), 'playlist')
     except FileNotFoundError:
-        print("❌ Error: consolidated_youtube_data.json not found!")
+        print("❌ Error: playlist_videos.json not found!")
+        print("Please run extract_playlist.py or use extract_playlist.html first")
         return
     except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON in consolidated_youtube_data.json: {e}")
+        print(f"❌ Error: Invalid JSON in playlist_videos.json: {e}")
         return
+    playlist_count = result['added'] + result['merged']
+    print(f"✅ Loaded {playlist_count} videos from playlist_videos.json")
+    if result['skipped']:
+        print(f"⚠️  {result['skipped']} playlist rows have no video URL and were left out")
 
-    # Extract existing video URLs for deduplication
-    existing_urls = {video.get('Video url') for video in existing_videos}
-    print(f"📋 Found {len(existing_urls)} unique URLs in existing data")
-
-    # Add only new videos
-    new_videos = []
-    duplicates = 0
-
-    for video in playlist_videos:
-        video_url = video.get('Video url')
-        if video_url and video_url not in existing_urls:
-            new_videos.append(video)
-            existing_urls.add(video_url)
-        else:
-            duplicates += 1
+    added = result['added']
+    duplicates = result['merged']
+    filled = sum(n for key, n in result.items() if key.endswith(':filled'))
+    replaced = sum(n for key, n in result.items() if key.endswith(':replaced'))
 
     if duplicates > 0:
-        print(f"⚠️  Skipped {duplicates} duplicate videos")
-
-    if new_videos:
-        # Merge new videos
-        merged_videos = existing_videos + new_videos
+        print(f"⚠️  {duplicates} playlist videos were already present")
+    if filled:
+        print(f"🧩 Filled {filled} missing fields on existing videos from the playlist")
+    if replaced:
+        print(f"🔁 Replaced {replaced} fields with the playlist's values (see FIELD_PRECEDENCE)")
 
-        # Save merged data
-        with open('consolidated_youtube_data.json', 'w', encoding='utf-8') as f:
-            json.dump(merged_videos, f, indent=2, ensure_ascii=False)
+    # A difference from existing_count means duplicate rows in the catalog were folded together
+    if added or filled or replaced or len(store) != existing_count:
+        # Save merged data; the temp-file rename leaves the old catalog intact on failure
+        write_json_array('consolidated_youtube_data.json', [*store.records.values(), *kept])
 
-        print(f"✅ Added {len(new_videos)} new videos!")
-        print(f"📊 Total videos now: {len(merged_videos)}")
+        print(f"✅ Added {added} new videos!")
+        print(f"📊 Total videos now: {len(store)}")
         print(f"💾 Saved to consolidated_youtube_data.json")
     else:
         print("ℹ️  No new videos to add (all were duplicates)")
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""Optional query API over the pipeline outputs, for clients that should not download whole files.
+
+    python api_server.py --port 8080
+
+Every collection is loaded once at startup into per-field value indexes, a token index
+for ?q= and presorted orders, so a request only walks one presorted list:
+
+    GET /api/                                   collections with their filters and sorts
+    GET /api/<collection>?page=&per_page=&sort=&q=&<filter>=&facets=<filter>,...
+    GET /api/search?q=&limit=                   every collection, ranked like search.js
+
+Collections are jokes, videos, episodes, quotes and transcripts. Responses are JSON,
+gzip-compressed when the client accepts it, carry a weak ETag (304 on If-None-Match) and
+are served from an LRU cache of rendered bodies. To point the site at a running server,
+add <meta name="archive-api" content="https://api.example.org"> to a page; search.js
+and videos.js then query it instead of fetching the JSON files.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qsl, urlsplit
+
+from scripts_data_pipeline import (
+    JOKES_PATH,
+    NML_EPISODES_PATH,
+    QUOTES_PATH,
+    SEARCH_INDEX_PATH,
+    TRANSCRIPTS_PATH,
+    VIDEOS_PATH,
+    _tokenize,
+    _video_card,
+    video_sort_permutations,
+)
+
+DEFAULT_PER_PAGE = 24
+MAX_PER_PAGE = 100
+DEFAULT_SEARCH_LIMIT = 5
+MAX_SEARCH_LIMIT = 50
+CACHE_SIZE = 512
+GZIP_MIN_BYTES = 512
+IDLE_TIMEOUT_SECONDS = 15
+MAX_HEADER_LINES = 100
+# No endpoint takes a body; small ones are read and discarded to keep keep-alive in step.
+MAX_BODY_BYTES = 64 * 1024
+REASONS = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Content Too Large",
+    431: "Request Header Fields Too Large",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _folded(value: object) -> str:
+    return str(value if value is not None else "").strip().casefold()
+
+
+def _positive_int(params: dict[str, str], name: str, default: int, low: int, high: int) -> int:
+    raw = params.get(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low} and {high}")
+    return value
+
+
+class CollectionIndex:
+    """One collection's rows with filter, token and sort indexes built at startup."""
+
+    def __init__(
+        self,
+        name: str,
+        rows: list[dict],
+        filters: dict[str, str],
+        text: Callable[[dict], str],
+        orders: dict[str, list[int]],
+        item: Callable[[int, dict], dict] = lambda index, row: row,
+    ) -> None:
+        self.name = name
+        self.rows = rows
+        self.filters = filters
+        self.orders = orders
+        self.default_sort = next(iter(orders))
+        self.item = item
+
+        # filter param -> folded value -> row indices
+        self.values: dict[str, dict[str, set[int]]] = {param: {} for param in filters}
+        postings: dict[str, set[int]] = {}
+        for i, row in enumerate(rows):
+            for param, field in filters.items():
+                self.values[param].setdefault(_folded(row.get(field)), set()).add(i)
+            for term in set(_tokenize(text(row))):
+                postings.setdefault(term, set()).add(i)
+        self.terms = sorted(postings)
+        self.postings = [postings[term] for term in self.terms]
+
+    def _prefix_matches(self, token: str) -> set[int]:
+        matched: set[int] = set()
+        for i in range(bisect_left(self.terms, token), len(self.terms)):
+            if not self.terms[i].startswith(token):
+                break
+            matched |= self.postings[i]
+        return matched
+
+    def _matching(self, params: dict[str, str], skip: str | None = None) -> set[int] | None:
+        """Rows passing every filter and query token (None means no constraint)."""
+        candidates: list[set[int]] = []
+        for param in self.filters:
+            if param != skip and params.get(param):
+                candidates.append(self.values[param].get(_folded(params[param]), set()))
+        for token in _tokenize(params.get("q", "")):
+            candidates.append(self._prefix_matches(token))
+        if not candidates:
+            return None
+        candidates.sort(key=len)
+        return set.intersection(*candidates) if len(candidates) > 1 else set(candidates[0])
+
+    def query(self, params: dict[str, str]) -> dict:
+        unknown = set(params) - set(self.filters) - {"q", "page", "per_page", "sort", "facets"}
+        if unknown:
+            raise BadRequest(f"unknown parameter(s) for {self.name}: {', '.join(sorted(unknown))}")
+        sort = params.get("sort") or self.default_sort
+        if sort not in self.orders:
+            raise BadRequest(f"sort must be one of: {', '.join(self.orders)}")
+        page = _positive_int(params, "page", 1, 1, 1_000_000)
+        per_page = _positive_int(params, "per_page", DEFAULT_PER_PAGE, 0, MAX_PER_PAGE)
+
+        matching = self._matching(params)
+        order = self.orders[sort]
+        ordered = order if matching is None else [i for i in order if i in matching]
+        start = (page - 1) * per_page
+        result = {
+            "collection": self.name,
+            "total": len(ordered),
+            "page": page,
+            "per_page": per_page,
+            "pages": -(-len(ordered) // per_page) if per_page else 0,
+            "sort": sort,
+            "items": [self.item(i, self.rows[i]) for i in ordered[start : start + per_page]],
+        }
+
+        facets = [name for name in (params.get("facets") or "").split(",") if name]
+        if facets:
+            result["facets"] = {}
+            playable = set(self.orders[self.default_sort])
+            for param in facets:
+                if param not in self.filters:
+                    raise BadRequest(f"facets must be among: {', '.join(self.filters)}")
+                # Counts ignore the facet's own filter, so every option shows what picking it gives.
+                pool = self._matching(params, skip=param)
+                counts: dict[str, int] = {}
+                field = self.filters[param]
+                for i in playable if pool is None else playable & pool:
+                    value = str(self.rows[i].get(field) or "")
+                    counts[value] = counts.get(value, 0) + 1
+                result["facets"][param] = counts
+        return result
+
+    def describe(self) -> dict:
+        return {"total": len(self.orders[self.default_sort]), "filters": list(self.filters), "sorts": list(self.orders)}
+
+
+class SearchIndex:
+    """search-index.json, queried the way search.js does: every token as a prefix, weights summed."""
+
+    def __init__(self, index: dict) -> None:
+        self.docs = index["docs"]
+        self.terms = index["terms"]
+        self.postings = index["postings"]
+
+    def _postings_for_token(self, token: str, collection: str) -> dict[int, int]:
+        hits: dict[int, int] = {}
+        for i in range(bisect_left(self.terms, token), len(self.terms)):
+            if not self.terms[i].startswith(token):
+                break
+            flat = self.postings[i].get(collection, [])
+            for doc, weight in zip(flat[::2], flat[1::2]):
+                if weight > hits.get(doc, 0):
+                    hits[doc] = weight
+        return hits
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        tokens = _tokenize(query)
+        groups = []
+        if not tokens:
+            return groups
+        for collection in self.docs:
+            sets = sorted((self._postings_for_token(t, collection) for t in tokens), key=len)
+            scores = []
+            for doc, weight in sets[0].items():
+                rest = [s.get(doc) for s in sets[1:]]
+                if all(rest):
+                    scores.append((-(weight + sum(rest)), doc))
+            if scores:
+                scores.sort()
+                groups.append(
+                    {
+                        "collection": collection,
+                        "count": len(scores),
+                        "items": [self.docs[collection][doc] for _, doc in scores[:limit]],
+                    }
+                )
+        return groups
+
+
+def _title_order(rows: list[dict], field: str) -> list[int]:
+    return sorted(range(len(rows)), key=lambda i: _folded(rows[i].get(field)))
+
+
+def _transcript_text(row: dict) -> str:
+    lines = " ".join(str(line.get("text") or "") for line in row.get("content") or [])
+    return f"{row.get('title') or ''} {lines}"
+
+
+def load_collections() -> dict[str, CollectionIndex]:
+    def read(path: Path) -> list[dict]:
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    jokes, videos, episodes = read(JOKES_PATH), read(VIDEOS_PATH), read(NML_EPISODES_PATH)
+    quotes, transcripts = read(QUOTES_PATH), read(TRANSCRIPTS_PATH)
+    everything = lambda rows: list(range(len(rows)))  # noqa: E731
+    by_year = sorted(range(len(quotes)), key=lambda i: quotes[i].get("year") or 0)
+    return {
+        "jokes": CollectionIndex(
+            "jokes",
+            jokes,
+            {"guest": "guest", "episode": "episode", "source": "source"},
+            lambda row: f"{row.get('joke') or ''} {row.get('guest') or ''} {row.get('episode') or ''}",
+            {"default": everything(jokes), "guest-asc": _title_order(jokes, "guest")},
+        ),
+        # Cards match the video-pages/ shards, so videos.js renders either source the same way.
+        "videos": CollectionIndex(
+            "videos",
+            videos,
+            {"category": "category", "channel": "Channel name"},
+            lambda row: f"{row.get('Title') or ''} {row.get('Description') or ''}",
+            video_sort_permutations(videos),
+            _video_card,
+        ),
+        "episodes": CollectionIndex(
+            "episodes",
+            episodes,
+            {"season": "season", "guest": "guest"},
+            lambda row: str(row.get("guest") or ""),
+            {"default": everything(episodes), "guest-asc": _title_order(episodes, "guest")},
+        ),
+        "quotes": CollectionIndex(
+            "quotes",
+            quotes,
+            {"category": "category", "source": "source", "year": "year"},
+            lambda row: f"{row.get('quote') or ''} {row.get('source') or ''}",
+            {"default": everything(quotes), "year-asc": by_year, "year-desc": by_year[::-1]},
+        ),
+        "transcripts": CollectionIndex(
+            "transcripts",
+            transcripts,
+            {"type": "type"},
+            _transcript_text,
+            {"default": everything(transcripts), "title-asc": _title_order(transcripts, "title")},
+        ),
+    }
+
+
+class ResponseCache:
+    """LRU of rendered responses keyed by the normalized request."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.entries: OrderedDict[tuple, tuple[int, bytes, bytes | None, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> tuple[int, bytes, bytes | None, str] | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, entry: tuple[int, bytes, bytes | None, str]) -> None:
+        if self.size <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+def render(status: int, payload: object) -> tuple[int, bytes, bytes | None, str]:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    # One weak validator covers both encodings of the same JSON.
+    etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+    return status, body, compressed, etag
+
+
+class ApiServer:
+    def __init__(self, collections: dict[str, CollectionIndex], search: SearchIndex, cache_size: int, cors_origin: str) -> None:
+        self.collections = collections
+        self.search_index = search
+        self.cache = ResponseCache(cache_size)
+        self.cors_origin = cors_origin
+
+    def route(self, path: str, params: dict[str, str]) -> tuple[int, object]:
+        parts = [part for part in path.split("/") if part]
+        if not parts or parts[0] != "api" or len(parts) > 2:
+            return 404, {"error": "not found"}
+        if len(parts) == 1:
+            return 200, {"collections": {name: c.describe() for name, c in self.collections.items()}}
+        name = parts[1]
+        try:
+            if name == "search":
+                limit = _positive_int(params, "limit", DEFAULT_SEARCH_LIMIT, 1, MAX_SEARCH_LIMIT)
+                query = params.get("q", "")
+                return 200, {"query": query, "groups": self.search_index.search(query, limit)}
+            if name in self.collections:
+                return 200, self.collections[name].query(params)
+        except BadRequest as exc:
+            return 400, {"error": str(exc)}
+        return 404, {"error": f"unknown collection: {name}"}
+
+    def respond(self, target: str) -> tuple[int, bytes, bytes | None, str]:
+        parts = urlsplit(target)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        key = (parts.path.rstrip("/") or "/", tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = render(*self.route(parts.path, params))
+            if entry[0] == 200:
+                self.cache.put(key, entry)
+        return entry
+
+    @staticmethod
+    async def read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+        """Header fields up to the blank line; ValueError when a line or the block is too long."""
+        headers: dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_SECONDS)
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise ValueError("too many header lines")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_SECONDS)
+                except ValueError:  # longer than the StreamReader limit
+                    await self.reject(writer, 400, "request line too long")
+                    break
+                if not request_line.strip():
+                    break
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                try:
+                    headers = await self.read_headers(reader)
+                except ValueError:
+                    await self.reject(writer, 431, "request headers too large")
+                    break
+
+                # Whatever follows the headers is the next request, so a body has to be consumed.
+                if "transfer-encoding" in headers:
+                    await self.reject(writer, 411, "request bodies need a Content-Length")
+                    break
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    await self.reject(writer, 400, "invalid Content-Length")
+                    break
+                if int(length) > MAX_BODY_BYTES:
+                    await self.reject(writer, 413, "request body too large")
+                    break
+                if int(length):
+                    await asyncio.wait_for(reader.readexactly(int(length)), IDLE_TIMEOUT_SECONDS)
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self.send(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def reject(self, writer: asyncio.StreamWriter, status: int, message: str) -> None:
+        """Answer a request that cannot be read safely; the caller closes the connection."""
+        _, body, _, _ = render(status, {"error": message})
+        response_headers = {
+            "Access-Control-Allow-Origin": self.cors_origin,
+            "Connection": "close",
+            "Content-Type": "application/json; charset=utf-8",
+        }
+        await self.write(writer, status, response_headers, body, True)
+
+    async def send(self, writer: asyncio.StreamWriter, method: str, target: str, headers: dict[str, str], keep_alive: bool) -> None:
+        response_headers = {
+            "Access-Control-Allow-Origin": self.cors_origin,
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if method == "OPTIONS":
+            response_headers["Access-Control-Allow-Methods"] = "GET, HEAD, OPTIONS"
+            response_headers["Access-Control-Max-Age"] = "86400"
+            status, body = 204, b""
+        elif method not in ("GET", "HEAD"):
+            response_headers["Allow"] = "GET, HEAD, OPTIONS"
+            status, body, _, _ = render(405, {"error": "method not allowed"})
+            response_headers["Content-Type"] = "application/json; charset=utf-8"
+        else:
+            status, body, compressed, etag = self.respond(target)
+            response_headers.update(
+                {
+                    "Content-Type": "application/json; charset=utf-8",
+                    "Cache-Control": "public, max-age=60",
+                    "Vary": "Accept-Encoding",
+                    "ETag": etag,
+                }
+            )
+            if status == 200 and etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+                status, body = 304, b""
+                del response_headers["Content-Type"]
+            elif compressed is not None and "gzip" in headers.get("accept-encoding", ""):
+                body = compressed
+                response_headers["Content-Encoding"] = "gzip"
+
+        await self.write(writer, status, response_headers, body, method != "HEAD" and status not in (204, 304))
+
+    @staticmethod
+    async def write(writer: asyncio.StreamWriter, status: int, response_headers: dict[str, str], body: bytes, with_body: bool) -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        head += [f"{name}: {value}" for name, value in response_headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if with_body:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    collections = load_collections()
+    search = SearchIndex(json.loads(SEARCH_INDEX_PATH.read_text(encoding="utf-8")))
+    api = ApiServer(collections, search, args.cache_size, args.cors_origin)
+    server = await asyncio.start_server(api.handle, args.host, args.port)
+    sizes = ", ".join(f"{len(c.rows)} {name}" for name, c in collections.items())
+    print(f"Serving {sizes} on http://{args.host}:{args.port}/api/", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help=f"rendered responses kept in the LRU cache (default {CACHE_SIZE})")
+    parser.add_argument("--cors-origin", default="*", help="Access-Control-Allow-Origin sent with every response")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
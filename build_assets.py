@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Build a deployable copy of the site with fingerprinted, precompressed assets.
+
+    python build_assets.py --out _site
+
+Starting from the HTML pages in the root and v2/, every JSON, JS and CSS file they reach
+(through src/href attributes, quoted paths in scripts and names listed inside JSON) is
+rewritten to point at fingerprinted names, then written again as name.<hash>.ext. The
+hash covers the rewritten bytes, so a change anywhere below an asset renames it too.
+Fingerprinted files can be served with a year-long immutable Cache-Control; the
+original names stay in the output for anything that builds a path at runtime.
+
+Each fingerprinted asset and page gets .gz and .br siblings at maximum compression
+(.br only when the optional brotli module is installed), and the output holds an
+asset-manifest.json mapping source paths to fingerprinted ones plus a _headers file
+with the cache rules for hosts that read it.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+try:
+    import brotli  # optional: adds .br siblings
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_OUT = ROOT / "_site"
+PAGE_DIRS = ("", "v2")
+FINGERPRINT_SUFFIXES = (".json", ".js", ".css")
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+MANIFEST_NAME = "asset-manifest.json"
+
+# A quoted (or url(...)) relative path ending in a fingerprintable suffix, with any
+# ?v=... cache-busting query, which the content hash makes redundant.
+_REFERENCE = re.compile(
+    r"""(?<=["'(])((?:\.{1,2}/|/)?(?:[\w.-]+/)*[\w.-]+(?:\.json|\.js|\.css))(\?[^"'()\s]*)?(?=["')])"""
+)
+
+
+def _skipped(rel: Path, out_dir: Path) -> bool:
+    return any(part.startswith(".") or part == "__pycache__" for part in rel.parts) or (ROOT / rel) == out_dir or rel.suffix == ".sqlite3"
+
+
+class AssetGraph:
+    """Rewrites and fingerprints every asset reachable from the pages, dependencies first."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.content: dict[Path, bytes] = {}  # source path -> rewritten bytes
+        self.hashed: dict[Path, Path] = {}  # source path -> fingerprinted path
+        self._visiting: set[Path] = set()
+
+    def _resolve(self, base: Path, ref: str) -> Path | None:
+        target = self.root / ref.lstrip("/") if ref.startswith("/") else base.parent / ref
+        target = Path(os.path.normpath(target))
+        if target.suffix not in FINGERPRINT_SUFFIXES or not target.is_file():
+            return None
+        try:
+            target.relative_to(self.root)
+        except ValueError:
+            return None
+        return target
+
+    def rewrite(self, path: Path) -> bytes:
+        """path's bytes with every reachable asset reference replaced by its fingerprinted name."""
+        text = path.read_text(encoding="utf-8")
+
+        def replace(match: re.Match) -> str:
+            ref = match.group(1)
+            target = self._resolve(path, ref)
+            if target is None or target == path:
+                return match.group(0)
+            hashed = self.fingerprint(target)
+            return ref[: len(ref) - len(target.name)] + hashed.name
+
+        return _REFERENCE.sub(replace, text).encode("utf-8")
+
+    def fingerprint(self, path: Path) -> Path:
+        if path in self.hashed:
+            return self.hashed[path]
+        if path in self._visiting:
+            raise SystemExit(f"asset reference cycle through {path.relative_to(self.root)}")
+        self._visiting.add(path)
+        data = self.rewrite(path)
+        self._visiting.discard(path)
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        self.content[path] = data
+        self.hashed[path] = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+        return self.hashed[path]
+
+
+def _compressed_siblings(path: Path, data: bytes) -> dict[str, int]:
+    """Write path.gz / path.br when they are smaller than data; return their sizes."""
+    sizes = {}
+    variants = [("gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(("br", brotli.compress(data, quality=11)))
+    for ext, packed in variants:
+        if len(packed) < len(data):
+            path.with_name(f"{path.name}.{ext}").write_bytes(packed)
+            sizes[ext] = len(packed)
+    return sizes
+
+
+def build(out_dir: Path) -> dict:
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+    for dirpath, dirnames, filenames in os.walk(ROOT):
+        rel_dir = Path(dirpath).relative_to(ROOT)
+        dirnames[:] = sorted(d for d in dirnames if not _skipped(rel_dir / d, out_dir))
+        (out_dir / rel_dir).mkdir(parents=True, exist_ok=True)
+        for name in filenames:
+            if not _skipped(rel_dir / name, out_dir):
+                shutil.copy2(Path(dirpath) / name, out_dir / rel_dir / name)
+
+    graph = AssetGraph(ROOT)
+    pages = sorted(page for page_dir in PAGE_DIRS for page in (ROOT / page_dir).glob("*.html"))
+    page_content = {page: graph.rewrite(page) for page in pages}
+
+    assets: dict[str, dict] = {}
+    for source, hashed in sorted(graph.hashed.items()):
+        data = graph.content[source]
+        rel, hashed_rel = source.relative_to(ROOT), hashed.relative_to(ROOT)
+        (out_dir / rel).write_bytes(data)
+        (out_dir / hashed_rel).write_bytes(data)
+        assets[rel.as_posix()] = {
+            "file": hashed_rel.as_posix(),
+            "size": len(data),
+            **_compressed_siblings(out_dir / hashed_rel, data),
+        }
+    for page, data in page_content.items():
+        target = out_dir / page.relative_to(ROOT)
+        target.write_bytes(data)
+        _compressed_siblings(target, data)
+
+    manifest = {"hashLength": HASH_LENGTH, "brotli": brotli is not None, "assets": assets}
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    rules = [f"/{entry['file']}\n  Cache-Control: {IMMUTABLE}\n" for entry in assets.values()]
+    (out_dir / "_headers").write_text("\n".join(rules), encoding="utf-8")
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"output directory, replaced on every run (default {DEFAULT_OUT.name}/)")
+    args = parser.parse_args(argv)
+    out_dir = args.out.resolve()
+    manifest = build(out_dir)
+    assets = manifest["assets"].values()
+    raw = sum(a["size"] for a in assets)
+    gz = sum(a.get("gz", a["size"]) for a in assets)
+    print(f"Fingerprinted {len(manifest['assets'])} assets into {out_dir} ({raw} bytes, {gz} gzipped)")
+    if brotli is None:
+        print("brotli not installed: skipped .br siblings (pip install brotli)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""SQLite catalog that holds every pipeline-managed collection.
+
+Each collection is a table keyed by its natural ID (YouTube ID for videos, "id" for the
+rest) with the published JSON object kept verbatim in a data column, its position in
+the published file, and the fields worth querying pulled out into indexed columns.
+Transcript lines get a table of their own. One FTS5 table, kept current by triggers,
+covers joke text, video titles and descriptions and transcript lines.
+
+Ad-hoc questions become plain SQL, e.g. jokes with a guest that have a video:
+
+    SELECT j.data, v.title FROM jokes j JOIN videos v ON v.video_id = j.video_id
+    WHERE j.guest = 'Bob Einstein'
+"""
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from json_stream import iter_json_array
+from video_store import VideoStore, extract_video_id
+
+SCHEMA_VERSION = 1
+PAGE_SIZE = 500
+_BARE_VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+CREATE TABLE IF NOT EXISTS jokes (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    episode TEXT NOT NULL,
+    guest TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    joke TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jokes_position ON jokes (position);
+CREATE INDEX IF NOT EXISTS jokes_guest ON jokes (guest);
+CREATE INDEX IF NOT EXISTS jokes_episode ON jokes (episode);
+CREATE INDEX IF NOT EXISTS jokes_video_id ON jokes (video_id);
+
+CREATE TABLE IF NOT EXISTS videos (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    category TEXT NOT NULL,
+    views_int INTEGER NOT NULL,
+    duration_seconds INTEGER NOT NULL,
+    publish_year TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_position ON videos (position);
+CREATE INDEX IF NOT EXISTS videos_video_id ON videos (video_id);
+CREATE INDEX IF NOT EXISTS videos_category ON videos (category);
+CREATE INDEX IF NOT EXISTS videos_channel ON videos (channel);
+CREATE INDEX IF NOT EXISTS videos_views ON videos (views_int);
+CREATE INDEX IF NOT EXISTS videos_duration ON videos (duration_seconds);
+
+CREATE TABLE IF NOT EXISTS nml_episodes (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    season INTEGER,
+    episode INTEGER,
+    guest TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nml_episodes_position ON nml_episodes (position);
+CREATE INDEX IF NOT EXISTS nml_episodes_guest ON nml_episodes (guest);
+CREATE INDEX IF NOT EXISTS nml_episodes_video_id ON nml_episodes (video_id);
+
+CREATE TABLE IF NOT EXISTS transcripts (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_position ON transcripts (position);
+
+CREATE TABLE IF NOT EXISTS transcript_lines (
+    transcript_key TEXT NOT NULL REFERENCES transcripts (key) ON DELETE CASCADE,
+    line_no INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (transcript_key, line_no)
+);
+
+-- FTS rowids are the source rowid * 4 + a per-table tag, so triggers update in O(log n).
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5 (
+    collection UNINDEXED,
+    key UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS jokes_ai AFTER INSERT ON jokes BEGIN
+    INSERT INTO search (rowid, collection, key, title, body)
+    VALUES (new.rowid * 4 + 1, 'jokes', new.key, new.guest, new.joke);
+END;
+CREATE TRIGGER IF NOT EXISTS jokes_ad AFTER DELETE ON jokes BEGIN
+    DELETE FROM search WHERE rowid = old.rowid * 4 + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS jokes_au AFTER UPDATE ON jokes BEGIN
+    DELETE FROM search WHERE rowid = old.rowid * 4 + 1;
+    INSERT INTO search (rowid, collection, key, title, body)
+    VALUES (new.rowid * 4 + 1, 'jokes', new.key, new.guest, new.joke);
+END;
+
+CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+    INSERT INTO search (rowid, collection, key, title, body)
+    VALUES (new.rowid * 4 + 2, 'videos', new.key, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+    DELETE FROM search WHERE rowid = old.rowid * 4 + 2;
+END;
+CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE ON videos BEGIN
+    DELETE FROM search WHERE rowid = old.rowid * 4 + 2;
+    INSERT INTO search (rowid, collection, key, title, body)
+    VALUES (new.rowid * 4 + 2, 'videos', new.key, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcript_lines_ai AFTER INSERT ON transcript_lines BEGIN
+    INSERT INTO search (rowid, collection, key, title, body)
+    VALUES (new.rowid * 4 + 3, 'transcripts', new.transcript_key || '#' || new.line_no, new.speaker, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS transcript_lines_ad AFTER DELETE ON transcript_lines BEGIN
+    DELETE FROM search WHERE rowid = old.rowid * 4 + 3;
+END;
+"""
+
+
+def _text(value: object) -> str:
+    return "" if value is None else str(value)
+
+
+def _int_or_none(value: object) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def linked_video_id(value: object) -> str:
+    """YouTube ID from a watch/youtu.be/shorts URL or a bare 11-character ID."""
+    text = _text(value).strip()
+    return extract_video_id(text) or (text if _BARE_VIDEO_ID.fullmatch(text) else "")
+
+
+def _joke_columns(row: dict) -> dict:
+    return {
+        "episode": _text(row.get("episode")),
+        "guest": _text(row.get("guest")),
+        "video_id": linked_video_id(row.get("url")),
+        "joke": _text(row.get("joke")),
+    }
+
+
+def _video_columns(row: dict) -> dict:
+    return {
+        "video_id": extract_video_id(_text(row.get("Video url"))),
+        "title": _text(row.get("Title")),
+        "description": _text(row.get("Description")),
+        "channel": _text(row.get("Channel name")),
+        "category": _text(row.get("category")),
+        "views_int": _int_or_none(row.get("views_int")) or 0,
+        "duration_seconds": _int_or_none(row.get("duration_seconds")) or 0,
+        "publish_year": _text(row.get("publish_year_guess")),
+    }
+
+
+def _nml_columns(row: dict) -> dict:
+    return {
+        "season": _int_or_none(row.get("season")),
+        "episode": _int_or_none(row.get("episode")),
+        "guest": _text(row.get("guest")),
+        "video_id": linked_video_id(row.get("youtube_url")),
+    }
+
+
+def _transcript_columns(row: dict) -> dict:
+    return {"title": _text(row.get("title")), "type": _text(row.get("type"))}
+
+
+def _id_key(row: dict) -> str:
+    return _text(row.get("id"))
+
+
+# collection -> (table, key function, indexed-column extractor)
+COLLECTIONS: dict[str, tuple[str, Callable[[dict], str], Callable[[dict], dict]]] = {
+    "jokes": ("jokes", _id_key, _joke_columns),
+    "videos": ("videos", VideoStore.key, _video_columns),
+    "nml": ("nml_episodes", _id_key, _nml_columns),
+    "transcripts": ("transcripts", _id_key, _transcript_columns),
+}
+
+
+class Catalog:
+    """The collections in one SQLite file; rows go in and come out as published JSON objects."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        if _int_or_none(self._meta("schema_version")) != SCHEMA_VERSION:
+            self._reset()
+        self.conn.executescript(SCHEMA)
+        self._set_meta("schema_version", str(SCHEMA_VERSION))
+        self.conn.commit()
+
+    def _reset(self) -> None:
+        # The catalog is rebuilt from the published JSON, so an old layout is just dropped.
+        tables = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'search_%'"
+        ).fetchall()
+        for (name,) in tables:
+            self.conn.execute(f"DROP TABLE IF EXISTS {name}")
+
+    def _meta(self, name: str) -> str | None:
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: str) -> None:
+        self.conn.execute("INSERT INTO meta (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value))
+
+    def digest(self, collection: str) -> str | None:
+        """Digest of the JSON file the collection was last imported from or exported to."""
+        return self._meta(f"digest:{collection}")
+
+    def set_digest(self, collection: str, digest: str) -> None:
+        self._set_meta(f"digest:{collection}", digest)
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> Catalog:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _upsert(self, collection: str, row: dict, position: int | None) -> str:
+        table, key_fn, columns_fn = COLLECTIONS[collection]
+        key = key_fn(row)
+        if not key:
+            raise ValueError(f"{collection} row has no key: {row!r}")
+        columns = columns_fn(row)
+        stored = row
+        if collection == "transcripts":
+            # Lines live in transcript_lines; the data column keeps a placeholder for their slot.
+            stored = {name: (None if name == "content" else value) for name, value in row.items()}
+        names = ["key", *columns, "data"]
+        values = [key, *columns.values(), json.dumps(stored, ensure_ascii=False)]
+        if position is None:
+            position_sql = f"(SELECT COALESCE(MAX(position), -1) + 1 FROM {table})"
+        else:
+            position_sql = "?"
+            values.append(position)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        self.conn.execute(
+            f"INSERT INTO {table} ({', '.join(names)}, position) VALUES ({', '.join('?' * len(names))}, {position_sql}) "
+            f"ON CONFLICT (key) DO UPDATE SET {updates}",
+            values,
+        )
+        if collection == "transcripts":
+            self.conn.execute("DELETE FROM transcript_lines WHERE transcript_key = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO transcript_lines (transcript_key, line_no, speaker, text) VALUES (?, ?, ?, ?)",
+                (
+                    (key, n, _text(line.get("speaker")), _text(line.get("text")))
+                    for n, line in enumerate(row.get("content") or [])
+                ),
+            )
+        return key
+
+    def upsert(self, collection: str, row: dict) -> str:
+        """Insert or update one row by key; a new row goes to the end of the collection."""
+        with self.conn:
+            return self._upsert(collection, row, None)
+
+    def upsert_many(self, collection: str, rows: Iterable[dict]) -> int:
+        count = 0
+        with self.conn:
+            for row in rows:
+                self._upsert(collection, row, None)
+                count += 1
+        return count
+
+    def replace(self, collection: str, rows: Iterable[dict]) -> int:
+        """Make the collection exactly rows, in that order."""
+        table = COLLECTIONS[collection][0]
+        count = 0
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            for count, row in enumerate(rows, 1):
+                self._upsert(collection, row, count - 1)
+        return count
+
+    def import_json(self, collection: str, path: Path) -> int:
+        rows: Iterable[dict] = iter_json_array(path)
+        if collection == "videos":
+            # The hand-merged file can list a video more than once; fold those the way the
+            # _tools merges do before the ID becomes a primary key.
+            store = VideoStore()
+            store.upsert_many(rows, "consolidated")
+            if store.unkeyed:
+                raise ValueError(f"{path.name}: {len(store.unkeyed)} videos rows have no key: {store.unkeyed[0]!r}")
+            rows = store.records.values()
+        return self.replace(collection, rows)
+
+    def _row(self, collection: str, key: str, data: str) -> dict:
+        row = json.loads(data)
+        if collection == "transcripts" and "content" in row:
+            row["content"] = [
+                {"speaker": speaker, "text": text}
+                for speaker, text in self.conn.execute(
+                    "SELECT speaker, text FROM transcript_lines WHERE transcript_key = ? ORDER BY line_no", (key,)
+                )
+            ]
+        return row
+
+    def rows(self, collection: str) -> Iterator[dict]:
+        """Every row in published order, read a page at a time so callers may upsert as they go."""
+        table = COLLECTIONS[collection][0]
+        last = -1
+        while True:
+            page = self.conn.execute(
+                f"SELECT position, key, data FROM {table} WHERE position > ? ORDER BY position LIMIT ?", (last, PAGE_SIZE)
+            ).fetchall()
+            for position, key, data in page:
+                yield self._row(collection, key, data)
+            if len(page) < PAGE_SIZE:
+                return
+            last = page[-1][0]
+
+    @staticmethod
+    def key(collection: str, row: dict) -> str:
+        return COLLECTIONS[collection][1](row)
+
+    def get(self, collection: str, key: str) -> dict | None:
+        table = COLLECTIONS[collection][0]
+        found = self.conn.execute(f"SELECT data FROM {table} WHERE key = ?", (key,)).fetchone()
+        return self._row(collection, key, found[0]) if found else None
+
+    def count(self, collection: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {COLLECTIONS[collection][0]}").fetchone()[0]
+
+    def search(self, query: str, collection: str | None = None, limit: int = 20) -> list[dict]:
+        """Full-text matches, best first: collection, key, title, body and a highlighted snippet."""
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        # Every word must match; the last one as a prefix so partially typed queries work.
+        terms = " ".join(f'"{word}"' for word in words) + "*"
+        sql = (
+            "SELECT collection, key, title, body, snippet(search, 3, '[', ']', '...', 12) FROM search "
+            "WHERE search MATCH ?"
+        )
+        params: list[object] = [terms]
+        if collection:
+            sql += " AND collection = ?"
+            params.append(collection)
+        sql += " ORDER BY bm25(search, 0, 0, 3.0, 1.0) LIMIT ?"
+        params.append(limit)
+        return [
+            {"collection": c, "key": k, "title": t, "body": b, "snippet": s}
+            for c, k, t, b, s in self.conn.execute(sql, params)
+        ]
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Record the archive site once, then replay it locally to test and benchmark scrape.py.
+
+    python competitor_data/replay.py record --archive fixtures/site.jsonl.gz
+    python competitor_data/replay.py serve --archive fixtures/site.jsonl.gz --latency 0.05 --error-rate 0.02
+    python competitor_data/replay.py bench --archive fixtures/site.jsonl.gz -- --concurrency 16
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import scrape
+
+DEFAULT_ARCHIVE = Path("competitor_data/fixtures/normmacdonaldarchive.jsonl.gz")
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+TEXT_TYPES = ("text/", "application/xml", "application/json", "application/javascript")
+
+
+class FixtureWriter:
+    """Gzipped JSONL archive: a header line with the recorded origin, then one line per response."""
+
+    def __init__(self, path: Path, origin: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.count = 0
+        header = {"origin": origin, "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        self._fh.write(json.dumps(header) + "\n")
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        parts = urlsplit(url)
+        entry: Dict[str, object] = {
+            "path": (parts.path or "/") + (f"?{parts.query}" if parts.query else ""),
+            "status": status,
+            "headers": headers,
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode("ascii")
+        with self._lock:
+            self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.count += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def load_fixtures(path: Path) -> Tuple[str, Dict[str, Dict[str, object]]]:
+    """Recorded origin and path -> response; a path recorded twice keeps its last response."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        origin = json.loads(fh.readline())["origin"]
+        entries = {}
+        for line in fh:
+            entry = json.loads(line)
+            if "body_b64" in entry:
+                entry["body"] = base64.b64decode(entry.pop("body_b64"))
+            else:
+                entry["body"] = entry["body"].encode("utf-8")
+            entries[entry["path"]] = entry
+    return origin, entries
+
+
+class RecordingPool(scrape.HTTPPool):
+    def __init__(self, writer: FixtureWriter) -> None:
+        super().__init__()
+        self.writer = writer
+
+    def get(self, url: str, headers: Dict[str, str]):
+        status, resp_headers, body = super().get(url, headers)
+        kept = {name: resp_headers[name] for name in RECORDED_HEADERS if resp_headers.get(name)}
+        self.writer.add(url, status, kept, body)
+        return status, resp_headers, body
+
+
+class RequestLimiter:
+    """Server-side token bucket; rate <= 0 disables it."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        archive: Path,
+        latency: float = 0.0,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        rate: float = 0.0,
+        burst: int = 1,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(address, ReplayHandler)
+        self.origin, self.entries = load_fixtures(archive)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = RequestLimiter(rate, burst)
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "served": 0, "not_modified": 0, "injected": 0, "limited": 0}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> Tuple[float, bool]:
+        with self.random_lock:
+            delay = self.latency * self.random.uniform(1 - self.jitter, 1 + self.jitter) if self.latency > 0 else 0.0
+            return delay, self.random.random() < self.error_rate
+
+    def count(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReplayServer
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.count("requests")
+        if not server.limiter.allow():
+            server.count("limited")
+            self._send(429, {"Retry-After": "1"})
+            return
+        delay, fail = server.draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            server.count("injected")
+            self._send(503, {"Retry-After": "1"})
+            return
+
+        entry = server.entries.get(self.path)
+        if entry is None:
+            self._send(404, {})
+            return
+        headers = dict(entry["headers"])
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            server.count("not_modified")
+            self._send(304, {"ETag": etag})
+            return
+
+        body = entry["body"]
+        if headers.get("Content-Type", "text/").startswith(TEXT_TYPES):
+            # Absolute links (sitemap locs, hub links) should point back at this server.
+            body = body.replace(server.origin.encode("utf-8"), f"http://{self.headers.get('Host')}".encode("utf-8"))
+        if "gzip" in (self.headers.get("Accept-Encoding") or "") and len(body) > 512:
+            body = gzip.compress(body, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        server.count("served")
+        self._send(int(entry["status"]), headers, body)
+
+
+def record(args: argparse.Namespace) -> None:
+    writer = FixtureWriter(args.archive, args.base_url.rstrip("/"))
+    scrape.HTTP_POOL = RecordingPool(writer)
+    out_dir = args.out_dir or Path(tempfile.mkdtemp(prefix="scrape-record-"))
+    try:
+        scrape.main(["--base-url", args.base_url, "--out-dir", str(out_dir), "--no-cache", *args.scrape_args])
+    finally:
+        writer.close()
+    print(f"Recorded {writer.count} responses to {args.archive}", flush=True)
+
+
+def make_server(args: argparse.Namespace, port: int) -> ReplayServer:
+    return ReplayServer(
+        ("127.0.0.1", port),
+        args.archive,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate=args.server_rate,
+        burst=args.server_burst,
+        seed=args.seed,
+    )
+
+
+def serve(args: argparse.Namespace) -> None:
+    server = make_server(args, args.port)
+    print(f"Replaying {len(server.entries)} responses recorded from {server.origin} at {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def peak_child_rss_mb() -> float:
+    # ru_maxrss is the largest single child (main scraper or one parse worker); KB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench(args: argparse.Namespace) -> None:
+    server = make_server(args, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    out_dir = Path(tempfile.mkdtemp(prefix="scrape-bench-"))
+    cmd = [
+        sys.executable,
+        str(Path(scrape.__file__)),
+        "--base-url",
+        server.base_url,
+        "--out-dir",
+        str(out_dir),
+        "--no-cache",
+        "--rate",
+        "0",
+        *args.scrape_args,
+    ]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL if args.quiet else None)
+    wall = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+    if result.returncode != 0:
+        raise SystemExit(f"scrape.py exited with {result.returncode}")
+
+    appearances = json.loads((out_dir / "appearances.json").read_text(encoding="utf-8"))
+    ok = sum(1 for a in appearances if not a.get("error"))
+    report = {
+        "pages": len(appearances),
+        "pages_ok": ok,
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(len(appearances) / wall, 2) if wall else None,
+        "peak_rss_mb": round(peak_child_rss_mb(), 1),
+        "server": server.stats,
+    }
+    run_report = out_dir / "run_report.json"
+    if run_report.exists():
+        report["phase_seconds"] = json.loads(run_report.read_text(encoding="utf-8")).get("phase_seconds")
+    print(json.dumps(report, indent=2), flush=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record/replay harness for competitor_data/scrape.py.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="crawl the live site and save every response")
+    rec.add_argument("--base-url", default=scrape.BASE_URL)
+    rec.add_argument("--out-dir", type=Path, default=None, help="where the recording crawl writes its outputs")
+
+    replay_args = argparse.ArgumentParser(add_help=False)
+    replay_args.add_argument("--latency", type=float, default=0.0, help="mean seconds added to every response")
+    replay_args.add_argument("--jitter", type=float, default=0.5, help="latency varies by +/- this fraction")
+    replay_args.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    replay_args.add_argument("--server-rate", type=float, default=0.0, help="requests/s before answering 429 (0 = off)")
+    replay_args.add_argument("--server-burst", type=int, default=1)
+    replay_args.add_argument("--seed", type=int, default=None, help="make latency and error injection repeatable")
+
+    srv = sub.add_parser("serve", parents=[replay_args], help="serve a recording on localhost")
+    srv.add_argument("--port", type=int, default=8000)
+
+    bch = sub.add_parser("bench", parents=[replay_args], help="time a full scrape against a local replay")
+    bch.add_argument("--quiet", action="store_true", help="hide the scraper's own output")
+
+    for p in (rec, srv, bch):
+        p.add_argument("--archive", type=Path, default=DEFAULT_ARCHIVE)
+    for p in (rec, bch):
+        p.add_argument("scrape_args", nargs=argparse.REMAINDER, help="extra scrape.py options, after --")
+
+    args = parser.parse_args(argv)
+    if getattr(args, "scrape_args", None) and args.scrape_args[0] == "--":
+        args.scrape_args = args.scrape_args[1:]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    {"record": record, "serve": serve, "bench": bench}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
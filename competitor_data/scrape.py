@@ -1,77 +1,673 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import asyncio
+import gzip
+import hashlib
 import html
+import http.client
 import json
+import math
+import multiprocessing
+import os
 import re
+import ssl
+import sys
+import threading
 import time
 import urllib.error
-import urllib.request
 import xml.etree.ElementTree as ET
-from collections import Counter
-from datetime import datetime
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from json_stream import JsonArrayWriter  # noqa: E402
+
+try:
+    import brotli  # optional: lets servers answer with Content-Encoding: br
+except ImportError:
+    brotli = None
 
 BASE_URL = "https://normmacdonaldarchive.com"
 SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
 UA = "Mozilla/5.0"
 RATE_LIMIT_SECONDS = 1.0
+CONCURRENCY = 8
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+PAGE_QUEUE_SIZE = 32
+# Adaptive pacing: halve a host's rate when it pushes back, creep back up while it is healthy.
+THROTTLE_STATUSES = {403, 429, 503}
+BACKOFF_FACTOR = 0.5
+ADDITIVE_STEP = 0.05
+MIN_RATE = 0.05
+UNLIMITED_BACKOFF_RATE = 4.0
+MAX_RETRY_AFTER = 300.0
+MAX_FETCH_ATTEMPTS = 4
+RETRY_DELAY_SECONDS = 2.0
 OUT_DIR = Path("competitor_data")
 
 CATEGORY_HUB_PATHS = ["/nml", "/standup", "/blue-card-jokes", "/bucket-list", "/the-list"]
-_last_request_ts = 0.0
+
+
+class ResponseCache:
+    """Bodies and validators (ETag / Last-Modified) of earlier responses, one file per URL."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str) -> None:
+        """Bump a stats counter; the fetch threads share the cache."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"url": url, "etag": etag, "last_modified": last_modified, "body": body}
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+
+# Set from the command line in main(); offline mode serves only from the cache.
+HTTP_CACHE: Optional[ResponseCache] = None
+OFFLINE = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense; the last bucket is +Inf."""
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, running = [], 0
+        for bound, n in zip([f"{b:g}" for b in self.bounds] + ["+Inf"], self.counts):
+            running += n
+            out.append((bound, running))
+        return out
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": dict(self.cumulative())}
+
+
+class CrawlMetrics:
+    """Timings and counters for one run, written as run_report.json and metrics.prom."""
+
+    LATENCY_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    PARSE_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.phases: Dict[str, float] = {}
+        self.counters: Counter = Counter()
+        self.status_codes: Counter = Counter()
+        self.latency = Histogram(self.LATENCY_BOUNDS)
+        self.parse: Dict[str, Histogram] = {}
+        self._phase: Optional[Tuple[str, float]] = None
+        self._lock = threading.Lock()
+
+    def phase(self, name: Optional[str]) -> None:
+        """Close the running phase and, unless name is None, start the next one."""
+        now = time.perf_counter()
+        if self._phase:
+            label, started = self._phase
+            self.phases[label] = self.phases.get(label, 0.0) + now - started
+        self._phase = (name, now) if name else None
+
+    def observe_request(self, seconds: float, status: object) -> None:
+        with self._lock:
+            self.latency.observe(seconds)
+            self.status_codes[str(status)] += 1
+
+    def observe_parse(self, extractor: str, seconds: float) -> None:
+        with self._lock:
+            if extractor not in self.parse:
+                self.parse[extractor] = Histogram(self.PARSE_BOUNDS)
+            self.parse[extractor].observe(seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def report(self, extra: Dict[str, int]) -> Dict[str, object]:
+        return {
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+            "wall_seconds": round(time.time() - self.started, 3),
+            "phase_seconds": {k: round(v, 3) for k, v in self.phases.items()},
+            "counters": dict(sorted({**self.counters, **extra}.items())),
+            "http_status_codes": dict(sorted(self.status_codes.items())),
+            "http_request_seconds": self.latency.as_dict(),
+            "parse_seconds": {k: h.as_dict() for k, h in sorted(self.parse.items())},
+        }
+
+    def prometheus(self, extra: Dict[str, int]) -> str:
+        lines = [
+            "# HELP scrape_phase_seconds Wall time spent in each scraper phase.",
+            "# TYPE scrape_phase_seconds gauge",
+        ]
+        lines += [f'scrape_phase_seconds{{phase="{k}"}} {v:.6f}' for k, v in self.phases.items()]
+        lines += ["# HELP scrape_events_total Scraper counters (requests, retries, bytes, cache hits).", "# TYPE scrape_events_total counter"]
+        lines += [f'scrape_events_total{{event="{k}"}} {v}' for k, v in sorted({**self.counters, **extra}.items())]
+        lines += ["# HELP scrape_http_responses_total HTTP responses by status code.", "# TYPE scrape_http_responses_total counter"]
+        lines += [f'scrape_http_responses_total{{code="{k}"}} {v}' for k, v in sorted(self.status_codes.items())]
+        lines += _prometheus_histogram("scrape_http_request_seconds", "HTTP request latency.", {"": self.latency})
+        lines += _prometheus_histogram(
+            "scrape_parse_seconds", "Time spent in each page extractor.", {f'extractor="{k}"': h for k, h in sorted(self.parse.items())}
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_histogram(name: str, help_text: str, series: Dict[str, Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, hist in series.items():
+        prefix = f"{labels}," if labels else ""
+        lines += [f'{name}_bucket{{{prefix}le="{le}"}} {n}' for le, n in hist.cumulative()]
+        suffix = f"{{{labels}}}" if labels else ""
+        lines += [f"{name}_sum{suffix} {hist.sum:.6f}", f"{name}_count{suffix} {hist.count}"]
+    return lines
+
+
+METRICS = CrawlMetrics()
+
+
+def decode_body(data: bytes, content_encoding: Optional[str]) -> bytes:
+    # Encodings are listed in the order they were applied, so undo them last to first.
+    for coding in reversed([c.strip().lower() for c in (content_encoding or "").split(",") if c.strip()]):
+        if coding in {"gzip", "x-gzip"}:
+            data = gzip.decompress(data)
+        elif coding == "deflate":
+            try:
+                data = zlib.decompress(data)
+            except zlib.error:  # raw deflate without the zlib header, as some servers send it
+                data = zlib.decompress(data, -zlib.MAX_WBITS)
+        elif coding == "br" and brotli is not None:
+            data = brotli.decompress(data)
+        elif coding != "identity":
+            raise ValueError(f"unsupported Content-Encoding: {coding}")
+    return data
+
+
+class HTTPPool:
+    """Keep-alive HTTP/1.1 connections, pooled per scheme and host and shared by the fetch threads."""
+
+    REDIRECTS = {301, 302, 303, 307, 308}
+
+    def __init__(self, timeout: float = 45, max_redirects: int = 5) -> None:
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.accept_encoding = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+        self.stats: Counter = Counter()
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+
+    def _connect(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle[(scheme, netloc)]
+            if idle:
+                return idle.pop(), True
+            self.stats["connections"] += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _count(self, **amounts: int) -> None:
+        with self._lock:
+            self.stats.update(amounts)
+
+    def _release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle[(scheme, netloc)].append(conn)
+
+    def _send(self, url: str, headers: Dict[str, str]) -> Tuple[http.client.HTTPResponse, bytes]:
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        while True:
+            conn, reused = self._connect(parts.scheme, parts.netloc)
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive connection; retry on a fresh one.
+                    continue
+                METRICS.observe_request(time.perf_counter() - started, "error")
+                raise
+            METRICS.observe_request(time.perf_counter() - started, resp.status)
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(parts.scheme, parts.netloc, conn)
+            self._count(requests=1, reused=int(reused), wire_bytes=len(raw))
+            return resp, raw
+
+    def get(self, url: str, headers: Dict[str, str]) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        headers = {"Accept-Encoding": self.accept_encoding, **headers}
+        for _ in range(self.max_redirects + 1):
+            resp, raw = self._send(url, headers)
+            location = resp.getheader("Location")
+            if resp.status in self.REDIRECTS and location:
+                url = urljoin(url, location)
+                continue
+            body = decode_body(raw, resp.getheader("Content-Encoding"))
+            self._count(decoded_bytes=len(body))
+            return resp.status, resp.headers, body
+        raise urllib.error.URLError(f"more than {self.max_redirects} redirects")
+
+
+HTTP_POOL = HTTPPool()
 
 
 def ensure_out_dir() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def polite_sleep() -> None:
-    global _last_request_ts
-    elapsed = time.time() - _last_request_ts
-    if elapsed < RATE_LIMIT_SECONDS:
-        time.sleep(RATE_LIMIT_SECONDS - elapsed)
+class OfflineMiss(LookupError):
+    """An --offline run asked for a URL the response cache does not hold; retrying cannot help."""
+
+
+def http_get(url: str) -> str:
+    cached = HTTP_CACHE.get(url) if HTTP_CACHE else None
+    if OFFLINE:
+        if cached is None:
+            raise OfflineMiss("not in the response cache (offline mode)")
+        HTTP_CACHE.count("offline")
+        return cached["body"] or ""
+
+    headers = {"User-Agent": UA}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    status, resp_headers, raw = HTTP_POOL.get(url, headers)
+    if status == 304 and cached is not None:
+        HTTP_CACHE.count("not_modified")
+        return cached["body"] or ""
+    if status >= 300:
+        raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""), resp_headers, None)
+    body = raw.decode("utf-8", errors="replace")
+    if HTTP_CACHE:
+        HTTP_CACHE.put(url, body, resp_headers.get("ETag"), resp_headers.get("Last-Modified"))
+        HTTP_CACHE.count("downloaded")
+    return body
+
+
+class TokenBucket:
+    """Paces one host at `rate` requests per second with bursts of up to `burst`.
+
+    The rate is adjusted AIMD-style: speed_up() adds ADDITIVE_STEP up to the
+    ceiling, slow_down() multiplies by BACKOFF_FACTOR and can pause the host
+    for a server-supplied Retry-After.  rate <= 0 starts unlimited.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.ceiling = rate if rate > 0 else math.inf
+        self.rate = self.ceiling
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = -math.inf
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if math.isinf(self.rate):
+                    return
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def speed_up(self) -> None:
+        if not math.isinf(self.rate):
+            self.rate = min(self.ceiling, self.rate + ADDITIVE_STEP)
+
+    def slow_down(self, retry_after: Optional[float] = None) -> bool:
+        now = time.monotonic()
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        # Requests already in flight when the host pushed back report together; count them once.
+        window = 1.0 if math.isinf(self.rate) else max(1.0, 1.0 / self.rate)
+        if now - self.last_decrease < window:
+            return False
+        self.last_decrease = now
+        current = UNLIMITED_BACKOFF_RATE if math.isinf(self.rate) else self.rate
+        self.rate = max(MIN_RATE, current * BACKOFF_FACTOR)
+        self.tokens = min(self.tokens, 0.0)
+        self.updated = now
+        return True
 
 
-def fetch_url(url: str, retries_403: int = 1) -> Optional[str]:
-    global _last_request_ts
-    attempts = 0
-    while attempts <= retries_403:
-        attempts += 1
-        polite_sleep()
-        req = urllib.request.Request(url, headers={"User-Agent": UA})
+class HostRateLimiter:
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        await self.bucket(url).acquire()
+
+    def succeeded(self, url: str) -> None:
+        self.bucket(url).speed_up()
+
+    def throttled(self, url: str, retry_after: Optional[float] = None) -> None:
+        bucket = self.bucket(url)
+        METRICS.count("throttled")
+        if bucket.slow_down(retry_after):
+            pause = f", pausing {retry_after:.0f}s" if retry_after else ""
+            print(f"  {urlsplit(url).netloc} is throttling; slowing to {bucket.rate:.2f} req/s{pause}", flush=True)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
         try:
-            with urllib.request.urlopen(req, timeout=45) as resp:
-                body = resp.read().decode("utf-8", errors="replace")
-                _last_request_ts = time.time()
-                return body
-        except urllib.error.HTTPError as exc:
-            _last_request_ts = time.time()
-            if exc.code == 403 and attempts <= retries_403:
-                print(f"403 for {url}; retrying once after 3s", flush=True)
-                time.sleep(3)
-                continue
-            print(f"HTTP {exc.code} for {url}; skipping", flush=True)
-            return None
-        except Exception as exc:  # noqa: BLE001
-            _last_request_ts = time.time()
-            print(f"Request error for {url}: {exc}; skipping", flush=True)
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
             return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def robots_crawl_delay(robots_txt: str, user_agent: str = UA) -> Optional[float]:
+    """Seconds between requests asked for by robots.txt (Crawl-delay or Request-rate), if any.
+
+    Parsed by hand because urllib.robotparser ignores fractional Crawl-delay values.
+    """
+    delays: Dict[str, float] = {}
+    agents: List[str] = []
+    in_rules = False
+    for line in robots_txt.splitlines():
+        key, _, value = line.split("#", 1)[0].partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if key == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+            continue
+        if not key:
+            continue
+        in_rules = True
+        delay = None
+        try:
+            if key == "crawl-delay":
+                delay = float(value)
+            elif key == "request-rate":
+                requests, _, seconds = value.partition("/")
+                delay = float(seconds.rstrip("s")) / float(requests)
+        except (ValueError, ZeroDivisionError):
+            delay = None
+        if delay is not None and delay >= 0:
+            for agent in agents:
+                delays.setdefault(agent, delay)
+    ua = user_agent.lower()
+    for agent, delay in delays.items():
+        if agent != "*" and agent in ua:
+            return delay
+    return delays.get("*")
+
+
+async def fetch_url_async(url: str, limiter: HostRateLimiter) -> Tuple[Optional[str], bool]:
+    """One paced attempt with the blocking request on a worker thread.
+
+    Returns (body, retryable); body is None when the attempt failed.
+    """
+    await limiter.acquire(url)
+    try:
+        body = await asyncio.to_thread(http_get, url)
+    except urllib.error.HTTPError as exc:
+        if exc.code in THROTTLE_STATUSES:
+            limiter.throttled(url, parse_retry_after(exc.headers.get("Retry-After") if exc.headers else None))
+            return None, True
+        print(f"HTTP {exc.code} for {url}", flush=True)
+        return None, exc.code >= 500
+    except OfflineMiss as exc:
+        print(f"Request error for {url}: {exc}", flush=True)
+        return None, False
+    except Exception as exc:  # noqa: BLE001
+        print(f"Request error for {url}: {exc}", flush=True)
+        return None, True
+    limiter.succeeded(url)
+    return body, False
+
+
+async def fetch_with_retries(url: str, limiter: HostRateLimiter, max_attempts: int = MAX_FETCH_ATTEMPTS) -> Optional[str]:
+    """fetch_url_async, retrying throttled and transient failures with a growing delay."""
+    for attempt in range(1, max_attempts + 1):
+        body, retryable = await fetch_url_async(url, limiter)
+        if body is not None or not retryable or attempt == max_attempts:
+            return body
+        METRICS.count("retries")
+        print(f"  will retry {url} (attempt {attempt + 1}/{max_attempts})", flush=True)
+        await asyncio.sleep(RETRY_DELAY_SECONDS * attempt)
+    return None
+
+
+def fetch_url(url: str, limiter: HostRateLimiter) -> Optional[str]:
+    """Blocking fetch for the one-off pages (robots.txt, sitemaps, hubs, homepage).
+
+    Goes through the same per-host limiter and retry rules as the appearance crawl.
+    """
+    return asyncio.run(fetch_with_retries(url, limiter))
+
+
+PAGE_FIELDS = frozenset({"title", "meta", "headings", "nav", "links", "paragraphs", "next_payload"})
+APPEARANCE_ID_PREFIX = "appearance-"
+
+
+_FLIGHT_PUSH = re.compile(r"self\.__next_f\.push\(")
+_FLIGHT_ROW_HEAD = re.compile(rb"([0-9a-f]*):([A-Z]*)")
+_FLIGHT_REF = re.compile(r"\$([0-9a-f]+)")
+_JSON = json.JSONDecoder()
+
+
+class NextFlight:
+    """Rows of a Next.js App Router flight stream, split as chunks arrive and decoded on demand.
+
+    The stream is the concatenation of the strings in ``self.__next_f.push([1, "..."])``
+    calls.  Rows are ``<id>:<json>\\n`` or, for outlined text, ``<id>:T<hex bytes>,<text>``;
+    ``"$<id>"`` strings inside a row refer to other rows.
+    """
+
+    def __init__(self, id_prefix: str = APPEARANCE_ID_PREFIX) -> None:
+        self.rows: Dict[str, Tuple[str, bytes]] = {}
+        self.id_prefix = id_prefix
+        self.marker = json.dumps({"id": id_prefix}, separators=(",", ":"))[1:-2].encode("utf-8")
+        self.record: Optional[Dict[str, object]] = None
+        self._buffer = b""
+        self._values: Dict[str, object] = {}
+
+    def feed_script(self, script_text: str) -> None:
+        for m in _FLIGHT_PUSH.finditer(script_text):
+            try:
+                chunk, _ = _JSON.raw_decode(script_text, m.end())
+            except ValueError:
+                continue
+            if isinstance(chunk, list) and len(chunk) > 1 and chunk[0] == 1 and isinstance(chunk[1], str):
+                self._buffer += chunk[1].encode("utf-8")
+        self._split_rows()
+
+    def _split_rows(self) -> None:
+        buf, pos = self._buffer, 0
+        while True:
+            head = _FLIGHT_ROW_HEAD.match(buf, pos)
+            if not head:
+                break
+            row_id, tag = head.group(1).decode(), head.group(2).decode()
+            start = head.end()
+            if tag == "T":
+                comma = buf.find(b",", start)
+                if comma == -1:
+                    break
+                end = comma + 1 + int(buf[start:comma] or b"0", 16)
+                if end > len(buf):
+                    break
+                self._add_row(row_id, tag, buf[comma + 1 : end])
+                pos = end
+            else:
+                newline = buf.find(b"\n", start)
+                if newline == -1:
+                    break
+                self._add_row(row_id, tag, buf[start:newline])
+                pos = newline + 1
+        self._buffer = buf[pos:]
+
+    def _add_row(self, row_id: str, tag: str, data: bytes) -> None:
+        self.rows[row_id] = (tag, data)
+        if self.record is None and not tag and self.marker in data:
+            self.record = _find_record(self.value(row_id), self.id_prefix)
+
+    def value(self, row_id: str) -> object:
+        if row_id not in self._values:
+            tag, data = self.rows[row_id]
+            if tag == "T":
+                self._values[row_id] = data.decode("utf-8", "replace")
+            else:
+                try:
+                    self._values[row_id] = json.loads(data)
+                except ValueError:
+                    self._values[row_id] = None
+        return self._values[row_id]
+
+    def unresolved(self, node: object) -> bool:
+        if isinstance(node, str):
+            m = _FLIGHT_REF.fullmatch(node)
+            return bool(m) and m.group(1) not in self.rows
+        if isinstance(node, dict):
+            return any(self.unresolved(v) for v in node.values())
+        if isinstance(node, list):
+            return any(self.unresolved(v) for v in node)
+        return False
+
+    def resolve(self, node: object, depth: int = 8) -> object:
+        if isinstance(node, str) and node.startswith("$"):
+            m = _FLIGHT_REF.fullmatch(node)
+            if m:
+                if m.group(1) not in self.rows or depth == 0:
+                    return None
+                return self.resolve(self.value(m.group(1)), depth - 1)
+            if node.startswith("$$"):
+                return node[1:]
+            if node.startswith("$D"):
+                return node[2:]
+            if node == "$undefined":
+                return None
+            return node
+        if isinstance(node, dict):
+            return {k: self.resolve(v, depth) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self.resolve(v, depth) for v in node]
+        return node
+
+
+def _find_record(root: object, prefix: str) -> Optional[Dict[str, object]]:
+    """First dict, depth first, whose "id" starts with prefix (e.g. appearance-123)."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            node_id = node.get("id")
+            if isinstance(node_id, str) and node_id.startswith(prefix):
+                return node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
     return None
 
 
+class _StopParsing(Exception):
+    pass
+
+
 class PageParser(HTMLParser):
-    def __init__(self) -> None:
+    """One pass over a document, collecting only the requested artifacts.
+
+    ``until`` is checked after every tag; once it returns True the rest of the
+    document is skipped.  Next.js flight scripts are fed to ``self.flight`` as
+    they close; the ``__NEXT_DATA__`` script is kept as raw JSON text.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] = PAGE_FIELDS,
+        until: Optional[Callable[["PageParser"], bool]] = None,
+    ) -> None:
         super().__init__()
+        self.fields = frozenset(fields)
+        self.until = until
         self.title = ""
         self.metas: Dict[str, str] = {}
         self.nav_links: List[Dict[str, str]] = []
         self.links: List[Dict[str, str]] = []
         self.headings: List[Dict[str, str]] = []
         self.paragraphs: List[str] = []
+        self.flight = NextFlight()
+        self.next_data: Optional[str] = None
+        self.head_closed = False
 
+        self._want_links = bool(self.fields & {"links", "nav"})
         self._in_title = False
         self._title_parts: List[str] = []
         self._heading_tag: Optional[str] = None
@@ -82,34 +678,70 @@ class PageParser(HTMLParser):
         self._link_href: Optional[str] = None
         self._link_parts: List[str] = []
         self._link_in_nav = False
+        self._script_parts: Optional[List[str]] = None
+        self._script_is_next_data = False
+
+    def parse(self, html_text: str) -> "PageParser":
+        try:
+            self.feed(html_text)
+        except _StopParsing:
+            pass
+        return self
+
+    def _check_done(self) -> None:
+        if self.until is not None and self.until(self):
+            raise _StopParsing
 
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
-        attr = {k: (v or "") for k, v in attrs}
+        fields = self.fields
         if tag == "title":
-            self._in_title = True
+            self._in_title = "title" in fields
         elif tag == "meta":
-            name = attr.get("name") or attr.get("property")
-            content = attr.get("content", "")
-            if name and content:
-                self.metas[name.strip()] = content.strip()
+            if "meta" in fields:
+                attr = {k: (v or "") for k, v in attrs}
+                name = attr.get("name") or attr.get("property")
+                content = attr.get("content", "")
+                if name and content:
+                    self.metas[name.strip()] = content.strip()
+        elif tag == "body":
+            self.head_closed = True
+        elif tag == "script":
+            if "next_payload" in fields:
+                self._script_parts = []
+                self._script_is_next_data = dict(attrs).get("id") == "__NEXT_DATA__"
         elif tag == "nav":
             self._nav_depth += 1
         elif tag in {"h1", "h2", "h3"}:
-            self._heading_tag = tag
-            self._heading_parts = []
+            if "headings" in fields:
+                self._heading_tag = tag
+                self._heading_parts = []
         elif tag == "p":
-            self._in_p = True
-            self._p_parts = []
+            if "paragraphs" in fields:
+                self._in_p = True
+                self._p_parts = []
         elif tag == "a":
-            self._link_href = attr.get("href", "").strip()
-            self._link_parts = []
-            self._link_in_nav = self._nav_depth > 0
+            if self._want_links:
+                self._link_href = (dict(attrs).get("href") or "").strip()
+                self._link_parts = []
+                self._link_in_nav = self._nav_depth > 0
+        else:
+            return
+        self._check_done()
 
     def handle_endtag(self, tag: str) -> None:
         if tag == "title" and self._in_title:
             self._in_title = False
             self.title = normalize_ws(" ".join(self._title_parts))
             self._title_parts = []
+        elif tag == "head":
+            self.head_closed = True
+        elif tag == "script" and self._script_parts is not None:
+            text = "".join(self._script_parts)
+            if self._script_is_next_data:
+                self.next_data = text
+            elif "self.__next_f" in text:
+                self.flight.feed_script(text)
+            self._script_parts = None
         elif tag == "nav" and self._nav_depth > 0:
             self._nav_depth -= 1
         elif tag in {"h1", "h2", "h3"} and self._heading_tag == tag:
@@ -125,14 +757,20 @@ class PageParser(HTMLParser):
         elif tag == "a" and self._link_href is not None:
             text = normalize_ws(" ".join(self._link_parts))
             link = {"href": self._link_href, "text": text}
-            self.links.append(link)
-            if self._link_in_nav:
+            if "links" in self.fields:
+                self.links.append(link)
+            if self._link_in_nav and "nav" in self.fields:
                 self.nav_links.append(link)
             self._link_href = None
             self._link_parts = []
             self._link_in_nav = False
+        else:
+            return
+        self._check_done()
 
     def handle_data(self, data: str) -> None:
+        if self._script_parts is not None:
+            self._script_parts.append(data)
         if self._in_title:
             self._title_parts.append(data)
         if self._heading_tag:
@@ -143,22 +781,88 @@ class PageParser(HTMLParser):
             self._link_parts.append(data)
 
 
+def parse_page(
+    html_text: str,
+    fields: Iterable[str] = PAGE_FIELDS,
+    until: Optional[Callable[[PageParser], bool]] = None,
+) -> PageParser:
+    return PageParser(fields, until).parse(html_text)
+
+
 def normalize_ws(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
-def unescape_js_string(text: str) -> str:
-    try:
-        text = bytes(text, "utf-8").decode("unicode_escape")
-    except Exception:  # noqa: BLE001
-        pass
-    return html.unescape(text).replace("\\/", "/").strip()
+SITEMAP_NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
 
 
-def parse_sitemap(xml_text: str) -> List[str]:
+def parse_sitemap(xml_text: str) -> Tuple[List[Tuple[str, Optional[str]]], List[str]]:
+    """(page URL, lastmod) pairs of a <urlset>, and child sitemap URLs of a <sitemapindex>."""
     root = ET.fromstring(xml_text)
-    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-    return [loc.text.strip() for loc in root.findall("sm:url/sm:loc", ns) if loc.text]
+    pages = []
+    for node in root.findall("sm:url", SITEMAP_NS):
+        loc = node.findtext("sm:loc", default="", namespaces=SITEMAP_NS).strip()
+        lastmod = node.findtext("sm:lastmod", default="", namespaces=SITEMAP_NS).strip()
+        if loc:
+            pages.append((loc, lastmod or None))
+    children = [loc.text.strip() for loc in root.findall("sm:sitemap/sm:loc", SITEMAP_NS) if loc.text]
+    return pages, children
+
+
+def collect_sitemap(sitemap_url: str, limiter: HostRateLimiter) -> Optional[Dict[str, Optional[str]]]:
+    """Page URL -> lastmod across the sitemap and any nested sitemap indexes; None if the root fails."""
+    entries: Dict[str, Optional[str]] = {}
+    pending, seen = [sitemap_url], set()
+    while pending:
+        url = pending.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        xml_text = fetch_url(url, limiter)
+        if not xml_text:
+            if url == sitemap_url:
+                return None
+            continue
+        started = time.perf_counter()
+        pages, children = parse_sitemap(xml_text)
+        METRICS.observe_parse("sitemap", time.perf_counter() - started)
+        for loc, lastmod in pages:
+            entries.setdefault(loc, lastmod)
+        pending.extend(children)
+    return entries
+
+
+def load_crawl_state(path: Path) -> Dict[str, Dict[str, Optional[str]]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def reuse_unchanged_appearances(
+    checkpoint: AppearanceCheckpoint,
+    sitemap: Dict[str, Optional[str]],
+    state: Dict[str, Dict[str, Optional[str]]],
+    previous_path: Path,
+) -> int:
+    """Checkpoint the previous records of pages whose sitemap lastmod matches their last good crawl."""
+    try:
+        previous = json.loads(previous_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return 0
+    completed = checkpoint.completed()
+    reused = 0
+    for item in previous:
+        url = item.get("source_page_url")
+        entry = state.get(url) or {}
+        lastmod = sitemap.get(url)
+        if url in completed or item.get("error") or not lastmod:
+            continue
+        if entry.get("status") != "ok" or entry.get("lastmod") != lastmod:
+            continue
+        checkpoint.append(item)
+        reused += 1
+    return reused
 
 
 def classify_urls(urls: List[str]) -> Dict[str, List[str]]:
@@ -176,24 +880,31 @@ def classify_urls(urls: List[str]) -> Dict[str, List[str]]:
     return out
 
 
-def extract_from_next_payload(html_text: str) -> Dict[str, Optional[str]]:
-    data: Dict[str, Optional[str]] = {
-        "title": None,
-        "date": None,
-        "mediaType": None,
-        "description": None,
-        "url": None,
-        "duration": None,
-    }
-    marker = '"id":"appearance-'
-    pos = html_text.find(marker)
-    if pos == -1:
+NEXT_PAYLOAD_KEYS = ("title", "date", "mediaType", "description", "url", "duration")
+
+
+def extract_from_next_payload(parser: PageParser) -> Dict[str, object]:
+    data: Dict[str, object] = {key: None for key in NEXT_PAYLOAD_KEYS}
+    record = None
+    if parser.flight.record is not None:
+        record = parser.flight.resolve(parser.flight.record)
+    elif parser.next_data:
+        try:
+            record = _find_record(json.loads(parser.next_data), APPEARANCE_ID_PREFIX)
+        except ValueError:
+            record = None
+    if not isinstance(record, dict):
         return data
-    window = html_text[pos : pos + 7000]
-    for key in ["title", "date", "mediaType", "description", "url", "duration"]:
-        m = re.search(rf'"{key}":"(.*?)"', window)
-        if m:
-            data[key] = unescape_js_string(m.group(1))
+
+    for key in NEXT_PAYLOAD_KEYS:
+        value = record.get(key)
+        if isinstance(value, str):
+            data[key] = html.unescape(value).strip() or None
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            data[key] = str(value)
+    extra = {k: v for k, v in record.items() if k not in NEXT_PAYLOAD_KEYS and k != "id" and v not in (None, "", [], {})}
+    if extra:
+        data["extra"] = extra
     return data
 
 
@@ -208,10 +919,23 @@ def infer_media_type(url: Optional[str], text: Optional[str]) -> Optional[str]:
     return None
 
 
-def extract_appearance_payload(html_text: str) -> Dict[str, Optional[str]]:
-    parser = PageParser()
-    parser.feed(html_text)
-    next_data = extract_from_next_payload(html_text)
+APPEARANCE_FIELDS = frozenset({"title", "meta", "next_payload"})
+
+
+def _appearance_found(parser: PageParser) -> bool:
+    # Stop once the head is done, a thumbnail is known and either __NEXT_DATA__ or
+    # the appearance flight row (with any text rows it points at) has fully arrived.
+    if not parser.head_closed or not (parser.metas.get("og:image") or parser.metas.get("twitter:image")):
+        return False
+    if parser.next_data is not None:
+        return True
+    record = parser.flight.record
+    return record is not None and not parser.flight.unresolved(record)
+
+
+def extract_appearance_payload(html_text: str) -> Dict[str, object]:
+    parser = parse_page(html_text, APPEARANCE_FIELDS, until=_appearance_found)
+    next_data = extract_from_next_payload(parser)
 
     title = next_data.get("title") or parser.metas.get("og:title") or parser.title or None
     if title:
@@ -227,7 +951,7 @@ def extract_appearance_payload(html_text: str) -> Dict[str, Optional[str]]:
     media_url = next_data.get("url") or parser.metas.get("og:url") or None
     media_type = (next_data.get("mediaType") or "").lower() or infer_media_type(media_url, description)
 
-    return {
+    item: Dict[str, object] = {
         "title": title,
         "date": date,
         "show": title,
@@ -237,12 +961,19 @@ def extract_appearance_payload(html_text: str) -> Dict[str, Optional[str]]:
         "duration": next_data.get("duration"),
         "thumbnail": parser.metas.get("og:image") or parser.metas.get("twitter:image"),
     }
+    if next_data.get("extra"):
+        item["extra"] = next_data["extra"]
+    return item
+
+
+HUB_FIELDS = frozenset({"title", "meta", "headings", "nav", "links"})
 
 
 def extract_hub_content(source_url: str, html_text: str) -> Dict[str, object]:
-    parser = PageParser()
-    parser.feed(html_text)
+    return _hub_content(source_url, parse_page(html_text, HUB_FIELDS))
+
 
+def _hub_content(source_url: str, parser: PageParser) -> Dict[str, object]:
     links = []
     for link in parser.links:
         href = link.get("href", "")
@@ -275,9 +1006,8 @@ def extract_hub_content(source_url: str, html_text: str) -> Dict[str, object]:
 
 
 def extract_homepage_content(source_url: str, html_text: str) -> Dict[str, object]:
-    base = extract_hub_content(source_url, html_text)
-    parser = PageParser()
-    parser.feed(html_text)
+    parser = parse_page(html_text, HUB_FIELDS | {"paragraphs"})
+    base = _hub_content(source_url, parser)
     nav_hrefs = {x.get("href", "") for x in parser.nav_links}
     curated = [x for x in base["all_links"] if x.get("href") not in nav_hrefs and x.get("href", "").startswith(BASE_URL)]
     base["section_headings"] = parser.headings
@@ -290,6 +1020,83 @@ def write_json(path: Path, data: object) -> None:
     path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
 
 
+def write_json_array(path: Path, items: Iterable[object]) -> int:
+    """Stream items out as a JSON array (same bytes as write_json(list(items))).
+
+    The file is only replaced once every item is written, so an interrupted run
+    leaves the previous output in place.
+    """
+    with JsonArrayWriter(path, only_if_changed=False) as out:
+        out.write_all(items)
+    return out.count
+
+
+class AppearanceCheckpoint:
+    """Append-only JSONL of parsed appearance records; the last line written for a URL wins.
+
+    Only byte offsets are kept in memory, so the final outputs are streamed back
+    from disk in sitemap order however many pages the crawl covered.
+    """
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self.path = path
+        self.offsets: Dict[str, int] = {}
+        self.failed: Set[str] = set()
+        if resume and path.exists():
+            self._load()
+        else:
+            path.unlink(missing_ok=True)
+        self._fh = path.open("ab")
+
+    def _load(self) -> None:
+        valid_end = 0
+        with self.path.open("rb") as fh:
+            while True:
+                offset = fh.tell()
+                line = fh.readline()
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._index(record, offset)
+                valid_end = fh.tell()
+        # Drop a half-written line left by an interrupted run so appends stay line-aligned.
+        with self.path.open("r+b") as fh:
+            fh.truncate(valid_end)
+
+    def _index(self, record: Dict[str, object], offset: int) -> None:
+        url = str(record.get("source_page_url") or "")
+        self.offsets[url] = offset
+        if record.get("error"):
+            self.failed.add(url)
+        else:
+            self.failed.discard(url)
+
+    def completed(self) -> Set[str]:
+        return set(self.offsets) - self.failed
+
+    def append(self, record: Dict[str, object]) -> None:
+        offset = self._fh.tell()
+        self._fh.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._fh.flush()
+        self._index(record, offset)
+
+    def records(self, urls: Iterable[str]) -> Iterator[Dict[str, object]]:
+        self._fh.flush()
+        with self.path.open("rb") as fh:
+            for url in urls:
+                offset = self.offsets.get(url)
+                if offset is None:
+                    continue
+                fh.seek(offset)
+                yield json.loads(fh.readline())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
 def parse_date_text(date_text: Optional[str]) -> Optional[datetime]:
     if not date_text:
         return None
@@ -301,13 +1108,16 @@ def parse_date_text(date_text: Optional[str]) -> Optional[datetime]:
     return None
 
 
-def create_summary(appearances: List[Dict[str, object]]) -> str:
-    show_counter = Counter((a.get("show") or "Unknown") for a in appearances)
+def create_summary(appearances: Iterable[Dict[str, object]]) -> str:
+    show_counter = Counter()
     link_counter = Counter()
     no_media = []
     dates = []
+    total = 0
 
     for a in appearances:
+        total += 1
+        show_counter[a.get("show") or "Unknown"] += 1
         u = (a.get("media_url") or "").lower()
         if not u:
             link_counter["none"] += 1
@@ -326,7 +1136,7 @@ def create_summary(appearances: List[Dict[str, object]]) -> str:
     earliest = min(dates).strftime("%Y-%m-%d") if dates else "N/A"
     latest = max(dates).strftime("%Y-%m-%d") if dates else "N/A"
 
-    lines = ["# Competitor Data Summary", "", f"- Total appearances found: **{len(appearances)}**", "", "## Breakdown by category/show", ""]
+    lines = ["# Competitor Data Summary", "", f"- Total appearances found: **{total}**", "", "## Breakdown by category/show", ""]
     lines.extend([f"- {k}: {v}" for k, v in show_counter.most_common()])
     lines.extend(["", "## Unique shows/venues", ""])
     lines.extend([f"- {k}" for k in sorted(show_counter.keys())])
@@ -347,48 +1157,272 @@ def create_summary(appearances: List[Dict[str, object]]) -> str:
     return "\n".join(lines)
 
 
-def main() -> None:
+def fetch_failed_record(url: str) -> Dict[str, object]:
+    return {
+        "title": None,
+        "date": None,
+        "show": None,
+        "description": None,
+        "media_url": None,
+        "media_type": None,
+        "duration": None,
+        "thumbnail": None,
+        "source_page_url": url,
+        "error": "fetch_failed",
+    }
+
+
+def parse_appearance_page(url: str, page: str) -> Tuple[Dict[str, object], float]:
+    """Parsed record and the seconds spent parsing (timed here, since this runs in a worker process)."""
+    started = time.perf_counter()
+    try:
+        item = extract_appearance_payload(page)
+    except Exception:  # noqa: BLE001
+        item = {"error": "parse_failed"}
+    item["source_page_url"] = url
+    return item, time.perf_counter() - started
+
+
+async def crawl_appearances(
+    urls: List[str],
+    checkpoint: AppearanceCheckpoint,
+    concurrency: int,
+    rate: float,
+    burst: int = 1,
+    parse_workers: int = PARSE_WORKERS,
+    queue_size: int = PAGE_QUEUE_SIZE,
+    max_attempts: int = MAX_FETCH_ATTEMPTS,
+) -> None:
+    """Fetch with `concurrency` threads and parse in `parse_workers` processes.
+
+    Fetched pages go through a bounded queue: when the parsers fall behind,
+    fetchers wait on it instead of piling downloaded HTML up in memory.
+    parse_workers=0 parses on the event loop, which is handy when debugging.
+    If the process pool breaks (a worker died), parsing falls back to the
+    event loop. Throttled or failed fetches are re-queued with a growing delay
+    and only recorded as fetch_failed after `max_attempts`. Any other error in
+    a fetcher or parser cancels the whole crawl and is raised here, instead of
+    leaving the others blocked on the queues.
+    """
+    limiter = HostRateLimiter(rate, burst)
+    url_queue: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        url_queue.put_nowait((url, 1))
+    pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    loop = asyncio.get_running_loop()
+    done = 0
+    outstanding = len(urls)
+
+    def finish_fetch() -> None:
+        nonlocal outstanding
+        outstanding -= 1
+        if outstanding == 0:
+            for _ in range(concurrency):
+                url_queue.put_nowait(None)
+
+    def record(item: Dict[str, object]) -> None:
+        nonlocal done
+        METRICS.count(str(item.get("error") or "appearances_ok"))
+        # Appends run on the event loop thread, so lines never interleave.
+        checkpoint.append(item)
+        done += 1
+        if done % 50 == 0:
+            print(f"  processed {done}/{len(urls)}", flush=True)
+
+    async def fetcher() -> None:
+        while True:
+            job = await url_queue.get()
+            if job is None:
+                return
+            url, attempt = job
+            page, retryable = await fetch_url_async(url, limiter)
+            if page:
+                await pages.put((url, page))
+            elif retryable and attempt < max_attempts:
+                METRICS.count("retries")
+                print(f"  will retry {url} (attempt {attempt + 1}/{max_attempts})", flush=True)
+                loop.call_later(RETRY_DELAY_SECONDS * attempt, url_queue.put_nowait, (url, attempt + 1))
+                continue
+            else:
+                record(fetch_failed_record(url))
+            finish_fetch()
+
+    async def parser() -> None:
+        nonlocal parse_pool
+        while True:
+            job = await pages.get()
+            if job is None:
+                return
+            item = None
+            if parse_pool is not None:
+                try:
+                    item, seconds = await loop.run_in_executor(parse_pool, parse_appearance_page, *job)
+                except BrokenProcessPool:
+                    if parse_pool is not None:
+                        print("Parse worker died; parsing the remaining pages in the main process", flush=True)
+                        METRICS.count("parse_pool_broken")
+                    parse_pool = None
+            if item is None:
+                item, seconds = parse_appearance_page(*job)
+            METRICS.observe_parse("appearance", seconds)
+            record(item)
+
+    # One thread per fetcher so blocking requests never queue behind each other.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    # Spawned rather than forked: the fetch threads are already running when workers start.
+    pool = ProcessPoolExecutor(parse_workers, mp_context=multiprocessing.get_context("spawn")) if parse_workers > 0 else None
+    parse_pool = pool
+    with pool or nullcontext():
+        if not urls:
+            for _ in range(concurrency):
+                url_queue.put_nowait(None)
+        fetchers = [asyncio.create_task(fetcher()) for _ in range(concurrency)]
+        parsers = [asyncio.create_task(parser()) for _ in range(max(1, parse_workers))]
+
+        async def stop_parsers() -> None:
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await pages.put(None)
+
+        tasks = [*fetchers, *parsers, asyncio.create_task(stop_parsers())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # On the first failure (or if the crawl itself is cancelled) stop everything else.
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, asyncio.CancelledError):
+                raise result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape normmacdonaldarchive.com into competitor_data/.")
+    parser.add_argument("--base-url", default=BASE_URL, help="site to crawl, e.g. a local stand-in server")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="appearance pages fetched in parallel")
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="processes parsing fetched pages (0 parses in the main process)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=PAGE_QUEUE_SIZE,
+        help="fetched pages allowed to wait for a parser before fetching pauses",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0 / RATE_LIMIT_SECONDS,
+        help="ceiling on requests per second per host (0 disables the limit)",
+    )
+    parser.add_argument("--burst", type=int, default=1, help="requests a host may receive back to back")
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_FETCH_ATTEMPTS,
+        help="tries per appearance page before it is recorded as fetch_failed",
+    )
+    parser.add_argument("--cache-dir", type=Path, default=None, help="response cache (default: <out-dir>/.http-cache)")
+    parser.add_argument("--no-cache", action="store_true", help="always download full responses")
+    parser.add_argument("--offline", action="store_true", help="serve every page from the response cache only")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only crawl appearance pages that are new, failed last time or have a newer sitemap lastmod",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="keep the appearance checkpoint and skip pages it already holds (failed pages are retried)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global BASE_URL, SITEMAP_URL, OUT_DIR, HTTP_CACHE, OFFLINE
+    args = parse_args(argv)
+    if args.offline and args.no_cache:
+        raise SystemExit("--offline needs the response cache")
+    BASE_URL = args.base_url.rstrip("/")
+    SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
+    OUT_DIR = args.out_dir
+    HTTP_CACHE = None if args.no_cache else ResponseCache(args.cache_dir or OUT_DIR / ".http-cache")
+    OFFLINE = args.offline
+    if OFFLINE:
+        args.rate = 0.0
+    if not OFFLINE:
+        METRICS.phase("robots")
+        robots = fetch_url(f"{BASE_URL}/robots.txt", HostRateLimiter(args.rate, args.burst))
+        delay = robots_crawl_delay(robots) if robots else None
+        if delay and (args.rate <= 0 or args.rate > 1.0 / delay):
+            args.rate = 1.0 / delay
+            print(f"robots.txt asks for {delay:g}s between requests; capping at {args.rate:.2f} req/s", flush=True)
+    # Shared by the one-off fetches; the appearance crawl paces itself with its own limiter.
+    limiter = HostRateLimiter(args.rate, args.burst)
     ensure_out_dir()
 
     print("Phase 1: Fetching sitemap...", flush=True)
-    sitemap_xml = fetch_url(SITEMAP_URL)
-    if not sitemap_xml:
+    METRICS.phase("sitemap")
+    sitemap = collect_sitemap(SITEMAP_URL, limiter)
+    if sitemap is None:
         raise SystemExit("Failed to fetch sitemap.xml")
 
-    urls = parse_sitemap(sitemap_xml)
+    urls = list(sitemap)
     (OUT_DIR / "all_urls.txt").write_text("\n".join(urls) + "\n", encoding="utf-8")
     inventory = classify_urls(urls)
     write_json(OUT_DIR / "url_inventory.json", inventory)
 
     appearance_urls = inventory["appearance_pages"]
-    print(f"Phase 2: Scraping {len(appearance_urls)} appearance pages...", flush=True)
-    appearances: List[Dict[str, object]] = []
-    for i, url in enumerate(appearance_urls, start=1):
-        page = fetch_url(url)
-        if not page:
-            appearances.append({
-                "title": None,
-                "date": None,
-                "show": None,
-                "description": None,
-                "media_url": None,
-                "media_type": None,
-                "duration": None,
-                "thumbnail": None,
-                "source_page_url": url,
-                "error": "fetch_failed",
-            })
-        else:
-            item = extract_appearance_payload(page)
-            item["source_page_url"] = url
-            appearances.append(item)
-
-        if i % 50 == 0:
-            print(f"  processed {i}/{len(appearance_urls)}", flush=True)
+    checkpoint = AppearanceCheckpoint(OUT_DIR / "appearances.checkpoint.jsonl", resume=args.resume)
+    state_path = OUT_DIR / "crawl_state.json"
+    state = load_crawl_state(state_path)
+    if args.incremental:
+        reused = reuse_unchanged_appearances(checkpoint, sitemap, state, OUT_DIR / "appearances.json")
+        METRICS.count("appearances_reused", reused)
+        print(f"Incremental: keeping {reused} unchanged appearances from appearances.json", flush=True)
+    completed = checkpoint.completed()
+    pending = [u for u in appearance_urls if u not in completed]
+    print(
+        f"Phase 2: Scraping {len(pending)} appearance pages "
+        f"({len(appearance_urls) - len(pending)} already checkpointed)...",
+        flush=True,
+    )
+    METRICS.phase("appearances")
+    asyncio.run(
+        crawl_appearances(
+            pending,
+            checkpoint,
+            args.concurrency,
+            args.rate,
+            args.burst,
+            args.parse_workers,
+            args.queue_size,
+            args.max_attempts,
+        )
+    )
 
-    write_json(OUT_DIR / "appearances.json", appearances)
+    write_json_array(OUT_DIR / "appearances.json", checkpoint.records(appearance_urls))
+    crawled_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    crawled, completed = set(pending), checkpoint.completed()
+    write_json(
+        state_path,
+        {
+            url: {
+                "lastmod": sitemap.get(url),
+                "status": "ok" if url in completed else "fetch_failed",
+                "crawled_at": crawled_at if url in crawled else (state.get(url) or {}).get("crawled_at"),
+            }
+            for url in appearance_urls
+        },
+    )
 
     print("Phase 3: Scraping category hubs...", flush=True)
+    METRICS.phase("hubs")
     hub_outputs = {
         f"{BASE_URL}/nml": OUT_DIR / "nml_episodes.json",
         f"{BASE_URL}/standup": OUT_DIR / "standup_specials.json",
@@ -397,21 +1431,48 @@ def main() -> None:
         f"{BASE_URL}/the-list": OUT_DIR / "the_list_index.json",
     }
     for hub_url, out_file in hub_outputs.items():
-        page = fetch_url(hub_url)
+        page = fetch_url(hub_url, limiter)
         data: Dict[str, object] = {"source_page_url": hub_url, "error": "fetch_failed"}
         if page:
+            started = time.perf_counter()
             data = extract_hub_content(hub_url, page)
+            METRICS.observe_parse("hub", time.perf_counter() - started)
         write_json(out_file, data)
 
     print("Phase 4: Scraping homepage...", flush=True)
-    home = fetch_url(f"{BASE_URL}/")
+    METRICS.phase("homepage")
+    home = fetch_url(f"{BASE_URL}/", limiter)
     home_data: Dict[str, object] = {"source_page_url": f"{BASE_URL}/", "error": "fetch_failed"}
     if home:
+        started = time.perf_counter()
         home_data = extract_homepage_content(f"{BASE_URL}/", home)
+        METRICS.observe_parse("homepage", time.perf_counter() - started)
     write_json(OUT_DIR / "homepage_content.json", home_data)
 
     print("Phase 5: Writing summary report...", flush=True)
-    (OUT_DIR / "SUMMARY.md").write_text(create_summary(appearances), encoding="utf-8")
+    METRICS.phase("summary")
+    (OUT_DIR / "SUMMARY.md").write_text(create_summary(checkpoint.records(appearance_urls)), encoding="utf-8")
+    checkpoint.close()
+    METRICS.phase(None)
+    extra = {f"http_{k}": v for k, v in HTTP_POOL.stats.items()}
+    if HTTP_CACHE:
+        extra.update({f"cache_{k}": v for k, v in HTTP_CACHE.stats.items()})
+    write_json(OUT_DIR / "run_report.json", METRICS.report(extra))
+    (OUT_DIR / "metrics.prom").write_text(METRICS.prometheus(extra), encoding="utf-8")
+    if HTTP_CACHE:
+        stats = HTTP_CACHE.stats
+        print(
+            f"Response cache: {stats['downloaded']} downloaded, {stats['not_modified']} not modified, "
+            f"{stats['offline']} served offline",
+            flush=True,
+        )
+    pool = HTTP_POOL.stats
+    if pool["requests"]:
+        print(
+            f"HTTP: {pool['requests']} requests over {pool['connections']} connections, "
+            f"{pool['wire_bytes'] / 1e6:.2f} MB on the wire, {pool['decoded_bytes'] / 1e6:.2f} MB decoded",
+            flush=True,
+        )
     print("Done.", flush=True)
 
 
@@ -0,0 +1,108 @@
+// ===================================
+// Versioned Data Sync
+// Keeps published collections in IndexedDB and brings them up to date with the
+// per-version delta files in data-versions/ (written by scripts_data_pipeline.py)
+// ===================================
+
+const NormData = (() => {
+    // Resolved against this script so v2/ pages share the same files
+    const MANIFEST_URL = new URL('data-versions/manifest.json', document.currentScript.src).href;
+    const DB_NAME = 'norm-data';
+    const STORE = 'collections';
+
+    // Record keys, matching the catalog's key for each collection (catalog.py)
+    const KEYS = {
+        videos: row => row.video_id || (String(row['Video url'] || '').trim() ? 'url:' + String(row['Video url']).trim() : ''),
+        default: row => row.id == null ? '' : String(row.id)
+    };
+
+    let manifestPromise = null;
+
+    function fetchJSON(url) {
+        return fetch(url).then(response => {
+            if (!response.ok) throw new Error('Failed to load ' + url);
+            return response.json();
+        });
+    }
+
+    function loadManifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetchJSON(MANIFEST_URL);
+            manifestPromise.catch(() => { manifestPromise = null; });
+        }
+        return manifestPromise;
+    }
+
+    // Resolves to null where IndexedDB is unavailable (private browsing, old browsers)
+    function openDb() {
+        return new Promise(resolve => {
+            if (!window.indexedDB) return resolve(null);
+            const request = indexedDB.open(DB_NAME, 1);
+            request.onupgradeneeded = () => request.result.createObjectStore(STORE);
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(null);
+        });
+    }
+
+    function idb(db, mode, action) {
+        return new Promise((resolve, reject) => {
+            const request = action(db.transaction(STORE, mode).objectStore(STORE));
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    // Apply one delta to { keys, rows }: drop removed, upsert changed and added, then
+    // order by delta.order or keep survivors in place and append the added records.
+    function applyDelta(cached, delta) {
+        const records = new Map(cached.keys.map((key, i) => [key, cached.rows[i]]));
+        for (const key of delta.removed) {
+            if (!records.delete(key)) throw new Error('Delta removes unknown record ' + key);
+        }
+        for (const [key, row] of delta.changed) {
+            if (!records.has(key)) throw new Error('Delta changes unknown record ' + key);
+            records.set(key, row);
+        }
+        const keys = delta.order || [...records.keys(), ...delta.added.map(([key]) => key)];
+        for (const [key, row] of delta.added) records.set(key, row);
+        return { keys, rows: keys.map(key => records.get(key)) };
+    }
+
+    async function update(cached, entry) {
+        if (cached.version < entry.oldest || cached.version >= entry.version) return null;
+        const byVersion = new Map(entry.deltas.map(d => [d.version, d]));
+        let current = cached;
+        for (let version = cached.version + 1; version <= entry.version; version++) {
+            const info = byVersion.get(version);
+            if (!info) return null;
+            const delta = await fetchJSON(new URL(info.file, MANIFEST_URL));
+            if (delta.from !== version - 1 || delta.to !== version) return null;
+            current = { ...applyDelta(current, delta), version };
+        }
+        return current.rows.length === entry.count ? current : null;
+    }
+
+    // The rows of a collection at the manifest's current version, with that version and
+    // the sha256 of the published file it matches. Resolves to null without a manifest.
+    async function load(collection) {
+        const manifest = await loadManifest().catch(() => null);
+        const entry = manifest && manifest.collections[collection];
+        if (!entry) return null;
+
+        const db = await openDb();
+        let cached = db ? await idb(db, 'readonly', store => store.get(collection)).catch(() => null) : null;
+        if (!cached || cached.version !== entry.version || cached.digest !== entry.digest) {
+            cached = cached && await update(cached, entry).catch(() => null);
+            if (!cached) {
+                // Too far behind, from another history or inconsistent: start over from the full file
+                const rows = await fetchJSON(new URL(entry.file, MANIFEST_URL));
+                cached = { version: entry.version, keys: rows.map(KEYS[collection] || KEYS.default), rows };
+            }
+            cached.digest = entry.digest;
+            if (db) await idb(db, 'readwrite', store => store.put(cached, collection)).catch(() => {});
+        }
+        return { rows: cached.rows, version: cached.version, digest: cached.digest };
+    }
+
+    return { load };
+})();
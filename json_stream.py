@@ -0,0 +1,146 @@
+"""Read and rewrite large top-level JSON arrays one element at a time.
+
+iter_json_array decodes elements as it reads, so only the current element and one read
+chunk are in memory. JsonArrayWriter writes elements as they arrive to a temp file next
+to the target and renames it into place on success, so a crash mid-write leaves the old
+file untouched. Its output matches json.dumps(items, indent=2, ensure_ascii=False) + "\n".
+"""
+from __future__ import annotations
+
+import filecmp
+import json
+import os
+import re
+import stat
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+READ_CHUNK = 1 << 16
+_WHITESPACE = " \t\n\r"
+_DELIMITER = re.compile(r"[ \t\n\r]*[,\]]")
+
+
+def iter_json_array(path: Path, chunk_size: int = READ_CHUNK) -> Iterator[object]:
+    """Yield each element of the JSON array stored at path; raises json.JSONDecodeError."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_char() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        if next_char() != "[":
+            raise json.JSONDecodeError("Expecting '['", buf, pos)
+        pos += 1
+        if next_char() == "]":
+            return
+
+        while True:
+            next_char()
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A number cut off by the chunk boundary ("2." of "2.5") still decodes, so
+                # only trust the element once the delimiter after it has been read.
+                truncated = not eof and not _DELIMITER.match(buf, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                truncated = True
+            if truncated:
+                fill()
+                continue
+            pos = end
+            yield item
+
+            sep = next_char()
+            if sep == "]":
+                return
+            if sep != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+
+
+class JsonArrayWriter:
+    """Context manager that streams a JSON array to path atomically.
+
+    With only_if_changed, a result byte-identical to the existing file is discarded and
+    the file is left alone (changed stays False), like write_if_changed.
+    """
+
+    def __init__(self, path: Path, only_if_changed: bool = True) -> None:
+        self.path = Path(path)
+        self.only_if_changed = only_if_changed
+        self.count = 0
+        self.changed = False
+        self._fh = None
+        self._tmp: Path | None = None
+
+    def __enter__(self) -> JsonArrayWriter:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self._tmp = Path(tmp)
+        self._fh = os.fdopen(fd, "w", encoding="utf-8", newline="\n")
+        self._fh.write("[")
+        return self
+
+    def write(self, item: object) -> None:
+        text = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._fh.write(("," if self.count else "") + "\n  " + text)
+        self.count += 1
+
+    def write_all(self, items: Iterable[object]) -> None:
+        for item in items:
+            self.write(item)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        fh, tmp = self._fh, self._tmp
+        self._fh = self._tmp = None
+        if exc_type is not None:
+            fh.close()
+            tmp.unlink(missing_ok=True)
+            return
+        try:
+            fh.write("\n]\n" if self.count else "]\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        finally:
+            fh.close()
+
+        if self.path.exists():
+            if self.only_if_changed and filecmp.cmp(tmp, self.path, shallow=False):
+                tmp.unlink()
+                return
+            mode = stat.S_IMODE(self.path.stat().st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, self.path)
+        self.changed = True
+
+
+def write_json_array(path: Path, items: Iterable[object], only_if_changed: bool = True) -> bool:
+    """Stream items to path as a JSON array; return True if the file was (re)written."""
+    with JsonArrayWriter(path, only_if_changed) as out:
+        out.write_all(items)
+    return out.changed
@@ -30,7 +30,7 @@ const state = {
 
 async function loadJokes() {
     try {
-        const response = await fetch('./jokes-data.json?v=2');
+        const response = await fetch('./jokes-data.json');
         if (!response.ok) throw new Error('Failed to load jokes');
 
         state.jokes = await response.json();
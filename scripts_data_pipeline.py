@@ -1,26 +1,140 @@
 #!/usr/bin/env python3
 """Run delegated archive data tasks:
-1) Joke merge + dedupe into jokes-data.json
-2) Video metadata enrichment + auto-categorization in consolidated_youtube_data.json
+1) Joke merge + exact and near-duplicate dedupe into jokes-data.json
+2) Video metadata enrichment + auto-categorization of uncategorized rows in consolidated_youtube_data.json
 3) Transcript extraction from PDF into transcripts.json
+4) Inverted search index over every collection into search-index.json
+5) Video catalog page shards per sort order into video-pages/
+6) Versioned snapshots and per-version delta files into data-versions/
+
+The collections live in catalog.sqlite3 (see catalog.py): stages read and upsert rows
+there and the published JSON files are exported from it. A JSON file edited by hand or
+by a _tools script since the last export is imported back before any stage runs.
+
+Each stage is skipped when its inputs, outputs and stage version match the build
+manifest from the previous run, and outputs are only rewritten when their bytes change.
+Pass --force to rebuild everything, and --stage NAME (repeatable) to run only some stages.
 """
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
 import json
+import os
 import re
-from collections import Counter
+import unicodedata
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+from urllib.parse import quote
+
+from catalog import Catalog
+from json_stream import write_json_array
+from video_store import extract_video_id, is_missing
 
 ROOT = Path(__file__).resolve().parent
 
 JOKES_PATH = ROOT / "jokes-data.json"
-FULL_JOKES_CSV = ROOT / "old/site-src/FullNormJokes.csv"
-TRANSCRIBED_TXT = ROOT / "old/site-src/NormMacdonald-Live-Jokes-Transcribed.txt"
+JOKES_MERGE_REPORT_PATH = ROOT / "jokes-merge-report.json"
+FULL_JOKES_CSV = ROOT / "_archive/old/site-src/FullNormJokes.csv"
+TRANSCRIBED_TXT = ROOT / "_archive/old/site-src/NormMacdonald-Live-Jokes-Transcribed.txt"
 VIDEOS_PATH = ROOT / "consolidated_youtube_data.json"
 TRANSCRIPTS_PATH = ROOT / "transcripts.json"
-PDF_PATH = ROOT / "old/site-src/341060525-Norm-Macdonald-Live-Jokes-Transcribed.pdf"
+PDF_PATH = ROOT / "_archive/old/site-src/341060525-Norm-Macdonald-Live-Jokes-Transcribed.pdf"
+QUOTES_PATH = ROOT / "quotes-data.json"
+ARTICLES_PATH = ROOT / "articles-data.json"
+NML_EPISODES_PATH = ROOT / "nml-episodes-data.json"
+SEARCH_INDEX_PATH = ROOT / "search-index.json"
+VIDEO_PAGES_DIR = ROOT / "video-pages"
+VIDEO_SHARD_SIZE = 96
+MANIFEST_PATH = ROOT / ".pipeline-manifest.json"
+CATALOG_PATH = ROOT / "catalog.sqlite3"
+PDF_PAGE_CACHE_DIR = ROOT / ".cache" / "pdf-pages"
+PDF_PAGE_BATCH = 8
+DELTAS_DIR = ROOT / "data-versions"
+DELTA_HISTORY = 50
+
+# Bump a stage's version whenever its output logic changes so the next run rebuilds it.
+STAGE_VERSIONS = {
+    "jokes": 3,
+    "videos": 6,
+    "transcripts": 2,
+    "search-index": 2,
+    "video-pages": 3,
+    "deltas": 2,
+}
+
+# Near-duplicate joke detection: character shingles -> MinHash signature -> LSH bands.
+NEAR_DUPLICATE_THRESHOLD = 0.7
+SHINGLE_SIZE = 5
+MINHASH_SLOTS = 64
+
+# Per-collection searchable fields and the score each contributes when a term hits it.
+SEARCH_FIELD_WEIGHTS = {
+    "jokes": {"joke": 1, "episode": 2, "guest": 3},
+    "videos": {"Title": 3, "Channel name": 2, "category": 1},
+    "nml": {"guest": 3},
+    "quotes": {"quote": 1, "source": 2},
+    "articles": {"title": 3, "source": 2, "excerpt": 1},
+}
+
+
+def _file_digest(path: Path) -> str:
+    if not path.exists():
+        return ""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dump_json(data: object) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path only when the encoded bytes differ; return True if written."""
+    payload = text.encode("utf-8")
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    path.write_bytes(payload)
+    return True
+
+
+class BuildManifest:
+    """Input and output digests and stage versions recorded by the last successful run."""
+
+    def __init__(self, path: Path = MANIFEST_PATH) -> None:
+        self.path = path
+        self.stages: dict[str, dict] = {}
+        if path.exists():
+            try:
+                self.stages = json.loads(path.read_text(encoding="utf-8")).get("stages", {})
+            except (json.JSONDecodeError, AttributeError):
+                self.stages = {}
+
+    @staticmethod
+    def _fingerprint(stage: str, inputs: list[Path], outputs: list[Path], params: dict) -> dict:
+        return {
+            "version": STAGE_VERSIONS[stage],
+            "params": params,
+            "inputs": {path.relative_to(ROOT).as_posix(): _file_digest(path) for path in inputs},
+            "outputs": {path.relative_to(ROOT).as_posix(): _file_digest(path) for path in outputs},
+        }
+
+    def is_fresh(self, stage: str, inputs: list[Path], outputs: list[Path], params: dict) -> bool:
+        """True when the inputs are unchanged and the outputs are still what the stage wrote."""
+        return self.stages.get(stage) == self._fingerprint(stage, inputs, outputs, params)
+
+    def record(self, stage: str, inputs: list[Path], outputs: list[Path], params: dict) -> None:
+        self.stages[stage] = self._fingerprint(stage, inputs, outputs, params)
+
+    def save(self) -> None:
+        write_if_changed(self.path, json.dumps({"stages": self.stages}, indent=2, sort_keys=True) + "\n")
 
 
 def _normalize_text(text: str) -> str:
@@ -35,19 +149,17 @@ def _dedupe_key(text: str) -> str:
     return normalized
 
 
-def load_existing_jokes() -> list[dict]:
-    with JOKES_PATH.open(encoding="utf-8") as f:
-        data = json.load(f)
+def load_existing_jokes(catalog: Catalog) -> list[dict]:
     out = []
-    for row in data:
+    for row in catalog.rows("jokes"):
         out.append(
             {
-                "joke": _normalize_text(row.get("joke", "")),
-                "episode": row.get("episode", ""),
-                "guest": row.get("guest", ""),
-                "url": row.get("url", ""),
-                "time": row.get("time", ""),
-                "source": row.get("source", "legacy-jokes-data"),
+                "joke": _normalize_text(row.get("joke")),
+                "episode": row.get("episode") or "",
+                "guest": row.get("guest") or "",
+                "url": row.get("url") or "",
+                "time": row.get("time") or "",
+                "source": row.get("source") or "legacy-jokes-data",
             }
         )
     return out
@@ -56,18 +168,19 @@ def load_existing_jokes() -> list[dict]:
 def load_csv_jokes() -> list[dict]:
     jokes: list[dict] = []
     with FULL_JOKES_CSV.open(encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
+        # Short rows would get None for their missing columns, which merge_jokes cannot sort.
+        reader = csv.DictReader(f, restval="")
         for row in reader:
-            text = _normalize_text(row.get("Joke", ""))
+            text = _normalize_text(row.get("Joke"))
             if not text:
                 continue
             jokes.append(
                 {
                     "joke": text,
-                    "episode": row.get("Episode", ""),
-                    "guest": row.get("Guest", ""),
-                    "url": row.get("URL", ""),
-                    "time": row.get("Time", ""),
+                    "episode": row.get("Episode") or "",
+                    "guest": row.get("Guest") or "",
+                    "url": row.get("URL") or "",
+                    "time": row.get("Time") or "",
                     "source": "FullNormJokes.csv",
                 }
             )
@@ -117,8 +230,115 @@ def load_txt_jokes() -> list[dict]:
     return jokes
 
 
-def merge_jokes(sources: Iterable[list[dict]]) -> list[dict]:
-    merged: list[dict] = []
+def _shingles(key: str) -> set[str]:
+    if len(key) <= SHINGLE_SIZE:
+        return {key}
+    return {key[i : i + SHINGLE_SIZE] for i in range(len(key) - SHINGLE_SIZE + 1)}
+
+
+def _minhash_signature(shingles: set[str]) -> tuple[int, ...]:
+    """One-permutation MinHash: a single 64-bit hash per shingle picks a slot and a value,
+    each slot keeps its minimum, and empty slots borrow from the next filled slot
+    (rotation densification) so short jokes still get comparable signatures."""
+    slots: list[int | None] = [None] * MINHASH_SLOTS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        slot, value = h % MINHASH_SLOTS, h // MINHASH_SLOTS
+        current = slots[slot]
+        if current is None or value < current:
+            slots[slot] = value
+
+    offset = (1 << 64) // MINHASH_SLOTS + 1
+    signature = [0] * MINHASH_SLOTS
+    for i in range(MINHASH_SLOTS):
+        for distance in range(MINHASH_SLOTS):
+            value = slots[(i + distance) % MINHASH_SLOTS]
+            if value is not None:
+                signature[i] = value + distance * offset
+                break
+    return tuple(signature)
+
+
+def _lsh_shape(threshold: float, slots: int) -> tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint (1/bands)**(1/rows) is the highest one not above
+    threshold, so true matches almost always share a bucket; candidates are verified after."""
+    best = (0.0, slots, 1)
+    for rows in range(1, slots + 1):
+        if slots % rows:
+            continue
+        bands = slots // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if best[0] < midpoint <= threshold:
+            best = (midpoint, bands, rows)
+    return best[1], best[2]
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def find_near_duplicates(jokes: list[dict], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> dict[int, tuple[int, float]]:
+    """Map the index of each near-duplicate joke to (index it merges into, Jaccard similarity).
+
+    Jokes are bucketed by LSH bands of their MinHash signatures, so only jokes sharing a
+    bucket are compared. Clusters keep their earliest joke, which is the one from the
+    highest-priority source.
+    """
+    bands, rows = _lsh_shape(threshold, MINHASH_SLOTS)
+
+    shingle_sets = [_shingles(_dedupe_key(joke.get("joke", ""))) for joke in jokes]
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for i, shingles in enumerate(shingle_sets):
+        signature = _minhash_signature(shingles)
+        for band in range(bands):
+            buckets[(band, signature[band * rows : (band + 1) * rows])].append(i)
+
+    parent = list(range(len(jokes)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1 :]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if _jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    duplicates: dict[int, tuple[int, float]] = {}
+    for i in range(len(jokes)):
+        root = find(i)
+        if root != i:
+            duplicates[i] = (root, round(_jaccard(shingle_sets[root], shingle_sets[i]), 3))
+    return duplicates
+
+
+def existing_joke_ids(catalog: Catalog) -> dict[str, int]:
+    """Dedupe key -> id of every joke already in the catalog."""
+    return {_dedupe_key(row.get("joke", "")): row["id"] for row in catalog.rows("jokes") if isinstance(row.get("id"), int)}
+
+
+def merge_jokes(
+    sources: Iterable[list[dict]],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    known_ids: dict[str, int] | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Merge sources in priority order; return the jokes and the near-duplicate merge decisions.
+
+    A joke whose dedupe key is in known_ids keeps that id, as does a joke that absorbs one
+    as a near-duplicate, so ids stay stable across runs and deltas only list real changes.
+    New jokes get ids after the highest known one, in sorted order.
+    """
+    known_ids = known_ids or {}
+    unique: list[dict] = []
     seen: set[str] = set()
     for source in sources:
         for joke in source:
@@ -126,85 +346,280 @@ def merge_jokes(sources: Iterable[list[dict]]) -> list[dict]:
             if not key or key in seen:
                 continue
             seen.add(key)
-            merged.append(joke)
+            unique.append(joke)
+
+    ids = {i: known_ids[key] for i, joke in enumerate(unique) if (key := _dedupe_key(joke.get("joke", ""))) in known_ids}
+    duplicates = find_near_duplicates(unique, threshold)
+    decisions: list[dict] = []
+    for i, (root, similarity) in sorted(duplicates.items()):
+        kept, dropped = unique[root], unique[i]
+        if i in ids and root not in ids:
+            ids[root] = ids[i]
+        filled = [field for field in ("episode", "guest", "url", "time") if not kept.get(field) and dropped.get(field)]
+        for field in filled:
+            kept[field] = dropped[field]
+        decisions.append(
+            {
+                "kept": kept.get("joke", ""),
+                "kept_source": kept.get("source", ""),
+                "merged": dropped.get("joke", ""),
+                "merged_source": dropped.get("source", ""),
+                "similarity": similarity,
+                "filled_fields": filled,
+            }
+        )
+
+    merged = [(ids.get(i), joke) for i, joke in enumerate(unique) if i not in duplicates]
+    merged.sort(key=lambda item: (item[1].get("guest", ""), item[1].get("episode", ""), item[1].get("joke", "")[:60]))
+    next_id = max(known_ids.values(), default=-1) + 1
+    for joke_id, row in merged:
+        if joke_id is None:
+            joke_id, next_id = next_id, next_id + 1
+        row["id"] = joke_id
+    return [row for _, row in merged], decisions
+
+
+# Category rules in priority order: the first label with a matching keyword becomes the
+# video's category and every matching label becomes a tag. Keywords are lowercase
+# substrings of "title description".
+CATEGORY_RULES = [
+    ("SNL", ("snl", "weekend update", "saturday night live")),
+    ("Norm Macdonald Live", ("norm macdonald live", "nml", "adam eget")),
+    ("Podcast", ("podcast", "joe rogan", "conan o'brien needs a friend")),
+    ("Stand-Up", ("stand up", "stand-up", "special", "set at", "comedy central")),
+    ("Talk Show", ("letterman", "conan", "late night", "tonight show", "seth meyers")),
+    ("Interview", ("interview", "speaks with", "talks with")),
+    ("Compilation", ("best of", "compilation", "funniest", "moments")),
+    ("Tribute", ("tribute", "remembering", "in memory", "rip norm")),
+]
+
+# Extra tags added after the category tags when a video has a category.
+TAG_RULES = [
+    ("norm-macdonald", ("norm",)),
+]
 
-    merged.sort(key=lambda j: (j.get("guest", ""), j.get("episode", ""), j.get("joke", "")[:60]))
-    for i, row in enumerate(merged):
-        row["id"] = i
-    return merged
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex source for a prefix trie of keywords, e.g. co(?:medy central|nan(?: o'brien...)?).
+
+    re has no Aho-Corasick; factoring shared prefixes means each position is rejected after
+    one character test instead of trying every keyword. Longer keywords win at a position.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+
+    return emit(trie)
+
+
+def _compile_keyword_matcher(
+    rules: list[tuple[str, tuple[str, ...]]],
+) -> tuple[re.Pattern, dict[str, frozenset[str]], dict[str, tuple[str, ...]]]:
+    """One trie-shaped regex over every keyword, the labels each match implies, and the
+    keywords that can overlap each match.
+
+    The scan reports non-overlapping matches, so a keyword nested in a longer match or
+    starting inside one and running past its end is never reported itself. A match implies
+    the labels of keywords inside it ("rip norm" -> "norm"); keywords that start inside it
+    ("rip norm" -> "norm macdonald live") are listed so the caller can check them directly.
+    """
+    labels_by_keyword: dict[str, set[str]] = defaultdict(set)
+    for label, keywords in rules:
+        for keyword in keywords:
+            labels_by_keyword[keyword].add(label)
+    implied = {
+        keyword: frozenset(label for inner, labels in labels_by_keyword.items() if inner in keyword for label in labels)
+        for keyword in labels_by_keyword
+    }
+    overlapping = {
+        keyword: tuple(
+            other
+            for other in labels_by_keyword
+            if other not in keyword and any(other.startswith(keyword[i:]) for i in range(1, len(keyword)))
+        )
+        for keyword in labels_by_keyword
+    }
+    return re.compile(_trie_pattern(labels_by_keyword)), implied, overlapping
 
 
-def extract_video_id(url: str) -> str:
-    match = re.search(r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([A-Za-z0-9_-]{11})", url or "")
-    return match.group(1) if match else ""
+_CATEGORY_PATTERN, _KEYWORD_LABELS, _KEYWORD_OVERLAPS = _compile_keyword_matcher(CATEGORY_RULES + TAG_RULES)
 
 
 def categorize_video(title: str, description: str) -> tuple[str, list[str]]:
     hay = f"{title} {description}".lower()
-    rules = [
-        ("SNL", ["snl", "weekend update", "saturday night live"]),
-        ("Norm Macdonald Live", ["norm macdonald live", "nml", "adam eget"]),
-        ("Podcast", ["podcast", "joe rogan", "conan o'brien needs a friend"]),
-        ("Stand-Up", ["stand up", "stand-up", "special", "set at", "comedy central"]),
-        ("Talk Show", ["letterman", "conan", "late night", "tonight show", "seth meyers"]),
-        ("Interview", ["interview", "speaks with", "talks with"]),
-        ("Compilation", ["best of", "compilation", "funniest", "moments"]),
-        ("Tribute", ["tribute", "remembering", "in memory", "rip norm"]),
-    ]
-    for label, needles in rules:
-        if any(n in hay for n in needles):
-            tags = [label.lower().replace(" ", "-")]
-            if "norm" in hay:
-                tags.append("norm-macdonald")
-            return label, tags
-    return "Other", ["other"]
-
-
-def enrich_videos() -> tuple[list[dict], Counter]:
-    data = json.loads(VIDEOS_PATH.read_text(encoding="utf-8"))
-    counts: Counter = Counter()
-    for row in data:
-        title = row.get("Title", "")
-        description = row.get("Description", "")
-        video_url = row.get("Video url", "")
-        video_id = extract_video_id(video_url)
-        category, tags = categorize_video(title, description)
-
-        row["video_id"] = video_id
-        row["normalized_url"] = f"https://www.youtube.com/watch?v={video_id}" if video_id else video_url
+    found: set[str] = set()
+    for keyword in set(_CATEGORY_PATTERN.findall(hay)):
+        found |= _KEYWORD_LABELS[keyword]
+        for other in _KEYWORD_OVERLAPS[keyword]:
+            if not _KEYWORD_LABELS[other] <= found and other in hay:
+                found |= _KEYWORD_LABELS[other]
+
+    categories = [label for label, _ in CATEGORY_RULES if label in found]
+    if not categories:
+        return "Other", ["other"]
+    tags = [label.lower().replace(" ", "-") for label in categories]
+    tags.extend(tag for tag, _ in TAG_RULES if tag in found)
+    return categories[0], tags
+
+
+_COUNT_SUFFIXES = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def _parse_count(value: object) -> int:
+    """Parse view/like counts such as "2872689", "1,234 views" or "1.2M" into an int."""
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*([kmb]?)", str(value or "").lower())
+    if not match:
+        return 0
+    return int(float(match.group(1).replace(",", "")) * _COUNT_SUFFIXES[match.group(2)])
+
+
+def _parse_duration(duration: object) -> int:
+    """Parse "H:MM:SS", "M:SS" or plain seconds into seconds; unknown values become 0."""
+    parts = [int(p) if p.isdigit() else 0 for p in str(duration or "").strip().split(":")]
+    seconds = 0
+    for part in parts[-3:]:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def canonical_video_numbers(row: dict) -> dict[str, int]:
+    return {
+        "views_int": _parse_count(row.get("Views")),
+        "likes_int": _parse_count(row.get("Likes")),
+        "duration_seconds": _parse_duration(row.get("Duration")),
+    }
+
+
+def enrich_video(row: dict) -> dict:
+    """Add derived fields to a catalog row; a curated category is kept, not recomputed."""
+    title = row.get("Title", "")
+    description = row.get("Description", "")
+    video_url = row.get("Video url", "")
+    video_id = extract_video_id(video_url)
+    category, tags = categorize_video(title, description)
+
+    row["video_id"] = video_id
+    row["normalized_url"] = f"https://www.youtube.com/watch?v={video_id}" if video_id else video_url
+    if is_missing(row.get("category")):
         row["category"] = category
-        row["tags"] = tags
-        row["source_type"] = "youtube"
+    row["tags"] = tags
+    row["source_type"] = "youtube"
+
+    uploaded = row.get("Uploaded Time", "")
+    year_match = re.search(r"(19|20)\d{2}", f"{uploaded} {title} {description}")
+    row["publish_year_guess"] = year_match.group(0) if year_match else ""
+    row.update(canonical_video_numbers(row))
+    return row
+
+
+def enrich_videos(rows: Iterable[dict], counts: Counter) -> Iterator[dict]:
+    """Enrich rows one at a time, tallying categories into counts as they pass."""
+    for row in rows:
+        row = enrich_video(row)
+        counts[row["category"]] += 1
+        yield row
+
+
+_worker_pdf: tuple[str, object] | None = None
 
-        uploaded = row.get("Uploaded Time", "")
-        year_match = re.search(r"(19|20)\d{2}", f"{uploaded} {title} {description}")
-        row["publish_year_guess"] = year_match.group(0) if year_match else ""
-        counts[category] += 1
-    return data, counts
 
+def _extract_pdf_pages(pdf_path: str, pages: list[int]) -> list[str]:
+    """Process-pool task: text of a batch of pages, reusing one PdfReader per worker."""
+    global _worker_pdf
+    from pypdf import PdfReader  # type: ignore
 
-def extract_pdf_text() -> str:
+    try:
+        if _worker_pdf is None or _worker_pdf[0] != pdf_path:
+            _worker_pdf = (pdf_path, PdfReader(pdf_path))
+        reader = _worker_pdf[1]
+        return [reader.pages[i].extract_text() or "" for i in pages]
+    except Exception as exc:
+        raise RuntimeError(f"{pdf_path}: could not extract pages {pages[0] + 1}-{pages[-1] + 1}: {exc}") from exc
+
+
+def iter_pdf_pages(
+    pdf_path: Path = PDF_PATH, workers: int | None = None, cache_dir: Path = PDF_PAGE_CACHE_DIR
+) -> Iterator[str]:
+    """Yield the text of each page in order.
+
+    Pages are cached under cache_dir/<pdf sha256>/ so re-runs skip finished pages. Missing
+    pages are extracted in batches across a process pool, with a bounded number in flight.
+    Yields nothing when pages are missing and pypdf is not installed; a PDF that cannot be
+    read raises an error naming it.
+    """
+    page_dir = cache_dir / _file_digest(pdf_path)
+    count_file = page_dir / "page-count"
     try:
         from pypdf import PdfReader  # type: ignore
-    except Exception:
-        return ""
+    except ImportError:
+        PdfReader = None
+    if count_file.exists():
+        page_count = int(count_file.read_text(encoding="utf-8"))
+    elif PdfReader is None:
+        return
+    else:
+        try:
+            page_count = len(PdfReader(str(pdf_path)).pages)
+        except Exception as exc:
+            raise RuntimeError(f"{pdf_path}: could not read PDF: {exc}") from exc
+        page_dir.mkdir(parents=True, exist_ok=True)
+        count_file.write_text(str(page_count), encoding="utf-8")
+    page_files = [page_dir / f"{i:05d}.txt" for i in range(page_count)]
+    missing = [i for i, page_file in enumerate(page_files) if not page_file.exists()]
+    if missing and PdfReader is None:
+        return
 
-    reader = PdfReader(str(PDF_PATH))
-    chunks: list[str] = []
-    for page in reader.pages:
-        chunks.append(page.extract_text() or "")
-    text = _normalize_text("\n".join(chunks))
-    return text
+    workers = workers or os.cpu_count() or 1
+    batches = iter([missing[i : i + PDF_PAGE_BATCH] for i in range(0, len(missing), PDF_PAGE_BATCH)])
+    with ProcessPoolExecutor(max_workers=workers) if missing else nullcontext() as pool:
+        pending: deque = deque()
 
+        def submit_next() -> None:
+            batch = next(batches, None)
+            if batch:
+                pending.append((batch, pool.submit(_extract_pdf_pages, str(pdf_path), batch)))
 
-def transcript_from_extracted_text(text: str) -> dict:
-    raw_segments = re.split(r"(?<=\.)\s+(?=[A-Z][a-z])", text)
-    content = []
-    for seg in raw_segments[:220]:
-        seg = _normalize_text(seg)
-        if len(seg) < 20:
-            continue
-        content.append({"speaker": "Norm Macdonald", "text": seg})
+        for _ in range(workers * 2):
+            submit_next()
+        for page_file in page_files:
+            if not page_file.exists():
+                # Missing pages are batched in order, so this is the oldest pending batch.
+                batch, future = pending.popleft()
+                submit_next()
+                for page, text in zip(batch, future.result()):
+                    page_files[page].write_text(text, encoding="utf-8")
+            yield page_file.read_text(encoding="utf-8")
+
+
+_SEGMENT_BREAK = re.compile(r"(?<=\.)\s+(?=[A-Z][a-z])")
+
+
+def iter_transcript_segments(pages: Iterable[str]) -> Iterator[str]:
+    """Split page texts into segments at sentence breaks, carrying the unfinished tail of
+    each page into the next instead of joining the whole document."""
+    tail = ""
+    for page in pages:
+        parts = _SEGMENT_BREAK.split(re.sub(r"\s+", " ", f"{tail} {page}").strip())
+        tail = parts.pop()
+        for part in parts:
+            yield _normalize_text(part)
+    if tail:
+        yield _normalize_text(tail)
+
+
+def transcript_from_segments(segments: Iterable[str]) -> dict:
+    content = [{"speaker": "Norm Macdonald", "text": seg} for seg in segments if len(seg) >= 20]
     return {
         "id": "nml-jokes-transcribed-pdf",
         "title": "Norm Macdonald Live Jokes (PDF Extraction)",
@@ -214,31 +629,466 @@ def transcript_from_extracted_text(text: str) -> dict:
     }
 
 
-def upsert_transcript(entry: dict) -> list[dict]:
-    current = json.loads(TRANSCRIPTS_PATH.read_text(encoding="utf-8"))
-    filtered = [item for item in current if item.get("id") != entry["id"]]
-    filtered.append(entry)
-    return filtered
+def _tokenize(text: str) -> list[str]:
+    # Mirrors tokenize() in search.js: lowercase, drop every mark (\p{M}), split on non-alphanumerics.
+    folded = unicodedata.normalize("NFKD", (text or "").lower())
+    folded = "".join(ch for ch in folded if not unicodedata.category(ch).startswith("M"))
+    return re.findall(r"[a-z0-9]+", folded)
+
+
+def _snippet(text: str, limit: int = 120) -> str:
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _search_display(collection: str, row: dict) -> list | None:
+    """Doc-store entry [title, subtitle, href] (plus a trailing 1 for external links)."""
+    if collection == "jokes":
+        episode = row.get("episode") or ""
+        href = "./jokes.html" + (f"?q={quote(episode, safe='')}" if episode else "")
+        return [_snippet(row.get("joke") or ""), episode, href]
+    if collection == "videos":
+        video_id = extract_video_id(row.get("Video url", ""))
+        if not video_id:
+            return None
+        subtitle = row.get("Channel name") or row.get("category") or ""
+        return [row.get("Title") or "", subtitle, f"https://www.youtube.com/watch?v={video_id}", 1]
+    if collection == "nml":
+        title = f"S{row.get('season')}E{row.get('episode')}: {row.get('guest') or ''}"
+        youtube_url = row.get("youtube_url") or ""
+        if youtube_url:
+            return [title, "Norm Macdonald Live", youtube_url, 1]
+        return [title, "Norm Macdonald Live", "./nml-episodes.html"]
+    if collection == "quotes":
+        return [_snippet(row.get("quote") or ""), row.get("source") or "", "./quotes.html"]
+    if collection == "articles":
+        return [row.get("title") or "", row.get("source") or "", row.get("url") or "", 1]
+    raise ValueError(f"unknown search collection: {collection}")
+
+
+def build_search_index(collections: dict[str, list[dict]]) -> dict:
+    """Tokenize every collection into sorted terms with per-collection posting lists.
+
+    postings[i][collection] is a flat [doc, weight, doc, weight, ...] list for terms[i],
+    where doc indexes docs[collection] and weight sums the field weights the term hit.
+    """
+    docs: dict[str, list[list]] = {}
+    inverted: dict[str, dict[str, list[int]]] = {}
+    for collection, weights in SEARCH_FIELD_WEIGHTS.items():
+        docs[collection] = []
+        for row in collections.get(collection, []):
+            display = _search_display(collection, row)
+            if display is None:
+                continue
+            doc = len(docs[collection])
+            docs[collection].append(display)
+            scores: Counter = Counter()
+            for field, weight in weights.items():
+                for term in set(_tokenize(str(row.get(field) or ""))):
+                    scores[term] += weight
+            for term, score in scores.items():
+                inverted.setdefault(term, {}).setdefault(collection, []).extend((doc, score))
+
+    terms = sorted(inverted)
+    return {
+        "version": STAGE_VERSIONS["search-index"],
+        "docs": docs,
+        "terms": terms,
+        "postings": [inverted[term] for term in terms],
+    }
+
+
+def _video_card(index: int, row: dict) -> dict:
+    """Display fields for one card, shaped like the objects videos.js builds in loadVideos()."""
+    return {
+        "id": index,
+        "url": extract_video_id(row.get("Video url", "")),
+        "title": row.get("Title") or "Untitled Video",
+        "channel": row.get("Channel name") or "N/A",
+        "duration": row.get("Duration") or "N/A",
+        "views": row.get("Views") or "N/A",
+        "thumbnail": row.get("Thumbnail url") or "",
+        "category": row.get("category") or "Other",
+    }
+
+
+# Punctuation in the order of the Unicode root collation that String.localeCompare uses,
+# so title orders built here match the browser's. Curly quotes collate with straight ones.
+_COLLATION_PUNCTUATION = "_-‐‑‒–—―,;:!¡?¿.…·'\"()[]{}§¶@*/\\&#%‰†‡•`´˜^¨+±÷×<=>¬|¦~¤¢$£¥€"
+_COLLATION_ALIASES = {"‘": "'", "’": "'", "‚": "'", "“": '"', "”": '"', "„": '"'}
+_PUNCTUATION_RANK = {ch: i for i, ch in enumerate(_COLLATION_PUNCTUATION)}
+
+
+def _title_sort_key(title: str) -> tuple[list[tuple[int, int]], list[int]]:
+    """Approximate localeCompare(): whitespace < punctuation < symbols < digits < letters,
+    ignoring case and accents, with lowercase first on ties."""
+    primary: list[tuple[int, int]] = []
+    tertiary: list[int] = []
+    for ch in unicodedata.normalize("NFKD", title):
+        if unicodedata.combining(ch):
+            continue
+        folded = ch.casefold()
+        category = unicodedata.category(ch)[0]
+        if category == "Z" or ch.isspace():
+            primary.append((0, 0))
+        elif _COLLATION_ALIASES.get(ch, ch) in _PUNCTUATION_RANK:
+            primary.append((1, _PUNCTUATION_RANK[_COLLATION_ALIASES.get(ch, ch)]))
+        elif category in "PS":
+            primary.append((2, ord(ch)))
+        else:
+            primary.append((3 if category == "N" else 4, ord(folded[0])))
+        tertiary.append(0 if ch == folded else 1)
+    return primary, tertiary
+
+
+# Sort orders offered by the videos page, as (key, reverse) over the entries built in
+# video_sort_permutations(). Python's sort is stable for reverse=True as well, so ties
+# keep catalog order just like Array.prototype.sort.
+VIDEO_SORT_ORDERS = {
+    "title-asc": (lambda entry: entry[1], False),
+    "title-desc": (lambda entry: entry[1], True),
+    "views-desc": (lambda entry: entry[2]["views_int"], True),
+    "duration-desc": (lambda entry: entry[2]["duration_seconds"], True),
+    "duration-asc": (lambda entry: entry[2]["duration_seconds"], False),
+}
+
+
+def video_sort_permutations(videos: list[dict]) -> dict[str, list[int]]:
+    """Catalog indices of every playable video, presorted for each supported sort order."""
+    entries = []
+    for i, row in enumerate(videos):
+        if not extract_video_id(row.get("Video url", "")):
+            continue
+        title = _title_sort_key(row.get("Title") or "Untitled Video")
+        entries.append((i, title, canonical_video_numbers(row)))
+    return {
+        order: [entry[0] for entry in sorted(entries, key=key, reverse=reverse)]
+        for order, (key, reverse) in VIDEO_SORT_ORDERS.items()
+    }
 
 
-def main() -> None:
-    merged = merge_jokes([load_existing_jokes(), load_csv_jokes(), load_txt_jokes()])
-    JOKES_PATH.write_text(json.dumps(merged, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+def build_video_pages(videos: list[dict], out_dir: Path = VIDEO_PAGES_DIR, catalog_digest: str = "") -> dict:
+    """Write card shards and sort-index.json for every sort order plus manifest.json.
 
-    videos, category_counts = enrich_videos()
-    VIDEOS_PATH.write_text(json.dumps(videos, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    sort-index.json maps each order to catalog indices so videos.js can filter a presorted
+    list instead of sorting. It also records catalog_digest, the sha256 of the catalog file
+    the indices refer to, so the client can tell whether they match the catalog it loaded.
+    Returns the manifest.
+    """
+    cards = {i: _video_card(i, row) for i, row in enumerate(videos)}
+    permutations = video_sort_permutations(videos)
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    pdf_text = extract_pdf_text()
-    if pdf_text:
-        transcript_entry = transcript_from_extracted_text(pdf_text)
-        transcripts = upsert_transcript(transcript_entry)
-        TRANSCRIPTS_PATH.write_text(json.dumps(transcripts, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    orders: dict[str, list[str]] = {}
+    written: set[str] = set()
+    for order, indices in permutations.items():
+        ordered = [cards[i] for i in indices]
+        orders[order] = []
+        for n, start in enumerate(range(0, len(ordered), VIDEO_SHARD_SIZE)):
+            name = f"{order}-{n:03d}.json"
+            shard = ordered[start : start + VIDEO_SHARD_SIZE]
+            write_if_changed(out_dir / name, json.dumps(shard, ensure_ascii=False, separators=(",", ":")) + "\n")
+            orders[order].append(name)
+            written.add(name)
+    sort_index = {"catalog": catalog_digest, "orders": permutations}
+    write_if_changed(out_dir / "sort-index.json", json.dumps(sort_index, separators=(",", ":")) + "\n")
 
-    print(f"Jokes merged: {len(merged)}")
+    playable = permutations["title-asc"]
+    manifest = {
+        "version": STAGE_VERSIONS["video-pages"],
+        "total": len(playable),
+        "shardSize": VIDEO_SHARD_SIZE,
+        "categories": dict(Counter(cards[i]["category"] for i in playable)),
+        "orders": orders,
+    }
+    write_if_changed(out_dir / "manifest.json", _dump_json(manifest))
+
+    # Drop shards left over from a larger catalog.
+    for stale in out_dir.glob("*-[0-9][0-9][0-9].json"):
+        if stale.name not in written:
+            stale.unlink()
+    return manifest
+
+
+# Catalog collection -> the published file exported from it.
+CATALOG_FILES = {
+    "jokes": JOKES_PATH,
+    "videos": VIDEOS_PATH,
+    "nml": NML_EPISODES_PATH,
+    "transcripts": TRANSCRIPTS_PATH,
+}
+
+
+def sync_catalog(catalog: Catalog) -> None:
+    """Import every published file whose bytes differ from the catalog's last import/export."""
+    for collection, path in CATALOG_FILES.items():
+        digest = _file_digest(path)
+        if digest and catalog.digest(collection) != digest:
+            count = catalog.import_json(collection, path)
+            catalog.set_digest(collection, digest)
+            print(f"catalog: imported {count} {collection} rows from {path.name}")
+
+
+def export_collection(catalog: Catalog, collection: str) -> bool:
+    path = CATALOG_FILES[collection]
+    written = write_json_array(path, catalog.rows(collection))
+    catalog.set_digest(collection, _file_digest(path))
+    return written
+
+
+def _record_digest(row: dict) -> str:
+    canonical = json.dumps(row, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def build_collection_delta(catalog: Catalog, collection: str, entry: dict) -> dict | None:
+    """Bump the collection's version if any record changed since its snapshot.
+
+    Writes data-versions/<collection>/<version>.json with the added and changed records
+    and removed keys, replaces snapshot.json (key -> record digest at the latest version,
+    in catalog order) and returns {"version", "count", "delta"}; None when nothing changed.
+    "delta" is None when there is no snapshot to diff against, or when the snapshot and
+    the manifest entry disagree about the version (a lost manifest or snapshot). The new
+    version is then numbered past both, so no client mistakes it for one it already has.
+    """
+    out_dir = DELTAS_DIR / collection
+    snapshot_path = out_dir / "snapshot.json"
+    snapshot = json.loads(snapshot_path.read_text(encoding="utf-8")) if snapshot_path.exists() else None
+    current = {catalog.key(collection, row): _record_digest(row) for row in catalog.rows(collection)}
+    known = entry.get("version", 0)
+    if snapshot is not None and snapshot["version"] != known:
+        print(f"{collection}: snapshot is version {snapshot['version']} but the manifest says {known}; starting a new history")
+        known = max(known, snapshot["version"])
+        snapshot = None
+    elif snapshot is not None and snapshot["records"] == current and list(snapshot["records"]) == list(current):
+        return None
+
+    version = known + 1
+    out_dir.mkdir(parents=True, exist_ok=True)
+    delta_entry = None
+    if snapshot is not None:
+        previous = snapshot["records"]
+        delta = {
+            "collection": collection,
+            "from": snapshot["version"],
+            "to": version,
+            "added": [[key, catalog.get(collection, key)] for key in current if key not in previous],
+            "changed": [
+                [key, catalog.get(collection, key)] for key in current if key in previous and previous[key] != current[key]
+            ],
+            "removed": [key for key in previous if key not in current],
+        }
+        # Clients keep surviving records in place and append added ones; spell the order
+        # out only when the catalog was reordered some other way.
+        appended = [key for key in previous if key in current] + [key for key, _ in delta["added"]]
+        if appended != list(current):
+            delta["order"] = list(current)
+        name = f"{version}.json"
+        payload = json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n"
+        write_if_changed(out_dir / name, payload)
+        delta_entry = {
+            "version": version,
+            "file": f"{collection}/{name}",
+            "added": len(delta["added"]),
+            "changed": len(delta["changed"]),
+            "removed": len(delta["removed"]),
+            "bytes": len(payload.encode("utf-8")),
+        }
+    snapshot = {"version": version, "records": current}
+    write_if_changed(snapshot_path, json.dumps(snapshot, separators=(",", ":")) + "\n")
+    return {"version": version, "count": len(current), "delta": delta_entry}
+
+
+def build_deltas(args: argparse.Namespace, catalog: Catalog) -> bool:
+    """Maintain data-versions/manifest.json for clients that cache collections locally.
+
+    A client holding version v of a collection applies the deltas numbered v+1 through
+    "version" in order: drop "removed", upsert "added" and "changed" by key, and take the
+    record order from "order" when present, else keep survivors in place and append the
+    added records. Outside "oldest" <= v <= "version" it downloads "file" again instead.
+    Paths in the manifest are relative to it. Delta files never change once written, so
+    only the manifest needs revalidating. data-versions/ is committed with the data so
+    the history carries over between checkouts; --verify-deltas checks it is current.
+    """
+    manifest_path = DELTAS_DIR / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    else:
+        if any(DELTAS_DIR.glob("*/snapshot.json")):
+            print(f"{DELTAS_DIR.name}/manifest.json is missing; collections with a snapshot start a new history")
+        manifest = {"collections": {}}
+    for collection, path in CATALOG_FILES.items():
+        entry = manifest["collections"].setdefault(collection, {"version": 0, "deltas": []})
+        result = build_collection_delta(catalog, collection, entry)
+        if result is not None:
+            entry["version"] = result["version"]
+            entry["count"] = result["count"]
+            if result["delta"]:
+                entry["deltas"].append(result["delta"])
+                print(
+                    f"{collection}: version {result['version']} "
+                    f"(+{result['delta']['added']} ~{result['delta']['changed']} -{result['delta']['removed']})"
+                )
+            else:
+                # Nothing leads to this version, so every older delta is dead weight.
+                entry["deltas"] = []
+                for stale in (DELTAS_DIR / collection).glob("[0-9]*.json"):
+                    stale.unlink()
+                print(f"{collection}: version {result['version']} (new history)")
+            # Old deltas are dropped; clients that far behind refetch the full file.
+            while len(entry["deltas"]) > DELTA_HISTORY:
+                (DELTAS_DIR / entry["deltas"].pop(0)["file"]).unlink(missing_ok=True)
+        entry["file"] = Path(os.path.relpath(path, DELTAS_DIR)).as_posix()
+        entry["key"] = "video_id" if collection == "videos" else "id"
+        entry["digest"] = _file_digest(path)
+        entry["oldest"] = entry["deltas"][0]["version"] - 1 if entry["deltas"] else entry["version"]
+    write_if_changed(manifest_path, _dump_json(manifest))
+    return True
+
+
+def verify_deltas() -> list[str]:
+    """Ways data-versions/ fails to describe the published files; empty when it is current."""
+    manifest_path = DELTAS_DIR / "manifest.json"
+    if not manifest_path.exists():
+        return [f"{DELTAS_DIR.name}/manifest.json is missing"]
+    collections = json.loads(manifest_path.read_text(encoding="utf-8"))["collections"]
+    problems = []
+    for collection, path in CATALOG_FILES.items():
+        entry = collections.get(collection)
+        if entry is None:
+            problems.append(f"{collection}: not in the manifest")
+            continue
+        if entry["digest"] != _file_digest(path):
+            problems.append(f"{collection}: {path.name} changed since version {entry['version']}")
+        snapshot_path = DELTAS_DIR / collection / "snapshot.json"
+        if not snapshot_path.exists() or json.loads(snapshot_path.read_text(encoding="utf-8"))["version"] != entry["version"]:
+            problems.append(f"{collection}: snapshot does not match version {entry['version']}")
+        problems.extend(f"{collection}: {d['file']} is missing" for d in entry["deltas"] if not (DELTAS_DIR / d["file"]).exists())
+    return problems
+
+
+def build_jokes(args: argparse.Namespace, catalog: Catalog) -> bool:
+    sources = [load_existing_jokes(catalog), load_csv_jokes(), load_txt_jokes()]
+    merged, decisions = merge_jokes(sources, args.near_duplicate_threshold, existing_joke_ids(catalog))
+    catalog.replace("jokes", merged)
+    export_collection(catalog, "jokes")
+    report = {"threshold": args.near_duplicate_threshold, "merged": len(decisions), "decisions": decisions}
+    write_if_changed(JOKES_MERGE_REPORT_PATH, _dump_json(report))
+    print(f"Jokes merged: {len(merged)} ({len(decisions)} near-duplicates folded in)")
+    return True
+
+
+def build_videos(args: argparse.Namespace, catalog: Catalog) -> bool:
+    category_counts: Counter = Counter()
+    # Rows are paged out of the catalog and upserted back one at a time.
+    catalog.upsert_many("videos", enrich_videos(catalog.rows("videos"), category_counts))
+    export_collection(catalog, "videos")
     print("Video categories:")
     for cat, n in category_counts.most_common():
         print(f"  - {cat}: {n}")
-    print(f"PDF transcript extracted: {'yes' if pdf_text else 'no (pypdf unavailable)'}")
+    return True
+
+
+def build_transcripts(args: argparse.Namespace, catalog: Catalog) -> bool:
+    segments = iter_transcript_segments(iter_pdf_pages(PDF_PATH, args.pdf_workers))
+    transcript_entry = transcript_from_segments(segments)
+    if not transcript_entry["content"]:
+        print("PDF transcript extracted: no (pypdf unavailable)")
+        return False
+    catalog.upsert("transcripts", transcript_entry)
+    export_collection(catalog, "transcripts")
+    print(f"PDF transcript extracted: {len(transcript_entry['content'])} segments")
+    return True
+
+
+def build_search(args: argparse.Namespace, catalog: Catalog) -> bool:
+    collections = {name: list(catalog.rows(name)) for name in ("jokes", "videos", "nml")}
+    for name, path in (("quotes", QUOTES_PATH), ("articles", ARTICLES_PATH)):
+        collections[name] = json.loads(path.read_text(encoding="utf-8"))
+    index = build_search_index(collections)
+    write_if_changed(SEARCH_INDEX_PATH, json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n")
+    print(f"Search index terms: {len(index['terms'])}")
+    return True
+
+
+def build_videos_pages(args: argparse.Namespace, catalog: Catalog) -> bool:
+    videos = list(catalog.rows("videos"))
+    manifest = build_video_pages(videos, catalog_digest=_file_digest(VIDEOS_PATH))
+    shards = sum(len(names) for names in manifest["orders"].values())
+    print(f"Video page shards: {shards} ({manifest['total']} videos, {manifest['shardSize']} per shard)")
+    return True
+
+
+# (stage name, input files, output files, builder, CLI options that change its output).
+# A stage whose published file is also its source (jokes, videos) lists it as an output
+# only: a hand edit changes the recorded output digest, which reruns the stage.
+STAGES = [
+    (
+        "jokes",
+        [FULL_JOKES_CSV, TRANSCRIBED_TXT],
+        [JOKES_PATH, JOKES_MERGE_REPORT_PATH],
+        build_jokes,
+        ["near_duplicate_threshold"],
+    ),
+    ("videos", [], [VIDEOS_PATH], build_videos, []),
+    ("transcripts", [PDF_PATH], [TRANSCRIPTS_PATH], build_transcripts, []),
+    (
+        "search-index",
+        [JOKES_PATH, VIDEOS_PATH, NML_EPISODES_PATH, QUOTES_PATH, ARTICLES_PATH],
+        [SEARCH_INDEX_PATH],
+        build_search,
+        [],
+    ),
+    ("video-pages", [VIDEOS_PATH], [VIDEO_PAGES_DIR / "manifest.json"], build_videos_pages, []),
+    ("deltas", list(CATALOG_FILES.values()), [DELTAS_DIR / "manifest.json"], build_deltas, []),
+]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="rebuild every stage regardless of the manifest")
+    parser.add_argument(
+        "--near-duplicate-threshold",
+        type=float,
+        default=NEAR_DUPLICATE_THRESHOLD,
+        help=f"shingle Jaccard similarity at which jokes are merged (default {NEAR_DUPLICATE_THRESHOLD})",
+    )
+    parser.add_argument("--pdf-workers", type=int, default=None, help="processes for PDF page extraction (default: CPU count)")
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=[name for name, *_ in STAGES],
+        help="run only this stage; repeat for several (default: every stage)",
+    )
+    parser.add_argument(
+        "--verify-deltas",
+        action="store_true",
+        help="only check that data-versions/ matches the published files; exit 1 if not",
+    )
+    args = parser.parse_args(argv)
+
+    if args.verify_deltas:
+        problems = verify_deltas()
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit("data-versions/ is out of date: run scripts_data_pipeline.py and commit data-versions/")
+        print("data-versions/ is current")
+        return
+
+    manifest = BuildManifest()
+    with Catalog(CATALOG_PATH) as catalog:
+        sync_catalog(catalog)
+        for name, inputs, outputs, build, options in STAGES:
+            if args.stage and name not in args.stage:
+                continue
+            params = {option: getattr(args, option) for option in options}
+            if not args.force and manifest.is_fresh(name, inputs, outputs, params):
+                print(f"{name}: up to date, skipped")
+                continue
+            if build(args, catalog):
+                # Saved per stage so a later failure does not lose the stages already built.
+                manifest.record(name, inputs, outputs, params)
+                manifest.save()
 
 
 if __name__ == "__main__":
@@ -12,6 +12,23 @@
     var searchResults = null;
     var isOpen = false;
 
+    // Prebuilt by scripts_data_pipeline.py; resolved against this script so v2/ pages work too
+    var SEARCH_INDEX_URL = new URL('search-index.json', document.currentScript.src).href;
+
+    // Optional query API (api_server.py), enabled per page with <meta name="archive-api" content="...">
+    var apiMeta = document.querySelector('meta[name="archive-api"]');
+    var API_URL = apiMeta && apiMeta.content ? apiMeta.content.replace(/\/+$/, '') : '';
+    var latestQuery = '';
+
+    // Result groups in display order, keyed by collection name in the index
+    var SEARCH_GROUPS = [
+        { collection: 'jokes', label: 'Jokes', icon: 'smile', limit: 4 },
+        { collection: 'videos', label: 'Videos', icon: 'video', limit: 4 },
+        { collection: 'nml', label: 'NML Episodes', icon: 'mic', limit: 4 },
+        { collection: 'quotes', label: 'Quotes', icon: 'quote', limit: 3 },
+        { collection: 'articles', label: 'Articles', icon: 'book', limit: 3 }
+    ];
+
     // Debounce utility
     function debounce(fn, delay) {
         var timer;
@@ -109,8 +126,8 @@
         searchInput.value = '';
         searchInput.focus();
         showHint();
-        // Load data on first open
-        if (!searchData) loadSearchData();
+        // Load data on first open; with the API configured nothing is downloaded up front
+        if (!searchData && !API_URL) loadSearchData();
     }
 
     function closeSearch() {
@@ -134,32 +151,10 @@
 
     async function loadSearchData() {
         try {
-            var results = await Promise.all([
-                fetch('./jokes-data.json').then(function(r) { return r.json(); }),
-                fetch('./consolidated_youtube_data.json').then(function(r) { return r.json(); }),
-                fetch('./quotes-data.json').then(function(r) { return r.json(); }),
-                fetch('./articles-data.json').then(function(r) { return r.json(); }),
-                fetch('./nml-episodes-data.json').then(function(r) { return r.json(); })
-            ]);
-
-            searchData = {
-                jokes: results[0].map(function(j) {
-                    return { text: j.joke, episode: j.episode || '', guest: j.guest || '', url: j.url, time: j.time };
-                }),
-                videos: results[1].map(function(v) {
-                    var vidMatch = (v['Video url'] || '').match(/(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\s]+)/);
-                    return { title: v['Title'] || '', channel: v['Channel name'] || '', videoId: vidMatch ? vidMatch[1] : '', category: v['category'] || '' };
-                }).filter(function(v) { return v.videoId; }),
-                quotes: results[2].map(function(q) {
-                    return { quote: q.quote, source: q.source || '', category: q.category || '' };
-                }),
-                articles: results[3].map(function(a) {
-                    return { title: a.title, source: a.source || '', url: a.url, excerpt: a.excerpt || '' };
-                }),
-                nml: results[4].map(function(e) {
-                    return { guest: e.guest, season: e.season, episode: e.episode, youtube_url: e.youtube_url || '', slug: e.slug || '' };
-                })
-            };
+            searchData = await fetch(SEARCH_INDEX_URL).then(function(r) {
+                if (!r.ok) throw new Error('HTTP ' + r.status);
+                return r.json();
+            });
         } catch (err) {
             console.error('Search data load failed:', err);
             searchResults.innerHTML = '<div class="search-hint"><p>Failed to load search data. Please refresh.</p></div>';
@@ -170,77 +165,110 @@
     // Search Logic
     // ===================================
 
+    // Must match _tokenize() in scripts_data_pipeline.py
+    function tokenize(text) {
+        return (text || '').toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '').match(/[a-z0-9]+/g) || [];
+    }
+
+    // First position in the sorted term list that is >= prefix
+    function lowerBound(terms, prefix) {
+        var lo = 0, hi = terms.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >>> 1;
+            if (terms[mid] < prefix) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    // Union of the posting lists of every term starting with token: doc -> best weight
+    function postingsForToken(token, collection) {
+        var terms = searchData.terms;
+        var hits = new Map();
+        for (var i = lowerBound(terms, token); i < terms.length && terms[i].lastIndexOf(token, 0) === 0; i++) {
+            var list = searchData.postings[i][collection];
+            if (!list) continue;
+            for (var k = 0; k < list.length; k += 2) {
+                var prev = hits.get(list[k]) || 0;
+                if (list[k + 1] > prev) hits.set(list[k], list[k + 1]);
+            }
+        }
+        return hits;
+    }
+
+    // Docs matching every query token, best score first
+    function searchCollection(collection, tokens) {
+        var sets = tokens.map(function(token) { return postingsForToken(token, collection); });
+        sets.sort(function(a, b) { return a.size - b.size; });
+        var scores = [];
+        sets[0].forEach(function(weight, doc) {
+            var total = weight;
+            for (var i = 1; i < sets.length; i++) {
+                var w = sets[i].get(doc);
+                if (!w) return;
+                total += w;
+            }
+            scores.push([doc, total]);
+        });
+        scores.sort(function(a, b) { return b[1] - a[1] || a[0] - b[0]; });
+        return scores.map(function(pair) { return searchData.docs[collection][pair[0]]; });
+    }
+
+    function toGroup(group, docs, count) {
+        return { label: group.label, icon: group.icon, count: count, items: docs.slice(0, group.limit).map(function(doc) {
+            return { title: doc[0], subtitle: doc[1], href: doc[2], external: doc[3] === 1 };
+        })};
+    }
+
+    // Same ranking as searchCollection(), computed by the API server; falls back to the
+    // local index if the server can't be reached
+    function performApiSearch(query) {
+        var limit = Math.max.apply(null, SEARCH_GROUPS.map(function(group) { return group.limit; }));
+        fetch(API_URL + '/api/search?q=' + encodeURIComponent(query) + '&limit=' + limit).then(function(r) {
+            if (!r.ok) throw new Error('HTTP ' + r.status);
+            return r.json();
+        }).then(function(result) {
+            if (query !== latestQuery) return;
+            var byCollection = {};
+            result.groups.forEach(function(g) { byCollection[g.collection] = g; });
+            var groups = [];
+            SEARCH_GROUPS.forEach(function(group) {
+                var found = byCollection[group.collection];
+                if (found) groups.push(toGroup(group, found.items, found.count));
+            });
+            renderResults(groups, query);
+        }).catch(function(err) {
+            console.error('Search API failed, using the local index:', err);
+            API_URL = '';
+            loadSearchData().then(function() {
+                if (query === latestQuery) performSearch(query);
+            });
+        });
+    }
+
     function performSearch(query) {
+        latestQuery = query;
         if (!query || query.length < 2) {
             showHint();
             return;
         }
+        if (API_URL) {
+            performApiSearch(query);
+            return;
+        }
         if (!searchData) {
             searchResults.innerHTML = '<div class="search-hint"><p>Loading data...</p></div>';
             return;
         }
 
-        var term = query.toLowerCase();
+        var tokens = tokenize(query);
         var groups = [];
-
-        // Search jokes
-        var jokeResults = searchData.jokes.filter(function(j) {
-            return j.text.toLowerCase().indexOf(term) !== -1 ||
-                   j.episode.toLowerCase().indexOf(term) !== -1 ||
-                   j.guest.toLowerCase().indexOf(term) !== -1;
-        });
-        if (jokeResults.length > 0) {
-            groups.push({ label: 'Jokes', icon: 'smile', count: jokeResults.length, items: jokeResults.slice(0, 4).map(function(j) {
-                var snippet = j.text.length > 120 ? j.text.substring(0, 120) + '...' : j.text;
-                var href = './jokes.html' + (j.episode ? '?q=' + encodeURIComponent(j.episode) : '');
-                return { title: snippet, subtitle: j.episode || '', href: href };
-            })});
-        }
-
-        // Search videos
-        var videoResults = searchData.videos.filter(function(v) {
-            return v.title.toLowerCase().indexOf(term) !== -1 ||
-                   v.channel.toLowerCase().indexOf(term) !== -1 ||
-                   v.category.toLowerCase().indexOf(term) !== -1;
-        });
-        if (videoResults.length > 0) {
-            groups.push({ label: 'Videos', icon: 'video', count: videoResults.length, items: videoResults.slice(0, 4).map(function(v) {
-                return { title: v.title, subtitle: v.channel || v.category, href: 'https://www.youtube.com/watch?v=' + v.videoId, external: true };
-            })});
-        }
-
-        // Search NML episodes
-        var nmlResults = searchData.nml.filter(function(e) {
-            return e.guest.toLowerCase().indexOf(term) !== -1;
-        });
-        if (nmlResults.length > 0) {
-            groups.push({ label: 'NML Episodes', icon: 'mic', count: nmlResults.length, items: nmlResults.slice(0, 4).map(function(e) {
-                return { title: 'S' + e.season + 'E' + e.episode + ': ' + e.guest, subtitle: 'Norm Macdonald Live', href: e.youtube_url || './nml-episodes.html', external: !!e.youtube_url };
-            })});
-        }
-
-        // Search quotes
-        var quoteResults = searchData.quotes.filter(function(q) {
-            return q.quote.toLowerCase().indexOf(term) !== -1 ||
-                   q.source.toLowerCase().indexOf(term) !== -1;
-        });
-        if (quoteResults.length > 0) {
-            groups.push({ label: 'Quotes', icon: 'quote', count: quoteResults.length, items: quoteResults.slice(0, 3).map(function(q) {
-                var snippet = q.quote.length > 120 ? q.quote.substring(0, 120) + '...' : q.quote;
-                return { title: snippet, subtitle: q.source || '', href: './quotes.html' };
-            })});
-        }
-
-        // Search articles
-        var articleResults = searchData.articles.filter(function(a) {
-            return a.title.toLowerCase().indexOf(term) !== -1 ||
-                   a.source.toLowerCase().indexOf(term) !== -1 ||
-                   a.excerpt.toLowerCase().indexOf(term) !== -1;
-        });
-        if (articleResults.length > 0) {
-            groups.push({ label: 'Articles', icon: 'book', count: articleResults.length, items: articleResults.slice(0, 3).map(function(a) {
-                return { title: a.title, subtitle: a.source, href: a.url, external: true };
-            })});
+        if (tokens.length > 0) {
+            SEARCH_GROUPS.forEach(function(group) {
+                var docs = searchCollection(group.collection, tokens);
+                if (docs.length === 0) return;
+                groups.push(toGroup(group, docs, docs.length));
+            });
         }
 
         renderResults(groups, query);
@@ -314,9 +342,9 @@
     }
 
     function highlightMatch(html, query) {
-        if (!query) return html;
-        var escaped = query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-        var regex = new RegExp('(' + escaped + ')', 'gi');
+        var tokens = tokenize(query);
+        if (tokens.length === 0) return html;
+        var regex = new RegExp('(' + tokens.join('|') + ')', 'gi');
         return html.replace(regex, '<mark>$1</mark>');
     }
 
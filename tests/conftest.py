@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class Site:
+    """Pages served by the local test server, with the requests it received."""
+
+    def __init__(self) -> None:
+        self.pages: dict[str, str] = {}
+        self.headers: dict[str, dict[str, str]] = {}
+        self.statuses: dict[str, list[int]] = {}  # statuses to answer with before serving the page
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.connections = 0
+        self.url = ""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    site: Site
+
+    def setup(self) -> None:
+        super().setup()
+        self.site.connections += 1
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        site = self.site
+        site.requests.append((self.path, {k.lower(): v for k, v in self.headers.items()}))
+        pending = site.statuses.get(self.path)
+        if pending:
+            return self._reply(pending.pop(0), b"", {})
+        if self.path not in site.pages:
+            return self._reply(404, b"not found", {})
+        body = site.pages[self.path].encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()[:12]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._reply(304, b"", {"ETag": etag})
+        headers = {"ETag": etag, **site.headers.get(self.path, {})}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._reply(200, body, headers)
+
+    def _reply(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site():
+    """A local HTTP/1.1 server with keep-alive, ETag revalidation and gzip."""
+    site = Site()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), type("Handler", (_Handler,), {"site": site}))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    site.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield site
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,110 @@
+"""api_server: collection queries and the HTTP/1.1 connection handling."""
+import asyncio
+
+import pytest
+
+from api_server import ApiServer, CollectionIndex, SearchIndex
+
+JOKES = [
+    {"id": 0, "joke": "A moth walks into a podiatrist's office", "guest": "Super Dave", "episode": "S01E01"},
+    {"id": 1, "joke": "The Swiss are officially neutral", "guest": "Super Dave", "episode": "S01E01"},
+    {"id": 2, "joke": "Bob Saget and the cow", "guest": "Bob Saget", "episode": "S01E02"},
+    {"id": 3, "joke": "Another moth, another office", "guest": "David Spade", "episode": "S01E03"},
+]
+
+
+@pytest.fixture
+def api():
+    jokes = CollectionIndex(
+        "jokes",
+        JOKES,
+        {"guest": "guest", "episode": "episode"},
+        lambda row: f"{row['joke']} {row['guest']}",
+        {"default": [0, 1, 2, 3], "guest-asc": [2, 3, 0, 1]},
+    )
+    return ApiServer({"jokes": jokes}, SearchIndex({"docs": {}, "terms": [], "postings": []}), 16, "*")
+
+
+def test_pagination(api):
+    status, page = api.route("/api/jokes", {"per_page": "3", "page": "2", "sort": "guest-asc"})
+    assert status == 200
+    assert (page["total"], page["pages"], page["page"]) == (4, 2, 2)
+    assert [item["id"] for item in page["items"]] == [1]
+
+
+def test_filters_queries_and_facets(api):
+    _, page = api.route("/api/jokes", {"guest": "super dave", "q": "mot", "facets": "guest"})
+    assert [item["id"] for item in page["items"]] == [0]
+    # A facet ignores its own filter, so other guests still show their counts.
+    assert page["facets"]["guest"] == {"Super Dave": 1, "David Spade": 1}
+
+
+def test_bad_parameters_are_400(api):
+    assert api.route("/api/jokes", {"per_page": "1000"})[0] == 400
+    assert api.route("/api/jokes", {"colour": "blue"})[0] == 400
+    assert api.route("/api/nothing", {})[0] == 404
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0))) if status not in (204, 304) else b""
+    return status, headers, body
+
+
+def exchange(api, *requests):
+    """Send raw requests on one connection; return every response read before it closes."""
+
+    async def run():
+        server = await asyncio.start_server(api.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for request in requests:
+                writer.write(request)
+                await writer.drain()
+                try:
+                    responses.append(await read_response(reader))
+                except (asyncio.IncompleteReadError, IndexError, ConnectionError):
+                    break
+            writer.close()
+            return responses
+
+    return asyncio.run(asyncio.wait_for(run(), 10))
+
+
+GET = b"GET /api/jokes?per_page=2 HTTP/1.1\r\nHost: x\r\n\r\n"
+
+
+def test_etag_revalidation_returns_304(api):
+    [(status, headers, body)] = exchange(api, GET)
+    assert status == 200 and body
+    revalidate = GET.replace(b"\r\n\r\n", f"\r\nIf-None-Match: {headers['etag']}\r\n\r\n".encode())
+    [(status, _, body)] = exchange(api, revalidate)
+    assert (status, body) == (304, b"")
+
+
+def test_request_body_is_consumed_before_the_next_request(api):
+    post = b"POST /api/jokes HTTP/1.1\r\nHost: x\r\nContent-Length: 11\r\n\r\nhello=world"
+    responses = exchange(api, post, GET)
+    assert [status for status, _, _ in responses] == [405, 200]
+
+
+def test_oversized_request_line_is_400(api):
+    long_get = b"GET /api/jokes?q=" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n"
+    [(status, headers, _)] = exchange(api, long_get)
+    assert status == 400 and headers["connection"] == "close"
+
+
+def test_oversized_header_is_431(api):
+    [(status, _, _)] = exchange(api, b"GET /api/ HTTP/1.1\r\nCookie: " + b"c" * 70_000 + b"\r\n\r\n")
+    assert status == 431
+
+
+def test_chunked_body_is_refused(api):
+    chunked = b"POST /api/jokes HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n"
+    assert [status for status, _, _ in exchange(api, chunked, GET)] == [411]
@@ -0,0 +1,95 @@
+"""build_assets: reference rewriting, content-hash cascade and the built output."""
+import gzip
+import json
+
+import pytest
+
+import build_assets
+
+
+def make_site(root, theme_color="red"):
+    (root / "v2").mkdir(exist_ok=True)
+    (root / "data").mkdir(exist_ok=True)
+    (root / "index.html").write_text(
+        '<link rel="stylesheet" href="styles.css?v=3">\n'
+        '<script src="/app.js"></script>\n'
+        '<img src="logo.png"><a href="missing.js">x</a>\n',
+        encoding="utf-8",
+    )
+    (root / "v2" / "index.html").write_text('<link href="../styles.css">\n', encoding="utf-8")
+    (root / "styles.css").write_text("@import url(theme.css);\nbody { margin: 0 }\n", encoding="utf-8")
+    (root / "theme.css").write_text(f"a {{ color: {theme_color} }}\n", encoding="utf-8")
+    (root / "app.js").write_text("fetch('data/list.json').then(r => r.json());\n", encoding="utf-8")
+    (root / "data" / "list.json").write_text('["data/item.json"]\n', encoding="utf-8")
+    (root / "data" / "item.json").write_text('{"a": 1}\n', encoding="utf-8")
+    (root / "logo.png").write_bytes(b"\x89PNG")
+    (root / "catalog.sqlite3").write_bytes(b"sqlite")
+    (root / ".secret.json").write_text("{}", encoding="utf-8")
+
+
+def build(root, monkeypatch):
+    monkeypatch.setattr(build_assets, "ROOT", root)
+    return build_assets.build(root / "_site")
+
+
+def test_references_are_rewritten_to_fingerprinted_names(tmp_path):
+    make_site(tmp_path)
+    graph = build_assets.AssetGraph(tmp_path)
+    page = graph.rewrite(tmp_path / "index.html").decode("utf-8")
+
+    styles = graph.hashed[tmp_path / "styles.css"].name
+    assert f'href="{styles}"' in page  # the ?v= query is dropped with the old name
+    assert f'src="/{graph.hashed[tmp_path / "app.js"].name}"' in page
+    assert 'src="logo.png"' in page and 'href="missing.js"' in page
+    assert f"url({graph.hashed[tmp_path / 'theme.css'].name})" in graph.content[tmp_path / "styles.css"].decode()
+    assert f"'data/{graph.hashed[tmp_path / 'data' / 'list.json'].name}'" in graph.content[tmp_path / "app.js"].decode()
+    # A name listed inside JSON resolves against the JSON file's own directory.
+    assert graph.content[tmp_path / "data" / "list.json"] == b'["data/item.json"]\n'
+
+    v2_page = graph.rewrite(tmp_path / "v2" / "index.html").decode("utf-8")
+    assert f'href="../{styles}"' in v2_page
+
+
+def test_a_change_below_an_asset_renames_everything_above_it(tmp_path):
+    make_site(tmp_path, theme_color="red")
+    before = build_assets.AssetGraph(tmp_path)
+    before_page = before.rewrite(tmp_path / "index.html")
+
+    make_site(tmp_path, theme_color="blue")
+    after = build_assets.AssetGraph(tmp_path)
+    after_page = after.rewrite(tmp_path / "index.html")
+
+    assert after.hashed[tmp_path / "theme.css"] != before.hashed[tmp_path / "theme.css"]
+    assert after.hashed[tmp_path / "styles.css"] != before.hashed[tmp_path / "styles.css"]
+    assert after.hashed[tmp_path / "app.js"] == before.hashed[tmp_path / "app.js"]
+    assert after_page != before_page
+
+
+def test_reference_cycle_is_reported(tmp_path):
+    (tmp_path / "a.css").write_text("@import url(b.css);", encoding="utf-8")
+    (tmp_path / "b.css").write_text("@import url(a.css);", encoding="utf-8")
+    with pytest.raises(SystemExit, match="cycle"):
+        build_assets.AssetGraph(tmp_path).fingerprint(tmp_path / "a.css")
+
+
+def test_build_writes_hashed_copies_manifest_and_headers(tmp_path, monkeypatch):
+    make_site(tmp_path)
+    manifest = build(tmp_path, monkeypatch)
+    out = tmp_path / "_site"
+
+    assert sorted(manifest["assets"]) == ["app.js", "data/list.json", "styles.css", "theme.css"]
+    assert json.loads((out / "asset-manifest.json").read_text(encoding="utf-8")) == manifest
+    for source, entry in manifest["assets"].items():
+        hashed = (out / entry["file"]).read_bytes()
+        assert hashed == (out / source).read_bytes() and len(hashed) == entry["size"]
+        if "gz" in entry:
+            assert gzip.decompress((out / f"{entry['file']}.gz").read_bytes()) == hashed
+        assert f"/{entry['file']}\n  Cache-Control: {build_assets.IMMUTABLE}" in (out / "_headers").read_text(encoding="utf-8")
+
+    assert manifest["assets"]["styles.css"]["file"] in (out / "index.html").read_text(encoding="utf-8")
+    assert (out / "logo.png").exists() and (out / "data" / "item.json").exists()
+    assert not (out / "catalog.sqlite3").exists() and not (out / ".secret.json").exists()
+    assert not (out / "_site").exists()
+
+    # A second build replaces the output and is byte-for-byte the same.
+    assert build(tmp_path, monkeypatch) == manifest
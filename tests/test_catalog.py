@@ -0,0 +1,97 @@
+"""catalog: JSON import/export round trips, row positions and full-text search."""
+import json
+
+import pytest
+
+from catalog import Catalog
+from json_stream import write_json_array
+
+SAMPLES = {
+    "jokes": [
+        {"id": 2, "episode": "Conan 2009", "guest": "", "joke": "The moth goes to the podiatrist.", "url": "https://youtu.be/aaaaaaaaaa1", "tags": ["moth"]},
+        {"id": 1, "episode": "Letterman", "guest": "Bob Einstein", "joke": "Über café jokes — “deadpan”", "url": None},
+    ],
+    "videos": [
+        {"Title": "Norm on Conan", "Video url": "https://www.youtube.com/watch?v=aaaaaaaaaa1", "Description": "Moth joke", "views_int": 1200000},
+        {"Title": "Letterman 1998", "Video url": "https://youtu.be/bbbbbbbbbb2", "Channel name": "Late Show", "duration_seconds": "n/a"},
+    ],
+    "nml": [
+        {"id": 7, "season": 1, "episode": 3, "guest": "Adam Sandler", "youtube_url": "bbbbbbbbbb2"},
+        {"id": "x", "season": None, "episode": "bonus", "guest": "", "youtube_url": ""},
+    ],
+    "transcripts": [
+        {"id": "t1", "title": "Roast", "content": [{"speaker": "Norm", "text": "The moth walks in."}, {"speaker": "Host", "text": "Why?"}], "type": "standup"},
+        {"id": "t2", "title": "No lines", "type": "interview"},
+        {"id": "t3", "title": "Empty", "content": [], "type": "interview"},
+    ],
+}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with Catalog(tmp_path / "catalog.sqlite3") as catalog:
+        yield catalog
+
+
+@pytest.mark.parametrize("collection", sorted(SAMPLES))
+def test_import_then_export_is_byte_identical(catalog, tmp_path, collection):
+    source = tmp_path / f"{collection}.json"
+    write_json_array(source, SAMPLES[collection])
+
+    assert catalog.import_json(collection, source) == len(SAMPLES[collection])
+    assert list(catalog.rows(collection)) == SAMPLES[collection]
+
+    exported = tmp_path / f"{collection}.out.json"
+    write_json_array(exported, catalog.rows(collection))
+    assert exported.read_bytes() == source.read_bytes()
+
+
+def test_duplicate_videos_fold_and_keyless_rows_are_rejected(catalog, tmp_path):
+    source = tmp_path / "videos.json"
+    source.write_text(json.dumps([
+        {"Title": "Conan", "Video url": "https://www.youtube.com/watch?v=aaaaaaaaaa1&t=30"},
+        {"Title": "Conan", "Video url": "https://youtu.be/aaaaaaaaaa1", "Description": "Moth joke"},
+    ]), encoding="utf-8")
+    assert catalog.import_json("videos", source) == 1
+    assert catalog.get("videos", "aaaaaaaaaa1")["Description"] == "Moth joke"
+
+    source.write_text(json.dumps([{"Title": "No link"}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="no key"):
+        catalog.import_json("videos", source)
+    assert catalog.count("videos") == 1
+
+
+def test_upsert_updates_in_place_and_appends_new_rows(catalog):
+    catalog.replace("jokes", [{"id": 1, "joke": "a"}, {"id": 2, "joke": "b"}, {"id": 3, "joke": "c"}])
+    catalog.upsert("jokes", {"id": 2, "joke": "b2"})
+    catalog.upsert("jokes", {"id": 0, "joke": "new"})
+    assert [(row["id"], row["joke"]) for row in catalog.rows("jokes")] == [(1, "a"), (2, "b2"), (3, "c"), (0, "new")]
+
+    catalog.replace("jokes", [{"id": 3, "joke": "c"}, {"id": 1, "joke": "a"}])
+    assert [row["id"] for row in catalog.rows("jokes")] == [3, 1]
+    assert catalog.get("jokes", "2") is None
+
+
+def test_rows_page_through_large_collections(catalog, monkeypatch):
+    monkeypatch.setattr("catalog.PAGE_SIZE", 3)
+    catalog.replace("jokes", ({"id": n, "joke": str(n)} for n in range(10)))
+    assert [row["id"] for row in catalog.rows("jokes")] == list(range(10))
+
+
+def test_search_covers_every_collection_and_follows_updates(catalog):
+    for collection, rows in SAMPLES.items():
+        catalog.replace(collection, rows)
+
+    hits = catalog.search("moth")
+    assert {(hit["collection"], hit["key"]) for hit in hits} == {
+        ("jokes", "2"), ("videos", "aaaaaaaaaa1"), ("transcripts", "t1#0"),
+    }
+    assert [hit["key"] for hit in catalog.search("mot", collection="jokes")] == ["2"]
+    assert "[moth]" in catalog.search("moth", collection="jokes")[0]["snippet"]
+    assert [(hit["collection"], hit["key"]) for hit in catalog.search("bob einstein")] == [("jokes", "1")]
+    assert catalog.search("  ?! ") == []
+
+    catalog.upsert("jokes", {"id": 2, "joke": "A dog walks into a bar."})
+    catalog.upsert("transcripts", {"id": "t1", "title": "Roast", "content": [], "type": "standup"})
+    assert {hit["collection"] for hit in catalog.search("moth")} == {"videos"}
+    assert [hit["key"] for hit in catalog.search("dog")] == ["2"]
@@ -0,0 +1,61 @@
+"""categorize_video against the per-keyword substring loop it replaced."""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts_data_pipeline import CATEGORY_RULES, TAG_RULES, categorize_video
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def reference_categorize(title, description):
+    """One `in` scan per keyword: every label with a keyword in the text, in priority order."""
+    hay = f"{title} {description}".lower()
+    categories = [label for label, keywords in CATEGORY_RULES if any(k in hay for k in keywords)]
+    if not categories:
+        return "Other", ["other"]
+    tags = [label.lower().replace(" ", "-") for label in categories]
+    tags.extend(tag for tag, keywords in TAG_RULES if any(k in hay for k in keywords))
+    return categories[0], tags
+
+
+@pytest.mark.parametrize("title", [
+    "rip norm macdonald live",
+    "snlate night",
+    "Conan O'Brien Needs a Friend",
+    "stand-up special at comedy central",
+    "Weekend Update: best of Norm",
+    "nothing to see here",
+    "",
+])
+def test_overlapping_keywords(title):
+    assert categorize_video(title, "") == reference_categorize(title, "")
+
+
+def test_overlapping_keywords_keep_every_label():
+    category, tags = categorize_video("RIP Norm Macdonald Live", "")
+    assert category == "Norm Macdonald Live"
+    assert tags == ["norm-macdonald-live", "tribute", "norm-macdonald"]
+    assert categorize_video("SNLate Night", "")[1] == ["snl", "talk-show"]
+
+
+def test_random_keyword_runs_match_reference():
+    keywords = [k for _, ks in CATEGORY_RULES + TAG_RULES for k in ks]
+    rng = random.Random(6)
+    for _ in range(2000):
+        # Glue keyword fragments together so they overlap and nest in every way.
+        parts = []
+        for keyword in rng.sample(keywords, rng.randint(1, 4)):
+            start = rng.randint(0, len(keyword) - 1)
+            parts.append(keyword[start:] if rng.random() < 0.5 else keyword)
+        title = rng.choice(["", " "]).join(parts)
+        assert categorize_video(title, "") == reference_categorize(title, ""), title
+
+
+def test_catalog_matches_reference():
+    videos = json.loads((ROOT / "consolidated_youtube_data.json").read_text(encoding="utf-8"))
+    for row in videos:
+        title, description = row.get("Title", ""), row.get("Description", "")
+        assert categorize_video(title, description) == reference_categorize(title, description)
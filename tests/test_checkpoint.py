@@ -0,0 +1,53 @@
+"""AppearanceCheckpoint: the JSONL checkpoint behind --resume."""
+import json
+
+from competitor_data import scrape
+
+A, B, C = (f"https://example.test/the-list/appearance-{n}" for n in "abc")
+
+
+def record(url, **fields):
+    return {"title": None, **fields, "source_page_url": url}
+
+
+def write(path, *records):
+    checkpoint = scrape.AppearanceCheckpoint(path)
+    for item in records:
+        checkpoint.append(item)
+    checkpoint.close()
+
+
+def test_resume_keeps_finished_pages_and_retries_failed_ones(tmp_path):
+    path = tmp_path / "appearances.checkpoint.jsonl"
+    write(path, record(A, title="First"), scrape.fetch_failed_record(B))
+    checkpoint = scrape.AppearanceCheckpoint(path, resume=True)
+    assert checkpoint.completed() == {A}
+
+    checkpoint.append(record(B, title="Second"))
+    checkpoint.append(record(C, title="Third"))
+    # Records stream back in the order asked for; the last line for a URL wins.
+    assert [r["title"] for r in checkpoint.records([C, A, B])] == ["Third", "First", "Second"]
+    assert checkpoint.completed() == {A, B, C}
+    checkpoint.close()
+
+
+def test_half_written_line_is_dropped_on_resume(tmp_path):
+    path = tmp_path / "appearances.checkpoint.jsonl"
+    write(path, record(A, title="First"))
+    with path.open("ab") as fh:
+        fh.write(json.dumps(record(B, title="Cut off")).encode()[:20])
+
+    checkpoint = scrape.AppearanceCheckpoint(path, resume=True)
+    checkpoint.append(record(C, title="Third"))
+    checkpoint.close()
+    lines = path.read_bytes().splitlines()
+    assert [json.loads(line)["source_page_url"] for line in lines] == [A, C]
+
+
+def test_without_resume_the_checkpoint_starts_over(tmp_path):
+    path = tmp_path / "appearances.checkpoint.jsonl"
+    write(path, record(A, title="First"))
+    checkpoint = scrape.AppearanceCheckpoint(path)
+    assert checkpoint.completed() == set()
+    assert list(checkpoint.records([A])) == []
+    checkpoint.close()
@@ -0,0 +1,103 @@
+"""crawl_appearances: bounded concurrency, retries, and fetchers and parsers that finish or fail together."""
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from competitor_data import scrape
+
+URLS = [f"https://example.test/appearances/{i}" for i in range(20)]
+PAGE = "<html><head><title>Late Show</title></head><body></body></html>"
+
+
+class BrokenPool:
+    """Stands in for a ProcessPoolExecutor whose worker process has died."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+@pytest.fixture
+def checkpoint(tmp_path, monkeypatch):
+    async def fetch(url, limiter):
+        return PAGE, False
+
+    monkeypatch.setattr(scrape, "fetch_url_async", fetch)
+    checkpoint = scrape.AppearanceCheckpoint(tmp_path / "appearances.jsonl")
+    yield checkpoint
+    checkpoint.close()
+
+
+def crawl(checkpoint, **kwargs):
+    coro = scrape.crawl_appearances(URLS, checkpoint, concurrency=4, rate=0, queue_size=1, **kwargs)
+    asyncio.run(asyncio.wait_for(coro, timeout=10))
+
+
+def test_broken_pool_falls_back_to_inline_parsing(checkpoint, monkeypatch):
+    monkeypatch.setattr(scrape, "ProcessPoolExecutor", BrokenPool)
+    crawl(checkpoint, parse_workers=2)
+    assert checkpoint.completed() == set(URLS)
+
+
+def test_parser_error_stops_the_crawl(checkpoint, monkeypatch):
+    def explode(url, page):
+        raise RuntimeError("parser bug")
+
+    monkeypatch.setattr(scrape, "parse_appearance_page", explode)
+    with pytest.raises(RuntimeError, match="parser bug"):
+        crawl(checkpoint, parse_workers=0)
+
+
+def test_fetches_run_concurrently_up_to_the_limit(tmp_path, monkeypatch):
+    in_flight = peak = 0
+
+    async def fetch(url, limiter):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return PAGE, False
+
+    monkeypatch.setattr(scrape, "fetch_url_async", fetch)
+    checkpoint = scrape.AppearanceCheckpoint(tmp_path / "appearances.jsonl")
+    asyncio.run(scrape.crawl_appearances(URLS, checkpoint, concurrency=4, rate=0, parse_workers=0))
+    checkpoint.close()
+    assert peak == 4
+    assert checkpoint.completed() == set(URLS)
+
+
+def test_failed_fetches_are_retried_then_recorded(tmp_path, monkeypatch):
+    attempts = {}
+
+    async def fetch(url, limiter):
+        attempts[url] = attempts.get(url, 0) + 1
+        if url == URLS[0]:
+            return None, True  # throttled every time
+        if url == URLS[1]:
+            return None, False  # 404: not worth retrying
+        if url == URLS[2] and attempts[url] == 1:
+            return None, True  # recovers on the second attempt
+        return PAGE, False
+
+    monkeypatch.setattr(scrape, "fetch_url_async", fetch)
+    monkeypatch.setattr(scrape, "RETRY_DELAY_SECONDS", 0.0)
+    checkpoint = scrape.AppearanceCheckpoint(tmp_path / "appearances.jsonl")
+    asyncio.run(scrape.crawl_appearances(URLS[:5], checkpoint, concurrency=2, rate=0, parse_workers=0, max_attempts=3))
+    records = {record["source_page_url"]: record for record in checkpoint.records(URLS[:5])}
+    checkpoint.close()
+    assert [attempts[url] for url in URLS[:5]] == [3, 1, 2, 1, 1]
+    assert records[URLS[0]]["error"] == records[URLS[1]]["error"] == "fetch_failed"
+    assert checkpoint.completed() == set(URLS[2:5])
@@ -0,0 +1,85 @@
+"""Per-version delta files written by the pipeline's deltas stage."""
+import json
+from pathlib import Path
+
+import pytest
+
+import scripts_data_pipeline as pipeline
+from catalog import Catalog
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "DELTAS_DIR", tmp_path / "data-versions")
+    with Catalog(tmp_path / "catalog.sqlite3") as catalog:
+        catalog.import_json("jokes", ROOT / "jokes-data.json")
+        yield catalog
+
+
+def apply_delta(rows, key, delta):
+    """What data-sync.js does with a delta."""
+    records = {key(row): row for row in rows}
+    for removed in delta["removed"]:
+        del records[removed]
+    records.update(delta["changed"])
+    order = delta.get("order") or [k for k in records] + [k for k, _ in delta["added"]]
+    records.update(delta["added"])
+    return [records[k] for k in order]
+
+
+def joke(text):
+    return {"joke": text, "episode": "", "guest": "", "url": "", "time": "", "source": "test"}
+
+
+def merge_into(catalog, extra):
+    """One jokes-stage run: the catalog's jokes plus extra, merged back into the catalog."""
+    sources = [pipeline.load_existing_jokes(catalog), extra]
+    merged, _ = pipeline.merge_jokes(sources, known_ids=pipeline.existing_joke_ids(catalog))
+    catalog.replace("jokes", merged)
+
+
+def test_adding_one_joke_gives_one_added_row(catalog):
+    merge_into(catalog, [])
+    first = pipeline.build_collection_delta(catalog, "jokes", {"version": 0, "deltas": []})
+    assert first["delta"] is None
+
+    before = list(catalog.rows("jokes"))
+    # Sorts ahead of every existing joke, so positional ids would all shift.
+    new = joke("A brand new joke about a moth.")
+    merge_into(catalog, [new])
+    result = pipeline.build_collection_delta(catalog, "jokes", {"version": first["version"], "deltas": []})
+
+    delta = json.loads((pipeline.DELTAS_DIR / result["delta"]["file"]).read_text(encoding="utf-8"))
+    assert (result["delta"]["added"], result["delta"]["changed"], result["delta"]["removed"]) == (1, 0, 0)
+    (key, row), = delta["added"]
+    assert row["joke"] == new["joke"]
+    assert int(key) == max(int(j["id"]) for j in json.loads((ROOT / "jokes-data.json").read_text(encoding="utf-8"))) + 1
+    assert apply_delta(before, lambda row: str(row["id"]), delta) == list(catalog.rows("jokes"))
+
+
+def test_rerun_without_changes_keeps_the_version(catalog):
+    merge_into(catalog, [])
+    first = pipeline.build_collection_delta(catalog, "jokes", {"version": 0, "deltas": []})
+    merge_into(catalog, [])
+    assert pipeline.build_collection_delta(catalog, "jokes", {"version": first["version"], "deltas": []}) is None
+
+
+def test_lost_manifest_starts_a_new_history(catalog):
+    merge_into(catalog, [])
+    pipeline.build_deltas(None, catalog)
+    merge_into(catalog, [joke("A brand new joke about a moth.")])
+    pipeline.build_deltas(None, catalog)
+    manifest_path = pipeline.DELTAS_DIR / "manifest.json"
+    assert json.loads(manifest_path.read_text(encoding="utf-8"))["collections"]["jokes"]["version"] == 2
+
+    manifest_path.unlink()
+    merge_into(catalog, [joke("Another new joke, this one about a dog.")])
+    pipeline.build_deltas(None, catalog)
+
+    entry = json.loads(manifest_path.read_text(encoding="utf-8"))["collections"]["jokes"]
+    # Numbered past the lost version 2 rather than restarting at 1, with no delta from it.
+    assert (entry["version"], entry["oldest"], entry["deltas"]) == (3, 3, [])
+    assert not list((pipeline.DELTAS_DIR / "jokes").glob("[0-9]*.json"))
+    assert pipeline.verify_deltas() == []
@@ -0,0 +1,58 @@
+"""_tools/enrich_videos.py: streaming NormMacdonald.txt records into the catalog."""
+from _tools import enrich_videos as enrich
+
+TXT = (
+    "Title: Norm on Conan\r\n"
+    "Video url: https://www.youtube.com/watch?v=aaaaaaaaaa1\r\n"
+    "Description: First line\r\n"
+    "second line\r\n"
+    "Views: 1.2M\r\n"
+    "Duration: 452\r\n"
+    "Duration in timestamp: 7:32\r\n"
+    "Channel name: Team Coco\r\n"
+    "######\r\n"
+    "Title: Only in the notes\n"
+    "Video url: https://youtu.be/bbbbbbbbbb2\n"
+    "Views: 5\n"
+    "####\n"
+    "Title: Letterman\n"
+    "Video url: https://youtu.be/ccccccccc33?t=10\n"
+    "Views: 900K\n"
+    "Likes: N/A\n"
+)
+
+
+def write_txt(tmp_path):
+    path = tmp_path / "NormMacdonald.txt"
+    path.write_bytes(TXT.encode("utf-8"))
+    return path
+
+
+def test_records_stream_with_multiline_fields(tmp_path):
+    records = list(enrich.iter_txt_records(write_txt(tmp_path)))
+    assert len(records) == 3
+    assert records[0]["Description"] == "First line\nsecond line"
+    assert records[0]["Duration in timestamp"] == "7:32"
+    assert records[2] == {"Title": "Letterman", "Video url": "https://youtu.be/ccccccccc33?t=10", "Views": "900K", "Likes": "N/A"}
+
+
+def test_empty_file_has_no_records(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(enrich.iter_txt_records(path)) == []
+
+
+def test_only_missing_fields_of_known_videos_are_filled(tmp_path):
+    videos = [
+        {"Video url": "https://youtu.be/aaaaaaaaaa1", "Title": "Conan", "Views": "N/A", "Duration": "N/A", "Channel name": "Mine"},
+        {"Video url": "https://www.youtube.com/watch?v=ccccccccc33", "Title": "Dave", "Views": "1M", "Likes": ""},
+    ]
+    rows, report = enrich.enrich_videos(iter(videos), write_txt(tmp_path))
+
+    assert [row["Video url"] for row in rows] == [video["Video url"] for video in videos]
+    assert rows[0]["Views"] == "1.2M" and rows[0]["Duration"] == "7:32"
+    assert rows[0]["Channel name"] == "Mine"
+    assert rows[1]["Views"] == "1M" and rows[1]["Likes"] == ""
+    assert report["txt_records"] == 3 and report["matched"] == 2
+    assert report["filled"] == {"Views": 1, "Channel name": 0, "Duration": 1, "Likes": 0, "Thumbnail url": 0}
+    assert report["missing_after"]["Views"] == 0
@@ -0,0 +1,66 @@
+"""fetch_url: one-off fetches share the crawl's limiter and retry rules."""
+import urllib.error
+from email.message import Message
+
+import pytest
+
+from competitor_data import scrape
+
+URL = "https://example.test/robots.txt"
+
+
+def http_error(status, retry_after=None):
+    headers = Message()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return urllib.error.HTTPError(URL, status, "", headers, None)
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Queue of results for http_get: a body to return or an exception to raise."""
+    queue = []
+    calls = []
+
+    def http_get(url):
+        calls.append(url)
+        result = queue.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(scrape, "http_get", http_get)
+    monkeypatch.setattr(scrape, "RETRY_DELAY_SECONDS", 0.0)
+    return queue, calls
+
+
+def test_throttled_fetch_slows_the_host_and_retries(responses):
+    queue, calls = responses
+    queue.extend([http_error(429, "0"), http_error(503), "User-agent: *\n"])
+    limiter = scrape.HostRateLimiter(rate=0)
+    assert scrape.fetch_url(URL, limiter) == "User-agent: *\n"
+    assert len(calls) == 3
+    # AIMD: the two pushbacks land in one window and halve the rate once; the success adds a step.
+    expected = scrape.UNLIMITED_BACKOFF_RATE * scrape.BACKOFF_FACTOR + scrape.ADDITIVE_STEP
+    assert limiter.bucket(URL).rate == pytest.approx(expected)
+
+
+def test_fetch_gives_up_after_max_attempts(responses):
+    queue, calls = responses
+    queue.extend([http_error(503)] * scrape.MAX_FETCH_ATTEMPTS)
+    assert scrape.fetch_url(URL, scrape.HostRateLimiter(rate=0)) is None
+    assert len(calls) == scrape.MAX_FETCH_ATTEMPTS
+
+
+def test_client_errors_are_not_retried(responses):
+    queue, calls = responses
+    queue.append(http_error(404))
+    assert scrape.fetch_url(URL, scrape.HostRateLimiter(rate=0)) is None
+    assert len(calls) == 1
+
+
+def test_offline_cache_miss_is_permanent(responses):
+    queue, calls = responses
+    queue.append(scrape.OfflineMiss("not in the response cache (offline mode)"))
+    assert scrape.fetch_url(URL, scrape.HostRateLimiter(rate=0)) is None
+    assert len(calls) == 1
@@ -0,0 +1,53 @@
+"""HTTPPool: keep-alive connection reuse and compressed transfer."""
+import gzip
+import zlib
+
+import pytest
+
+from competitor_data import scrape
+
+PAGE = "<html>" + "Norm Macdonald Live " * 200 + "</html>"
+
+
+def test_requests_reuse_one_connection_and_decode_gzip(site):
+    site.pages.update({"/a": PAGE, "/b": "short"})
+    pool = scrape.HTTPPool(timeout=5)
+    for path in ("/a", "/b", "/a"):
+        status, _, body = pool.get(site.url + path, {})
+        assert status == 200
+    assert body.decode() == PAGE
+    assert site.connections == 1
+    assert all(headers["accept-encoding"].startswith("gzip") for _, headers in site.requests)
+    assert pool.stats["connections"] == 1 and pool.stats["reused"] == 2 and pool.stats["requests"] == 3
+    assert pool.stats["wire_bytes"] < pool.stats["decoded_bytes"]
+
+
+def test_dropped_idle_connection_is_replaced(site):
+    site.pages["/a"] = PAGE
+    pool = scrape.HTTPPool(timeout=5)
+    pool.get(site.url + "/a", {})
+    for idle in pool._idle.values():
+        for conn in idle:
+            conn.sock.close()  # what a server closing an idle keep-alive socket looks like to us
+    status, _, body = pool.get(site.url + "/a", {})
+    assert (status, body.decode()) == (200, PAGE)
+
+
+@pytest.mark.parametrize(
+    "encoding, encode",
+    [
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("deflate", lambda data: zlib.compress(data)[2:-4]),  # raw deflate, no zlib header
+        ("gzip, deflate", lambda data: zlib.compress(gzip.compress(data))),
+        ("identity", lambda data: data),
+        (None, lambda data: data),
+    ],
+)
+def test_decode_body(encoding, encode):
+    assert scrape.decode_body(encode(PAGE.encode()), encoding) == PAGE.encode()
+
+
+def test_unknown_encoding_is_an_error():
+    with pytest.raises(ValueError, match="compress"):
+        scrape.decode_body(b"", "compress")
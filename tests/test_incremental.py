@@ -0,0 +1,72 @@
+"""Sitemap lastmod-driven incremental crawling."""
+import json
+
+import pytest
+
+from competitor_data import scrape
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*entries):
+    urls = "".join(
+        f"<url><loc>{loc}</loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>" for loc, lastmod in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'
+
+
+def test_collect_sitemap_follows_nested_indexes(site, monkeypatch):
+    monkeypatch.setattr(scrape, "HTTP_POOL", scrape.HTTPPool(timeout=5))
+    monkeypatch.setattr(scrape, "HTTP_CACHE", None)
+    site.pages["/sitemap.xml"] = (
+        f"<sitemapindex {NS}><sitemap><loc>{site.url}/a.xml</loc></sitemap>"
+        f"<sitemap><loc>{site.url}/b.xml</loc></sitemap><sitemap><loc>{site.url}/gone.xml</loc></sitemap></sitemapindex>"
+    )
+    site.pages["/a.xml"] = urlset(("https://x.test/1", "2024-01-01"), ("https://x.test/2", None))
+    site.pages["/b.xml"] = urlset(("https://x.test/1", "2025-01-01"), ("https://x.test/3", "2024-05-05"))
+
+    entries = scrape.collect_sitemap(site.url + "/sitemap.xml", scrape.HostRateLimiter(rate=0))
+    # The first listing of a URL wins; a missing child sitemap is skipped.
+    assert entries == {"https://x.test/1": "2024-01-01", "https://x.test/2": None, "https://x.test/3": "2024-05-05"}
+
+
+def test_missing_root_sitemap_is_none(site, monkeypatch):
+    monkeypatch.setattr(scrape, "HTTP_POOL", scrape.HTTPPool(timeout=5))
+    monkeypatch.setattr(scrape, "HTTP_CACHE", None)
+    assert scrape.collect_sitemap(site.url + "/sitemap.xml", scrape.HostRateLimiter(rate=0)) is None
+
+
+A, B, C, D = (f"https://x.test/the-list/appearance-{n}" for n in "abcd")
+
+
+@pytest.fixture
+def previous(tmp_path):
+    path = tmp_path / "appearances.json"
+    records = [
+        {"title": "unchanged", "source_page_url": A},
+        {"title": "updated since", "source_page_url": B},
+        {"title": None, "error": "fetch_failed", "source_page_url": C},
+        {"title": "no lastmod", "source_page_url": D},
+    ]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    return path
+
+
+def test_only_unchanged_pages_are_reused(tmp_path, previous):
+    sitemap = {A: "2024-01-01", B: "2024-06-01", C: "2024-01-01", D: None}
+    state = {
+        A: {"lastmod": "2024-01-01", "status": "ok"},
+        B: {"lastmod": "2024-01-01", "status": "ok"},
+        C: {"lastmod": "2024-01-01", "status": "fetch_failed"},
+        D: {"lastmod": None, "status": "ok"},
+    }
+    checkpoint = scrape.AppearanceCheckpoint(tmp_path / "checkpoint.jsonl")
+    assert scrape.reuse_unchanged_appearances(checkpoint, sitemap, state, previous) == 1
+    assert checkpoint.completed() == {A}
+    checkpoint.close()
+
+
+def test_no_previous_output_reuses_nothing(tmp_path):
+    checkpoint = scrape.AppearanceCheckpoint(tmp_path / "checkpoint.jsonl")
+    assert scrape.reuse_unchanged_appearances(checkpoint, {A: "x"}, {A: {"lastmod": "x", "status": "ok"}}, tmp_path / "none.json") == 0
+    checkpoint.close()
@@ -0,0 +1,79 @@
+"""json_stream: chunked array reading and atomic, byte-compatible array writing."""
+import json
+
+import pytest
+
+from json_stream import JsonArrayWriter, iter_json_array, write_json_array
+
+ITEMS = [
+    2.5,
+    -1234567,
+    "Norm — “deadpan”",
+    {"Title": "Conan", "tags": ["a", {"b": [1, 2, 3]}], "empty": {}, "none": None},
+    [],
+    True,
+    1e-07,
+]
+
+
+def expected_text(items):
+    return json.dumps(items, indent=2, ensure_ascii=False) + "\n"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_elements_survive_every_chunk_boundary(tmp_path, chunk_size):
+    path = tmp_path / "items.json"
+    path.write_text(expected_text(ITEMS), encoding="utf-8")
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == ITEMS
+
+    path.write_text(json.dumps(ITEMS, separators=(",", ":")), encoding="utf-8")
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == ITEMS
+
+
+def test_empty_array(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(" [ \n ] ", encoding="utf-8")
+    assert list(iter_json_array(path, chunk_size=1)) == []
+
+
+@pytest.mark.parametrize("text", ['[1, 2', '[{"a": 1}, {"b"', '{"a": 1}', '[1 2]', ''])
+def test_malformed_or_truncated_input_raises(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path, chunk_size=2))
+
+
+@pytest.mark.parametrize("items", [ITEMS, [], [{}]])
+def test_writer_matches_json_dumps(tmp_path, items):
+    path = tmp_path / "out.json"
+    assert write_json_array(path, iter(items)) is True
+    assert path.read_text(encoding="utf-8") == expected_text(items)
+
+
+def test_failed_write_leaves_old_file_and_no_temp(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("[1]\n", encoding="utf-8")
+
+    def items():
+        yield 1
+        raise RuntimeError("source died")
+
+    with pytest.raises(RuntimeError):
+        write_json_array(path, items())
+    assert path.read_text(encoding="utf-8") == "[1]\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_unchanged_output_leaves_file_alone(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text(expected_text(ITEMS), encoding="utf-8")
+    before = path.stat().st_mtime_ns
+
+    with JsonArrayWriter(path) as out:
+        out.write_all(ITEMS)
+    assert out.changed is False and out.count == len(ITEMS)
+    assert path.stat().st_mtime_ns == before
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+    assert write_json_array(path, ITEMS, only_if_changed=False) is True
@@ -0,0 +1,49 @@
+"""Joke loading and near-duplicate merging in the pipeline's jokes stage."""
+import pytest
+
+import scripts_data_pipeline as pipeline
+
+CSV = """Joke,Episode,Guest,URL,Time,ID
+Norm said the exporter dropped every column after this one
+"We all know that the Swiss are officially neutral. Unofficially, however, they're filthy sons of bitches.",NML S01E01,Super Dave Osborne,E5eIJ5Ev_u4,49m44s,1
+"I love the movie '42'. It's Chadwick Boseman like you've never seen him befo
+"""
+
+TXT = """TOM GREEN
+1. We all know the Swiss are officially neutral. Unofficially, however, they are filthy sons of bitches.
+2. I love the movie '42'. It's Chadwick Boseman like you've never seen him before, folks.
+3. A completely different joke about a moth walking into a podiatrist's office.
+"""
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    csv_path = tmp_path / "FullNormJokes.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    txt_path = tmp_path / "NormMacdonald-Live-Jokes-Transcribed.txt"
+    txt_path.write_text(TXT, encoding="utf-8")
+    monkeypatch.setattr(pipeline, "FULL_JOKES_CSV", csv_path)
+    monkeypatch.setattr(pipeline, "TRANSCRIBED_TXT", txt_path)
+    return [pipeline.load_csv_jokes(), pipeline.load_txt_jokes()]
+
+
+def test_short_csv_rows_load_as_empty_strings(sources):
+    short = sources[0][0]
+    assert short["guest"] == short["episode"] == short["url"] == short["time"] == ""
+    truncated = sources[0][2]
+    assert truncated["guest"] == truncated["episode"] == truncated["url"] == ""
+
+
+def test_near_duplicates_are_reported_and_folded(sources):
+    merged, decisions = pipeline.merge_jokes(sources)
+
+    assert [(d["kept_source"], d["merged_source"]) for d in decisions] == [
+        ("FullNormJokes.csv", "NormMacdonald-Live-Jokes-Transcribed.txt"),
+        ("FullNormJokes.csv", "NormMacdonald-Live-Jokes-Transcribed.txt"),
+    ]
+    assert all(d["similarity"] >= pipeline.NEAR_DUPLICATE_THRESHOLD for d in decisions)
+    # The truncated CSV row borrows the guest and episode of the transcribed joke it absorbed.
+    boseman = next(d for d in decisions if "Boseman" in d["kept"])
+    assert boseman["filled_fields"] == ["episode", "guest"]
+    assert len(merged) == 4
+    assert [row["id"] for row in merged] == [0, 1, 2, 3]
@@ -0,0 +1,51 @@
+"""Crawl instrumentation: histograms, counters and the Prometheus export."""
+from competitor_data import scrape
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = scrape.Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+    assert hist.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert hist.as_dict() == {"count": 4, "sum": 3.65, "buckets": {"0.1": 2, "1": 3, "+Inf": 4}}
+
+
+def test_report_and_prometheus_export():
+    metrics = scrape.CrawlMetrics()
+    metrics.phase("sitemap")
+    metrics.phase(None)
+    metrics.observe_request(0.2, 200)
+    metrics.observe_request(40.0, 503)
+    metrics.observe_parse("hub", 0.004)
+    metrics.count("retries", 2)
+
+    report = metrics.report({"cache_downloaded": 1})
+    assert list(report["phase_seconds"]) == ["sitemap"]
+    assert report["counters"] == {"cache_downloaded": 1, "retries": 2}
+    assert report["http_status_codes"] == {"200": 1, "503": 1}
+    assert report["http_request_seconds"]["buckets"]["+Inf"] == 2
+    assert report["parse_seconds"]["hub"]["count"] == 1
+
+    lines = metrics.prometheus({"cache_downloaded": 1}).splitlines()
+    assert 'scrape_events_total{event="retries"} 2' in lines
+    assert 'scrape_http_responses_total{code="503"} 1' in lines
+    assert 'scrape_http_request_seconds_bucket{le="0.25"} 1' in lines
+    assert 'scrape_http_request_seconds_bucket{le="+Inf"} 2' in lines
+    assert "scrape_http_request_seconds_count 2" in lines
+    assert 'scrape_parse_seconds_bucket{extractor="hub",le="0.005"} 1' in lines
+    assert 'scrape_parse_seconds_count{extractor="hub"} 1' in lines
+    # Every sample line belongs to a metric declared with HELP and TYPE.
+    declared = {line.split()[2] for line in lines if line.startswith("# TYPE")}
+    samples = {line.split("{")[0].split()[0] for line in lines if not line.startswith("#")}
+    assert {name.removesuffix("_bucket").removesuffix("_sum").removesuffix("_count") for name in samples} <= declared
+
+
+def test_requests_are_timed_by_status(site, monkeypatch):
+    metrics = scrape.CrawlMetrics()
+    monkeypatch.setattr(scrape, "METRICS", metrics)
+    site.pages["/a"] = "ok"
+    pool = scrape.HTTPPool(timeout=5)
+    pool.get(site.url + "/a", {})
+    pool.get(site.url + "/missing", {})
+    assert metrics.status_codes == {"200": 1, "404": 1}
+    assert metrics.latency.count == 2
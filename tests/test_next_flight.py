@@ -0,0 +1,51 @@
+"""NextFlight: decoding the Next.js flight stream pushed through self.__next_f."""
+import json
+
+import pytest
+
+from competitor_data import scrape
+
+TEXT = "Norm's café bit — “the moth” 🎤 runs long"
+ROWS = (
+    f"1:T{len(TEXT.encode('utf-8')):x},{TEXT}"
+    '2:{"id":"appearance-7","title":"Late Show","description":"$1","guestHost":"$3","price":"$$5"}\n'
+    '3:"Dave"\n'
+)
+
+
+def push(chunk):
+    return f"self.__next_f.push({json.dumps([1, chunk])})"
+
+
+@pytest.mark.parametrize("split", [5, 12, ROWS.index("🎤") + 1, ROWS.index("2:") + 3, len(ROWS) - 3])
+def test_rows_split_across_pushes_decode_by_byte_length(split):
+    flight = scrape.NextFlight()
+    flight.feed_script(push(ROWS[:split]))
+    flight.feed_script(push(ROWS[split:]))
+    assert flight.value("1") == TEXT
+    assert flight.resolve(flight.record) == {
+        "id": "appearance-7",
+        "title": "Late Show",
+        "description": TEXT,
+        "guestHost": "Dave",
+        "price": "$5",
+    }
+
+
+def test_record_waits_for_the_rows_it_refers_to():
+    flight = scrape.NextFlight()
+    head = ROWS.index("3:")
+    flight.feed_script(push(ROWS[:head]))
+    assert flight.record is not None and flight.unresolved(flight.record)
+    flight.feed_script(push(ROWS[head:]))
+    assert not flight.unresolved(flight.record)
+
+
+def test_appearance_page_with_a_flight_payload():
+    page = (
+        '<html><head><meta property="og:image" content="https://img.example/7.jpg"></head><body>'
+        f"<script>{push(ROWS[:40])}</script><script>{push(ROWS[40:])}</script></body></html>"
+    )
+    item = scrape.extract_appearance_payload(page)
+    assert (item["title"], item["description"]) == ("Late Show", TEXT)
+    assert item["extra"] == {"guestHost": "Dave", "price": "$5"}
@@ -0,0 +1,98 @@
+"""Single-pass page extraction: hubs, the homepage and appearance pages."""
+import json
+
+from competitor_data import scrape
+
+BASE = scrape.BASE_URL
+
+HUB = f"""<html><head><title>NML | Norm Macdonald Archive</title>
+<meta name="description" content=" Every episode "></head><body>
+<nav><a href="{BASE}/">Home</a><a href="/nml">NML</a></nav>
+<h1>Norm Macdonald Live</h1><h2>Season 1</h2>
+<a href="/the-list/appearance-1">Super Dave</a>
+<a href="/the-list/appearance-1">Super Dave</a>
+<a href="https://youtube.com/watch?v=x">Clip</a>
+<a href="/_next/static/chunk.js">chunk</a>
+<a href="mailto:norm@example.com">Mail</a>
+<p>Welcome to the archive.</p>
+</body></html>"""
+
+
+def test_hub_links_are_absolute_deduplicated_and_filtered():
+    hub = scrape.extract_hub_content(f"{BASE}/nml", HUB)
+    assert hub["page_title"] == "NML | Norm Macdonald Archive"
+    assert hub["description"] == "Every episode"
+    assert hub["headings"] == [{"tag": "h1", "text": "Norm Macdonald Live"}, {"tag": "h2", "text": "Season 1"}]
+    assert [link["href"] for link in hub["navigation"]] == [f"{BASE}/", "/nml"]
+    assert [link["href"] for link in hub["all_links"]] == [
+        f"{BASE}/",
+        f"{BASE}/nml",
+        f"{BASE}/the-list/appearance-1",
+        "https://youtube.com/watch?v=x",
+    ]
+    assert hub["appearance_links"] == [{"href": f"{BASE}/the-list/appearance-1", "text": "Super Dave"}]
+
+
+def test_homepage_curates_non_nav_site_links():
+    home = scrape.extract_homepage_content(f"{BASE}/", HUB)
+    assert home["section_descriptions"] == ["Welcome to the archive."]
+    # Nav hrefs are compared as written, so only the absolute one is left out.
+    assert [link["href"] for link in home["curated_links"]] == [f"{BASE}/nml", f"{BASE}/the-list/appearance-1"]
+
+
+def appearance_page(record, body_extra=""):
+    next_data = json.dumps({"props": {"pageProps": {"appearance": record}}})
+    return (
+        "<html><head><title>Fallback | Norm Macdonald Archive</title>"
+        '<meta property="og:image" content="https://img.example/1.jpg"></head><body>'
+        f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>'
+        f"{body_extra}</body></html>"
+    )
+
+
+def test_appearance_fields_come_from_next_data():
+    record = {
+        "id": "appearance-12",
+        "title": "Late Show &amp; Friends",
+        "date": "1998-03-04",
+        "mediaType": "Video",
+        "url": "https://youtu.be/abc",
+        "duration": 512,
+        "guestHost": "Dave",
+    }
+    item = scrape.extract_appearance_payload(appearance_page(record))
+    assert item == {
+        "title": "Late Show & Friends",
+        "date": "1998-03-04",
+        "show": "Late Show & Friends",
+        "description": None,
+        "media_url": "https://youtu.be/abc",
+        "media_type": "video",
+        "duration": "512",
+        "thumbnail": "https://img.example/1.jpg",
+        "extra": {"guestHost": "Dave"},
+    }
+
+
+def test_parsing_stops_once_the_appearance_is_complete():
+    late_meta = '<meta property="og:description" content="after the payload">'
+    parser = scrape.parse_page(
+        appearance_page({"id": "appearance-1", "title": "T"}, late_meta),
+        scrape.APPEARANCE_FIELDS,
+        until=scrape._appearance_found,
+    )
+    assert parser.next_data is not None
+    assert "og:description" not in parser.metas
+
+
+def test_meta_fallbacks_without_a_payload():
+    page = (
+        "<html><head><title>Conan 4/5/1996 | Norm Macdonald Archive</title>"
+        '<meta property="og:description" content="Norm talks about his interview">'
+        '<meta property="og:url" content="https://example.test/a"></head><body></body></html>'
+    )
+    item = scrape.extract_appearance_payload(page)
+    assert item["title"] == "Conan 4/5/1996"
+    assert item["date"] == "4/5/1996"
+    assert item["media_type"] == "article"
+    assert item["thumbnail"] is None
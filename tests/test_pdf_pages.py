@@ -0,0 +1,76 @@
+"""PDF transcript extraction: per-page cache, batched workers and streamed segments."""
+import pytest
+
+import scripts_data_pipeline as pipeline
+
+pytest.importorskip("pypdf")
+
+
+def make_pdf(path, pages):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+
+
+PAGES = [f"Page {n} text." for n in range(1, 12)]
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "PDF_PAGE_BATCH", 3)
+    path = tmp_path / "jokes.pdf"
+    make_pdf(path, PAGES)
+    return path
+
+
+def test_pages_come_back_in_order(pdf, tmp_path):
+    pages = list(pipeline.iter_pdf_pages(pdf, workers=2, cache_dir=tmp_path / "cache"))
+    assert [page.strip() for page in pages] == PAGES
+
+
+def test_cached_pages_are_reused_and_missing_ones_extracted(pdf, tmp_path):
+    cache = tmp_path / "cache"
+    list(pipeline.iter_pdf_pages(pdf, workers=1, cache_dir=cache))
+    page_dir = cache / pipeline._file_digest(pdf)
+    for page_file in page_dir.glob("*.txt"):
+        page_file.write_text("cached", encoding="utf-8")
+    (page_dir / "00004.txt").unlink()
+
+    pages = list(pipeline.iter_pdf_pages(pdf, workers=1, cache_dir=cache))
+    assert pages[4].strip() == "Page 5 text."
+    assert pages[:4] + pages[5:] == ["cached"] * 10
+
+
+def test_unreadable_pdf_names_the_file(tmp_path):
+    bad = tmp_path / "broken.pdf"
+    bad.write_bytes(b"not a pdf")
+    with pytest.raises(RuntimeError, match="broken.pdf"):
+        list(pipeline.iter_pdf_pages(bad, workers=1, cache_dir=tmp_path / "cache"))
+
+
+def test_segments_carry_across_page_breaks():
+    pages = ["First sentence here. Second one starts", "and ends here. Third"]
+    assert list(pipeline.iter_transcript_segments(pages)) == [
+        "First sentence here.",
+        "Second one starts and ends here.",
+        "Third",
+    ]
@@ -0,0 +1,97 @@
+"""Adaptive per-host pacing: TokenBucket AIMD, Retry-After and robots.txt delays."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from competitor_data import scrape
+
+
+def test_bucket_paces_requests_at_its_rate():
+    bucket = scrape.TokenBucket(rate=20, burst=2)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    started = time.monotonic()
+    asyncio.run(take(6))
+    # Two go out at once on the burst, the other four wait 1/20 s each.
+    assert 0.18 <= time.monotonic() - started < 0.5
+
+
+def test_slow_down_halves_once_per_window_and_speed_up_creeps_back():
+    bucket = scrape.TokenBucket(rate=2)
+    assert bucket.slow_down() is True
+    assert bucket.rate == 1.0
+    # Responses already in flight report the same pushback; it only counts once.
+    assert bucket.slow_down() is False
+    assert bucket.rate == 1.0
+    bucket.speed_up()
+    assert bucket.rate == pytest.approx(1.0 + scrape.ADDITIVE_STEP)
+    bucket.rate = 1.99
+    bucket.speed_up()
+    assert bucket.rate == 2.0
+
+
+def test_unlimited_bucket_backs_off_to_a_finite_rate_and_floors_at_min_rate():
+    bucket = scrape.TokenBucket(rate=0)
+    bucket.slow_down()
+    assert bucket.rate == scrape.UNLIMITED_BACKOFF_RATE * scrape.BACKOFF_FACTOR
+    for _ in range(20):
+        bucket.last_decrease = float("-inf")
+        bucket.slow_down()
+    assert bucket.rate == scrape.MIN_RATE
+
+
+def test_retry_after_pauses_the_host():
+    bucket = scrape.TokenBucket(rate=0)
+    bucket.slow_down(retry_after=0.2)
+    started = time.monotonic()
+    asyncio.run(bucket.acquire())
+    assert time.monotonic() - started >= 0.18
+
+
+def test_limiter_keeps_one_bucket_per_host():
+    limiter = scrape.HostRateLimiter(rate=4)
+    limiter.throttled("https://a.test/x")
+    assert limiter.bucket("https://a.test/y").rate == 2.0
+    assert limiter.bucket("https://b.test/x").rate == 4.0
+
+
+def test_parse_retry_after():
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert scrape.parse_retry_after("12") == 12.0
+    assert 25 <= scrape.parse_retry_after(soon) <= 30
+    assert scrape.parse_retry_after("100000") == scrape.MAX_RETRY_AFTER
+    assert scrape.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert scrape.parse_retry_after("soon") is None
+    assert scrape.parse_retry_after(None) is None
+
+
+ROBOTS = """
+User-agent: Googlebot
+Crawl-delay: 0.1
+
+User-agent: mozilla
+User-agent: other
+Request-rate: 1/4s
+
+User-agent: *
+Crawl-delay: 2.5
+Disallow: /private
+"""
+
+
+@pytest.mark.parametrize(
+    "agent, delay",
+    [("Mozilla/5.0", 4.0), ("curl/8", 2.5), ("Googlebot/2.1", 0.1)],
+)
+def test_robots_crawl_delay(agent, delay):
+    assert scrape.robots_crawl_delay(ROBOTS, agent) == delay
+
+
+def test_robots_without_a_delay():
+    assert scrape.robots_crawl_delay("User-agent: *\nDisallow: /\n") is None
@@ -0,0 +1,94 @@
+"""replay.py: record a crawl once, then serve it back to scrape.py."""
+import json
+import sys
+import threading
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "competitor_data"))
+import replay  # noqa: E402
+
+scrape = replay.scrape
+
+
+def appearance(n):
+    record = {"id": f"appearance-{n}", "title": f"Show {n}", "date": "1999-01-0{n}", "url": f"https://youtu.be/{n}"}
+    return (
+        f'<html><head><meta property="og:image" content="https://img.test/{n}.jpg"></head><body>'
+        f'<script id="__NEXT_DATA__">{json.dumps({"props": {"record": record}})}</script></body></html>'
+    )
+
+
+@pytest.fixture
+def recorded(site, tmp_path, monkeypatch):
+    """An archive of one crawl of the test site, and the appearances that crawl produced."""
+    # scrape.main() sets these module globals; put them back afterwards.
+    for name in ("BASE_URL", "SITEMAP_URL", "OUT_DIR", "HTTP_CACHE", "OFFLINE", "HTTP_POOL", "METRICS"):
+        monkeypatch.setattr(scrape, name, getattr(scrape, name))
+    scrape.METRICS = scrape.CrawlMetrics()
+    locs = "".join(f"<url><loc>{site.url}/the-list/appearance-{n}</loc></url>" for n in (1, 2, 3))
+    site.pages["/sitemap.xml"] = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+    site.pages.update({f"/the-list/appearance-{n}": appearance(n) for n in (1, 2, 3)})
+    site.pages["/nml"] = f'<html><body><a href="{site.url}/the-list/appearance-1">Show 1</a></body></html>'
+    site.pages["/"] = "<html><head><title>Home</title></head><body><p>Hi</p></body></html>"
+
+    archive = tmp_path / "site.jsonl.gz"
+    args = Namespace(
+        archive=archive,
+        base_url=site.url,
+        out_dir=tmp_path / "recorded",
+        scrape_args=["--rate", "0", "--parse-workers", "0"],
+    )
+    replay.record(args)
+    scrape.HTTP_POOL = scrape.HTTPPool()  # record() leaves its recording pool installed
+    return archive, json.loads((tmp_path / "recorded" / "appearances.json").read_text(encoding="utf-8"))
+
+
+def crawl(server, out_dir):
+    scrape.main(["--base-url", server.base_url, "--out-dir", str(out_dir), "--no-cache", "--rate", "0", "--parse-workers", "0"])
+    return json.loads((out_dir / "appearances.json").read_text(encoding="utf-8"))
+
+
+def serve(archive, **options):
+    server = replay.ReplayServer(("127.0.0.1", 0), archive, seed=1, **options)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def strip_origin(records, origin):
+    return json.loads(json.dumps(records).replace(origin, "ORIGIN"))
+
+
+def test_replay_serves_the_recorded_crawl(recorded, site, tmp_path):
+    archive, expected = recorded
+    origin, entries = replay.load_fixtures(archive)
+    assert origin == site.url
+    assert {"/sitemap.xml", "/the-list/appearance-2", "/nml", "/"} <= set(entries)
+    assert [item["title"] for item in expected] == ["Show 1", "Show 2", "Show 3"]
+
+    server = serve(archive)
+    try:
+        replayed = crawl(server, tmp_path / "replayed")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert strip_origin(replayed, server.base_url) == strip_origin(expected, origin)
+    assert server.stats["served"] >= 5
+
+
+def test_injected_errors_are_retried(recorded, tmp_path, monkeypatch):
+    archive, expected = recorded
+    # Keep the test fast: no retry delay, no Retry-After pause, and a high rate after backing off.
+    monkeypatch.setattr(scrape, "RETRY_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(scrape, "MAX_RETRY_AFTER", 0.0)
+    monkeypatch.setattr(scrape, "UNLIMITED_BACKOFF_RATE", 1000.0)
+    server = serve(archive, error_rate=0.3)
+    try:
+        replayed = crawl(server, tmp_path / "replayed")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert server.stats["injected"] > 0
+    assert [item.get("error") for item in replayed] == [None, None, None]
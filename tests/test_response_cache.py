@@ -0,0 +1,42 @@
+"""http_get with the on-disk response cache: conditional revalidation and offline reads."""
+import pytest
+
+from competitor_data import scrape
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = scrape.ResponseCache(tmp_path / "http-cache")
+    monkeypatch.setattr(scrape, "HTTP_CACHE", cache)
+    monkeypatch.setattr(scrape, "HTTP_POOL", scrape.HTTPPool(timeout=5))
+    return cache
+
+
+def test_unchanged_page_revalidates_with_304(site, cache):
+    site.pages["/nml"] = "<h1>NML</h1>"
+    assert scrape.http_get(site.url + "/nml") == "<h1>NML</h1>"
+    assert scrape.http_get(site.url + "/nml") == "<h1>NML</h1>"
+
+    first, second = (headers for _, headers in site.requests)
+    assert "if-none-match" not in first
+    assert second["if-none-match"] == cache.get(site.url + "/nml")["etag"]
+    assert cache.stats == {"downloaded": 1, "not_modified": 1}
+
+
+def test_changed_page_is_downloaded_again(site, cache):
+    site.pages["/nml"] = "old"
+    scrape.http_get(site.url + "/nml")
+    site.pages["/nml"] = "new"
+    assert scrape.http_get(site.url + "/nml") == "new"
+    assert cache.get(site.url + "/nml")["body"] == "new"
+    assert cache.stats["downloaded"] == 2
+
+
+def test_offline_reads_only_the_cache(site, cache, monkeypatch):
+    site.pages["/nml"] = "cached copy"
+    scrape.http_get(site.url + "/nml")
+    monkeypatch.setattr(scrape, "OFFLINE", True)
+    assert scrape.http_get(site.url + "/nml") == "cached copy"
+    with pytest.raises(scrape.OfflineMiss):
+        scrape.http_get(site.url + "/standup")
+    assert len(site.requests) == 1
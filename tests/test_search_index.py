@@ -0,0 +1,56 @@
+"""The inverted search index the pipeline writes for search.js."""
+import pytest
+
+import scripts_data_pipeline as pipeline
+from api_server import SearchIndex
+
+COLLECTIONS = {
+    "jokes": [
+        {"joke": "Norm tells the moth joke", "episode": "S01E01", "guest": "Norm Macdonald"},
+        {"joke": "The Swiss are neutral", "episode": "S01E02", "guest": "Bob Saget"},
+    ],
+    "videos": [
+        {"Video url": "https://youtu.be/dQw4w9WgXcQ", "Title": "Norm on Conan", "Channel name": "Team Coco"},
+        {"Video url": "", "Title": "Norm without a link"},
+    ],
+    "quotes": [{"quote": "Café society", "source": "Déjà Vu"}],
+}
+
+
+@pytest.fixture
+def index():
+    return pipeline.build_search_index(COLLECTIONS)
+
+
+@pytest.mark.parametrize(
+    "text, tokens",
+    [
+        ("Café Déjà-vu", ["cafe", "deja", "vu"]),
+        ("ﬁve ①", ["five", "1"]),
+        ("NORM'S 2nd", ["norm", "s", "2nd"]),
+        (None, []),
+    ],
+)
+def test_tokenize_folds_case_and_marks(text, tokens):
+    assert pipeline._tokenize(text) == tokens
+
+
+def test_terms_are_sorted_with_weighted_postings(index):
+    assert index["terms"] == sorted(index["terms"])
+    postings = index["postings"][index["terms"].index("norm")]
+    # Joke 0 has "norm" in the joke (1) and the guest (3); video 0 in the title (3).
+    assert postings == {"jokes": [0, 4], "videos": [0, 3]}
+
+
+def test_videos_without_an_id_are_left_out(index):
+    assert index["docs"]["videos"] == [["Norm on Conan", "Team Coco", "https://www.youtube.com/watch?v=dQw4w9WgXcQ", 1]]
+
+
+def test_accented_text_is_found_without_accents(index):
+    groups = SearchIndex(index).search("deja caf", 5)
+    assert [(g["collection"], g["count"]) for g in groups] == [("quotes", 1)]
+
+
+def test_every_token_must_match_as_a_prefix(index):
+    groups = SearchIndex(index).search("norm mo", 5)
+    assert [(g["collection"], g["count"]) for g in groups] == [("jokes", 1)]
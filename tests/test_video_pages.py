@@ -0,0 +1,65 @@
+"""Video catalog shards and sort indexes written for videos.js."""
+import json
+
+import pytest
+
+import scripts_data_pipeline as pipeline
+
+VIDEOS = [
+    {"Video url": "https://youtu.be/aaaaaaaaaa1", "Title": "bob", "Views": "1.2K", "Duration": "1:00", "category": "Roast"},
+    {"Video url": "https://youtu.be/aaaaaaaaaa2", "Title": "Álvaro", "Views": "3M", "Duration": "10:00"},
+    {"Video url": "", "Title": "No link", "Views": "9B"},
+    {"Video url": "https://youtu.be/aaaaaaaaaa3", "Title": "Bob", "Views": "500", "Duration": "1:00:00"},
+    {"Video url": "https://youtu.be/aaaaaaaaaa4", "Title": "42 jokes", "Views": "N/A", "Duration": "N/A"},
+]
+
+
+@pytest.fixture
+def out_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "VIDEO_SHARD_SIZE", 3)
+    return tmp_path / "video-pages"
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_sort_orders_skip_unplayable_videos():
+    orders = pipeline.video_sort_permutations(VIDEOS)
+    assert orders["title-asc"] == [4, 1, 0, 3]
+    assert orders["views-desc"] == [1, 0, 3, 4]
+    assert orders["duration-asc"] == [4, 0, 1, 3]
+    # Case only breaks ties, lowercase first, as in localeCompare().
+    assert orders["title-desc"] == [3, 0, 1, 4]
+
+
+def test_shards_manifest_and_sort_index(out_dir):
+    manifest = pipeline.build_video_pages(VIDEOS, out_dir, catalog_digest="abc")
+    assert manifest["total"] == 4
+    assert manifest["categories"] == {"Roast": 1, "Other": 3}
+    assert manifest["orders"]["views-desc"] == ["views-desc-000.json", "views-desc-001.json"]
+    first, second = (read(out_dir / name) for name in manifest["orders"]["views-desc"])
+    assert [card["id"] for card in first + second] == [1, 0, 3, 4]
+    assert first[0] == {
+        "id": 1,
+        "url": "aaaaaaaaaa2",
+        "title": "Álvaro",
+        "channel": "N/A",
+        "duration": "10:00",
+        "views": "3M",
+        "thumbnail": "",
+        "category": "Other",
+    }
+    assert read(out_dir / "sort-index.json") == {"catalog": "abc", "orders": pipeline.video_sort_permutations(VIDEOS)}
+    assert read(out_dir / "manifest.json") == manifest
+
+
+def test_unchanged_shards_are_not_rewritten_and_stale_ones_go(out_dir):
+    pipeline.build_video_pages(VIDEOS, out_dir)
+    shard = out_dir / "title-asc-000.json"
+    stamp = shard.stat().st_mtime_ns
+    pipeline.build_video_pages(VIDEOS, out_dir)
+    assert shard.stat().st_mtime_ns == stamp
+
+    pipeline.build_video_pages(VIDEOS[:2], out_dir)
+    assert not (out_dir / "title-asc-001.json").exists()
@@ -0,0 +1,65 @@
+"""VideoStore: merging video rows from several sources by YouTube ID."""
+import json
+
+import pytest
+
+from catalog import Catalog
+from video_store import VideoStore, extract_video_id
+
+WATCH = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        WATCH,
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?t=42",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=1m30s",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    ],
+)
+def test_link_forms_share_one_id(url):
+    assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_youtu_be_and_timestamp_links_fold_into_one_record():
+    store = VideoStore()
+    outcome = store.upsert_many(
+        [
+            {"Video url": WATCH, "Title": "Norm on Conan", "Views": "N/A"},
+            {"Video url": "https://youtu.be/dQw4w9WgXcQ?t=42", "Title": "No Title", "Views": "1.2M"},
+            {"Video url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=90", "Duration": "7:12"},
+        ],
+        "consolidated",
+    )
+    assert len(store) == 1
+    assert outcome["added"] == 1 and outcome["merged"] == 2
+    assert store.rows() == [{"Video url": WATCH, "Title": "Norm on Conan", "Views": "1.2M", "Duration": "7:12"}]
+    assert outcome["Views:filled"] == 1 and outcome["Duration:filled"] == 1
+
+
+def test_field_precedence_is_per_field():
+    store = VideoStore()
+    store.upsert({"Video url": WATCH, "Title": WATCH, "Views": "100"}, "consolidated")
+    result = store.upsert_many([{"Video url": WATCH, "Title": "Norm on Conan", "Views": "5"}], "playlist")
+    row = store.rows()[0]
+    # The playlist's YouTube title replaces a scraped URL-as-title; the catalog's count stays.
+    assert row["Title"] == "Norm on Conan"
+    assert row["Views"] == "100"
+    assert result["Title:replaced"] == 1 and "Views:replaced" not in result
+
+
+def test_rows_without_a_url_are_kept_aside():
+    store = VideoStore()
+    assert store.upsert({"Title": "Mystery clip"}, "playlist") == "skipped"
+    assert len(store) == 0
+    assert store.unkeyed == [{"Title": "Mystery clip"}]
+
+
+def test_catalog_import_rejects_videos_without_a_url(tmp_path):
+    path = tmp_path / "videos.json"
+    path.write_text(json.dumps([{"Video url": WATCH, "Title": "Norm"}, {"Title": "Mystery clip"}]), encoding="utf-8")
+    with Catalog(tmp_path / "catalog.sqlite3") as catalog:
+        with pytest.raises(ValueError, match="1 videos rows have no key"):
+            catalog.import_json("videos", path)
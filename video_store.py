@@ -0,0 +1,118 @@
+"""Video catalog merge engine shared by the pipeline and the _tools scripts.
+
+Every source row is keyed by its 11-character YouTube ID, so watch?v=, youtu.be/
+and shorts/ links to the same video collapse into one record. Conflicting values
+are settled per field by FIELD_PRECEDENCE rather than by arrival order.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Iterable
+
+_VIDEO_ID = re.compile(r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([A-Za-z0-9_-]{11})")
+
+# Values the scrapers and extractors write when they had nothing to put in a field.
+PLACEHOLDERS = frozenset({"", "N/A", "No Title", "No description available.", "Video url:"})
+
+# Sources in order of trust, per field. "*" covers fields without their own entry; a source
+# missing from a list ranks below every listed source, in the order it was first upserted.
+# "playlist" rows come from YouTube itself (pytube), "normmacdonald_txt" is an export of
+# YouTube's metadata, and the youtube_* sources are scraped from bookmarks, notes and CSVs.
+_FROM_YOUTUBE_METADATA = ("consolidated", "normmacdonald_txt", "playlist", "youtube_html", "youtube_text", "youtube_csv")
+FIELD_PRECEDENCE: dict[str, tuple[str, ...]] = {
+    "*": ("consolidated", "youtube_html", "youtube_text", "youtube_csv", "playlist", "normmacdonald_txt"),
+    # Scrapers fall back to the link text or the URL for a title; YouTube's own wins.
+    "Title": ("playlist", "consolidated", "normmacdonald_txt", "youtube_html", "youtube_csv", "youtube_text"),
+    "Channel name": ("playlist", "consolidated", "normmacdonald_txt", "youtube_html", "youtube_csv", "youtube_text"),
+    # Only the metadata export carries these; the curated catalog keeps what it already has.
+    "Views": _FROM_YOUTUBE_METADATA,
+    "Likes": _FROM_YOUTUBE_METADATA,
+    "Duration": _FROM_YOUTUBE_METADATA,
+    "Thumbnail url": _FROM_YOUTUBE_METADATA,
+    # The text scrape keeps the prose around each link, the closest thing to a description.
+    "Description": ("consolidated", "youtube_text", "youtube_csv", "normmacdonald_txt", "youtube_html", "playlist"),
+}
+
+
+def extract_video_id(url: str) -> str:
+    match = _VIDEO_ID.search(url or "")
+    return match.group(1) if match else ""
+
+
+def is_missing(value: object) -> bool:
+    return value is None or (isinstance(value, str) and value.strip() in PLACEHOLDERS)
+
+
+class VideoStore:
+    """Videos in first-seen order, indexed by YouTube ID (or raw URL when there is no ID).
+
+    Rows without any URL cannot be keyed or merged; they are kept as given in `unkeyed`
+    so callers can write them back or report them.
+    """
+
+    def __init__(self, precedence: dict[str, tuple[str, ...]] | None = None) -> None:
+        self.precedence = precedence or FIELD_PRECEDENCE
+        self.records: dict[str, dict] = {}
+        self.unkeyed: list[dict] = []
+        self.stats: Counter = Counter()
+        self._ranks: dict[str, dict[str, int]] = {}
+        self._arrival: dict[str, int] = {}
+
+    @staticmethod
+    def key(row: dict) -> str:
+        url = row.get("Video url") or ""
+        video_id = extract_video_id(url)
+        return video_id or (f"url:{url.strip()}" if url.strip() else "")
+
+    def rank(self, field: str, source: str) -> int:
+        order = self.precedence.get(field, self.precedence.get("*", ()))
+        if source in order:
+            return order.index(source)
+        return len(order) + self._arrival.setdefault(source, len(self._arrival))
+
+    def upsert(self, row: dict, source: str, add_new: bool = True) -> str:
+        """Merge one row; returns "added", "merged", "unmatched" (add_new=False) or "skipped" (no URL)."""
+        key = self.key(row)
+        if not key:
+            self.unkeyed.append(row)
+            return "skipped"
+        record = self.records.get(key)
+        if record is None:
+            if not add_new:
+                return "unmatched"
+            self.records[key] = dict(row)
+            self._ranks[key] = {f: self.rank(f, source) for f, v in row.items() if not is_missing(v)}
+            return "added"
+
+        ranks = self._ranks[key]
+        for field, value in row.items():
+            if is_missing(value):
+                continue
+            rank = self.rank(field, source)
+            held = ranks.get(field)
+            if held is not None and held <= rank:
+                continue
+            self.stats[f"{field}:{'replaced' if held is not None else 'filled'}"] += 1
+            record[field] = value
+            ranks[field] = rank
+        return "merged"
+
+    def upsert_many(self, rows: Iterable[dict], source: str, add_new: bool = True) -> Counter:
+        """Upsert every row; the result counts outcomes plus "<field>:filled" / "<field>:replaced"."""
+        before = self.stats.copy()
+        outcome: Counter = Counter()
+        for row in rows:
+            outcome[self.upsert(row, source, add_new)] += 1
+        outcome.update(self.stats - before)
+        return outcome
+
+    def rows(self) -> list[dict]:
+        return list(self.records.values())
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, row_or_key: object) -> bool:
+        key = self.key(row_or_key) if isinstance(row_or_key, dict) else row_or_key
+        return key in self.records
@@ -59,38 +59,52 @@ const state = {
     videosPerPage: 12,
     searchTerm: '',
     sortBy: 'title-asc',
-    category: 'all'
+    category: 'all',
+    videosById: [],     // catalog index -> video
+    sortOrders: null,   // video-pages/sort-index.json: sort order -> presorted catalog indices
+    pages: null,        // video-pages/manifest.json, used until the full catalog is needed
+    shards: new Map()   // "order/n" -> Promise of that shard's cards
 };
 
+// manifest.json and sort-index.json are fetched by literal path so build_assets.py can
+// fingerprint them; shard names come from the (rewritten) manifest.
+const VIDEO_PAGES_URL = './video-pages/';
+
+// Optional query API (api_server.py), enabled with <meta name="archive-api" content="...">.
+// When set, every page is fetched already filtered and sorted instead of loading the catalog.
+const apiMeta = document.querySelector('meta[name="archive-api"]');
+const API_URL = apiMeta && apiMeta.content ? apiMeta.content.replace(/\/+$/, '') : '';
+
 // ===================================
 // Load Videos Data
 // ===================================
 
 async function loadVideos() {
     try {
-        const response = await fetch('./consolidated_youtube_data.json');
-        if (!response.ok) throw new Error('Failed to load videos');
-
-        const rawVideos = await response.json();
-
-        // Process and normalize video data
-        state.videos = rawVideos.map((video, index) => ({
-            id: index,
-            url: extractVideoId(video['Video url'] || ''),
-            title: video['Title'] || 'Untitled Video',
-            description: video['Description'] || '',
-            channel: video['Channel name'] || 'N/A',
-            duration: video['Duration'] || 'N/A',
-            views: video['Views'] || 'N/A',
-            thumbnail: video['Thumbnail url'] || '',
-            category: video['category'] || 'Other'
-        })).filter(video => video.url); // Only keep videos with valid URLs
-
-        updateCategoryCounts();
-        state.filteredVideos = sortVideos([...state.videos]);
+        state.pages = API_URL ? null : await fetch('./video-pages/manifest.json')
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        let current = true;
+        if (API_URL) {
+            const all = await fetchApi({ per_page: 0, facets: 'category' });
+            updateCategoryCounts(all.facets.category, all.total);
+            updateTotalCount(all.total);
+            current = await loadApiPage(state.currentPage);
+        } else if (isShardMode()) {
+            // Unfiltered browsing: show the current page straight from its presorted shard
+            updateCategoryCounts(state.pages.categories, state.pages.total);
+            updateTotalCount(state.pages.total);
+            state.filteredVideos = new Array(state.pages.total);
+            await ensurePageLoaded(state.currentPage);
+        } else {
+            await ensureCatalog();
+            state.filteredVideos = filterAndSortVideos();
+        }
 
         document.getElementById('loading-state').style.display = 'none';
-        updateTotalCount();
+        if (!current) return; // a newer query renders its own results
+        updateFilteredCount();
         renderVideos();
     } catch (error) {
         console.error('Error loading videos:', error);
@@ -98,25 +112,178 @@ async function loadVideos() {
     }
 }
 
+// Full catalog, fetched once the visitor searches or filters
+let catalogPromise = null;
+
+function ensureCatalog() {
+    if (!catalogPromise) {
+        const sortIndex = fetch('./video-pages/sort-index.json')
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+        catalogPromise = loadCatalog().then(async ({ rows: rawVideos, digest }) => {
+            // Process and normalize video data
+            state.videos = rawVideos.map((video, index) => ({
+                id: index,
+                url: extractVideoId(video['Video url'] || ''),
+                title: video['Title'] || 'Untitled Video',
+                description: video['Description'] || '',
+                channel: video['Channel name'] || 'N/A',
+                duration: video['Duration'] || 'N/A',
+                views: video['Views'] || 'N/A',
+                thumbnail: video['Thumbnail url'] || '',
+                category: video['category'] || 'Other',
+                // Canonical ints from the pipeline; parse only for catalogs built before it emitted them
+                viewsCount: video['views_int'] ?? parseViews(video['Views']),
+                durationSeconds: video['duration_seconds'] ?? parseDuration(video['Duration'])
+            })).filter(video => video.url); // Only keep videos with valid URLs
+
+            state.videosById = [];
+            state.videos.forEach(v => { state.videosById[v.id] = v; });
+
+            // Presorted catalog indices per sort order, used only when they were built from
+            // exactly this catalog
+            const index = await sortIndex;
+            state.sortOrders = index && digest && index.catalog === digest ? index.orders : null;
+
+            const counts = {};
+            state.videos.forEach(v => {
+                counts[v.category] = (counts[v.category] || 0) + 1;
+            });
+            updateCategoryCounts(counts, state.videos.length);
+            updateTotalCount(state.videos.length);
+        });
+        catalogPromise.catch(() => { catalogPromise = null; });
+    }
+    return catalogPromise;
+}
+
+// Catalog rows and the sha256 of the file they match. data-sync.js serves them from
+// IndexedDB, updated through the versioned deltas; without it (or its manifest) the
+// file is fetched and hashed here.
+async function loadCatalog() {
+    const synced = typeof NormData !== 'undefined' ? await NormData.load('videos').catch(() => null) : null;
+    if (synced) return synced;
+
+    const response = await fetch('./consolidated_youtube_data.json');
+    if (!response.ok) throw new Error('Failed to load videos');
+    const bytes = await response.arrayBuffer();
+    const digest = await sha256Hex(bytes).catch(() => null);
+    return { rows: JSON.parse(new TextDecoder().decode(bytes)), digest };
+}
+
+// Hex SHA-256 of a buffer, or null where SubtleCrypto is unavailable (plain-HTTP origins)
+async function sha256Hex(buffer) {
+    if (!(window.crypto && window.crypto.subtle)) return null;
+    const hash = await window.crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(hash), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// ===================================
+// Query API
+// ===================================
+
+async function fetchApi(params) {
+    const response = await fetch(API_URL + '/api/videos?' + new URLSearchParams(params));
+    if (!response.ok) throw new Error('Failed to load videos');
+    return response.json();
+}
+
+// Bumped for every API page request, so a slow response to an earlier query or page
+// can't overwrite the results of a later one
+let latestApiRequest = 0;
+
+// One page of cards from the API, placed in a sparse array sized to the match count.
+// Resolves to false if a newer request was made while this one was in flight.
+async function loadApiPage(page) {
+    const request = ++latestApiRequest;
+    const params = { page, per_page: state.videosPerPage, sort: state.sortBy };
+    if (state.searchTerm) params.q = state.searchTerm;
+    if (state.category !== 'all') params.category = state.category;
+    const result = await fetchApi(params);
+    if (request !== latestApiRequest) return false;
+    const videos = new Array(result.total);
+    const start = (result.page - 1) * result.per_page;
+    result.items.forEach((video, i) => { videos[start + i] = video; });
+    state.filteredVideos = videos;
+    return true;
+}
+
+// ===================================
+// Page Shards
+// ===================================
+
+function isShardMode() {
+    return state.videos.length === 0 &&
+        !!state.pages && !!state.pages.orders[state.sortBy] &&
+        !state.searchTerm && state.category === 'all';
+}
+
+function loadShard(order, n) {
+    const key = order + '/' + n;
+    if (!state.shards.has(key)) {
+        const shard = fetch(VIDEO_PAGES_URL + state.pages.orders[order][n]).then(response => {
+            if (!response.ok) throw new Error('Failed to load video shard ' + key);
+            return response.json();
+        });
+        shard.catch(() => state.shards.delete(key));
+        state.shards.set(key, shard);
+    }
+    return state.shards.get(key);
+}
+
+// Fill the page's slots of the sparse filteredVideos array from its shard(s), then
+// prefetch the following shard so paging forward stays instant.
+async function ensurePageLoaded(page) {
+    if (API_URL) return loadApiPage(page);
+    if (!isShardMode()) return;
+    const order = state.sortBy;
+    const shardSize = state.pages.shardSize;
+    const shardCount = state.pages.orders[order].length;
+    const videos = state.filteredVideos;
+    const start = (page - 1) * state.videosPerPage;
+    const end = Math.min(start + state.videosPerPage, state.pages.total) - 1;
+    if (end < start) return;
+
+    const first = Math.floor(start / shardSize);
+    const last = Math.floor(end / shardSize);
+    for (let n = first; n <= last; n++) {
+        const shard = await loadShard(order, n);
+        shard.forEach((video, i) => { videos[n * shardSize + i] = video; });
+    }
+    if (last + 1 < shardCount) {
+        loadShard(order, last + 1).catch(() => {});
+    }
+}
+
+async function goToPage(page) {
+    state.currentPage = page;
+    saveStateToURL();
+    try {
+        if (await ensurePageLoaded(page) === false) return;
+    } catch (error) {
+        console.error('Error loading videos:', error);
+        showError();
+        return;
+    }
+    if (state.currentPage === page) renderVideos();
+}
+
 function extractVideoId(url) {
     if (!url) return '';
     const match = url.match(/(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\s]+)/);
     return match ? match[1] : '';
 }
 
-function updateTotalCount() {
-    document.getElementById('total-videos').textContent = state.videos.length;
+function updateTotalCount(total) {
+    document.getElementById('total-videos').textContent = total;
 }
 
 function updateFilteredCount() {
     document.getElementById('filtered-count').textContent = state.filteredVideos.length;
 }
 
-function updateCategoryCounts() {
-    const counts = { all: state.videos.length };
-    state.videos.forEach(v => {
-        counts[v.category] = (counts[v.category] || 0) + 1;
-    });
+function updateCategoryCounts(categoryCounts, total) {
+    const counts = { ...categoryCounts, all: total };
     const map = {
         'all': 'count-all',
         'Late Night Appearance': 'count-late-night',
@@ -160,29 +327,55 @@ function sortVideos(videos) {
             sorted.sort((a, b) => b.title.localeCompare(a.title));
             break;
         case 'views-desc':
-            sorted.sort((a, b) => parseViews(b.views) - parseViews(a.views));
+            sorted.sort((a, b) => b.viewsCount - a.viewsCount);
             break;
         case 'duration-desc':
-            sorted.sort((a, b) => parseDuration(b.duration) - parseDuration(a.duration));
+            sorted.sort((a, b) => b.durationSeconds - a.durationSeconds);
             break;
         case 'duration-asc':
-            sorted.sort((a, b) => parseDuration(a.duration) - parseDuration(b.duration));
+            sorted.sort((a, b) => a.durationSeconds - b.durationSeconds);
             break;
     }
     return sorted;
 }
 
-function applyFilters() {
-    let filtered = state.videos.filter(video => {
-        const matchesSearch = video.title.toLowerCase().includes(state.searchTerm.toLowerCase()) ||
-                            video.description.toLowerCase().includes(state.searchTerm.toLowerCase());
+function filterAndSortVideos() {
+    const term = state.searchTerm.toLowerCase();
+    const matches = video => {
+        const matchesSearch = video.title.toLowerCase().includes(term) ||
+                            video.description.toLowerCase().includes(term);
         const matchesCategory = state.category === 'all' || video.category === state.category;
 
         return matchesSearch && matchesCategory;
-    });
+    };
 
-    state.filteredVideos = sortVideos(filtered);
+    // Filtering a presorted permutation keeps its order, so no per-interaction sort
+    const order = state.sortOrders && state.sortOrders[state.sortBy];
+    if (order) {
+        // Indices of rows dropped above (no playable URL) have no video
+        return order.map(id => state.videosById[id]).filter(video => video && matches(video));
+    }
+    return sortVideos(state.videos.filter(matches));
+}
+
+async function applyFilters() {
     state.currentPage = 1;
+    try {
+        if (API_URL) {
+            if (!await loadApiPage(1)) return;
+        } else if (isShardMode()) {
+            state.filteredVideos = new Array(state.pages.total);
+            await ensurePageLoaded(1);
+        } else {
+            await ensureCatalog();
+            state.filteredVideos = filterAndSortVideos();
+        }
+    } catch (error) {
+        console.error('Error loading videos:', error);
+        showError();
+        return;
+    }
+
     updateFilteredCount();
     renderVideos();
     renderPagination();
@@ -202,8 +395,10 @@ function applyFilters() {
 }
 
 function showRandomVideo() {
-    if (state.filteredVideos.length === 0) return;
-    const video = state.filteredVideos[Math.floor(Math.random() * state.filteredVideos.length)];
+    // In shard mode only the fetched shards are populated
+    const pool = state.filteredVideos.filter(Boolean);
+    if (pool.length === 0) return;
+    const video = pool[Math.floor(Math.random() * pool.length)];
     window.open('https://www.youtube.com/watch?v=' + video.url, '_blank');
 }
 
@@ -343,11 +538,7 @@ function renderPagination() {
     prevBtn.className = 'page-btn';
     prevBtn.textContent = '← Prev';
     prevBtn.disabled = state.currentPage === 1;
-    prevBtn.onclick = () => {
-        state.currentPage--;
-        renderVideos();
-        saveStateToURL();
-    };
+    prevBtn.onclick = () => goToPage(state.currentPage - 1);
     pagination.appendChild(prevBtn);
 
     // Page numbers
@@ -364,11 +555,7 @@ function renderPagination() {
         pageBtn.className = 'page-btn';
         if (i === state.currentPage) pageBtn.classList.add('active');
         pageBtn.textContent = i;
-        pageBtn.onclick = () => {
-            state.currentPage = i;
-            renderVideos();
-            saveStateToURL();
-        };
+        pageBtn.onclick = () => goToPage(i);
         pagination.appendChild(pageBtn);
     }
 
@@ -377,11 +564,7 @@ function renderPagination() {
     nextBtn.className = 'page-btn';
     nextBtn.textContent = 'Next →';
     nextBtn.disabled = state.currentPage === totalPages;
-    nextBtn.onclick = () => {
-        state.currentPage++;
-        renderVideos();
-        saveStateToURL();
-    };
+    nextBtn.onclick = () => goToPage(state.currentPage + 1);
     pagination.appendChild(nextBtn);
 }
 